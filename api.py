@@ -1,40 +1,64 @@
-from fastapi import FastAPI, Request, Query
-from fastapi.responses import FileResponse, JSONResponse
+import coldstart  # first, so the cold-start timeline starts before the heavy imports
+from fastapi import FastAPI, Request, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+import asyncio
+import binascii
+import json
 import os
-import tempfile
-import base64
-import logging
-import uuid
+import shutil
 import threading
 import time
-from inference import run_inference
-
-# In-memory job store
-jobs = {}
-lock = threading.Lock()
+import logging
+import uuid
+from inference import RESULTS_DIR, run_inference_async
+from comfy_client import get_client
+from job_scheduler import JobScheduler, QueueFull, SchedulerClosed
+from input_cache import get_cache as get_input_cache
+from base64_stream import Base64StreamDecoder, decode_base64_to_file, strip_data_uri
+from job_store import create_job_store
+from job_progress import JobProgress
+import comfy_outputs
+import result_cache
+from warmup import is_warm, run_warmup, state as warmup_state
+
+# JOB_STORE=memory|sqlite; retention limits are configured in job_store
+jobs = create_job_store()
+# Live progress of queued and running jobs (not persisted; dropped when the job ends)
+progress_by_job = {}
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 app = FastAPI(title="InfiniteTalk API", description="RunPod Pod FastAPI interface for InfiniteTalk", version="1.0")
 
-# Log which inference module is loaded at startup
-import inference, sys
-logger.info(f"✅ Loaded inference module from: {getattr(inference, '__file__', 'unknown')}")
-logger.info(f"Python sys.path = {sys.path}")
-
 
 @app.get("/health")
 def health_check():
     """Simple health check to ensure API and ComfyUI are alive."""
-    server_address = os.getenv("SERVER_ADDRESS", "127.0.0.1")
-    import urllib.request
+    if not is_warm():
+        # Not ready until the boot warm-up job has loaded the models
+        return JSONResponse({"status": "warming_up", "warmup": warmup_state()}, status_code=503)
+    client = get_client()
     try:
-        urllib.request.urlopen(f"http://{server_address}:8188/", timeout=3)
-        return {"status": "ok", "comfyui": "connected"}
+        client.request("GET", "/", timeout=3)
+        return {"status": "ok", "comfyui": "connected", "backends": client.stats(), "queue": scheduler.stats()}
     except Exception as e:
         logger.warning(f"ComfyUI unreachable: {e}")
-        return {"status": "degraded", "error": str(e)}
+        return {"status": "degraded", "error": str(e), "backends": client.stats(), "queue": scheduler.stats()}
+
+
+@app.get("/metrics")
+def metrics():
+    """Queue and cache counters for sizing the worker."""
+    return {
+        "queue": scheduler.stats(),
+        "input_cache": get_input_cache().stats(),
+        "result_cache": result_cache.get_cache().stats(),
+        "jobs": jobs.stats(),
+        "coldstart": coldstart.report(),
+        "warmup": warmup_state(),
+        "comfy_artifacts": comfy_outputs.stats(),
+    }
 
 
 # Helper: normalized filename and mime detection
@@ -46,115 +70,473 @@ def detect_mime_and_ext(path: str):
     return ext, mime
 
 
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header: str, size: int):
+    """Parse a single 'bytes=start-end' range. Returns (start, end) inclusive.
+
+    Returns None for headers that should be ignored (RFC 9110: serve the whole file),
+    i.e. other units, multiple ranges or malformed specs. Raises RangeNotSatisfiable
+    for a valid range that lies outside the file.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_s, sep, end_s = header[len("bytes="):].strip().partition("-")
+    start_s, end_s = start_s.strip(), end_s.strip()
+    if not sep or not (start_s or end_s) or not (start_s + end_s).isdigit():
+        return None
+    if start_s == "":
+        length = int(end_s)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable(header)
+        return max(0, size - length), size - 1
+    start = int(start_s)
+    end = int(end_s) if end_s else size - 1
+    if end_s and end < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+    return start, min(end, size - 1)
+
+
+def iter_file(path: str, start: int, length: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def stream_file(request: Request, path: str, filename: str = None):
+    """Stream a file from disk with single-range (HTTP 206) support."""
+    ext, mime = detect_mime_and_ext(path)
+    size = os.path.getsize(path)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f'attachment; filename="{filename or os.path.basename(path)}"',
+    }
+    try:
+        byte_range = parse_range(request.headers.get("range"), size)
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(iter_file(path, 0, size), media_type=mime, headers=headers)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(iter_file(path, start, end - start + 1), status_code=206, media_type=mime, headers=headers)
+
+
+# ----------------- Streaming uploads -----------------
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "/tmp/infinitetalk/uploads")
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(2 * 1024 * 1024 * 1024)))
+# Uploads can be referenced by several jobs, so they expire by age rather than with a job
+UPLOAD_TTL_SECONDS = int(os.getenv("UPLOAD_TTL_SECONDS", str(24 * 3600)))
+
+
+@app.post("/upload")
+async def upload_file(request: Request, filename: str = Query("input.bin"), encoding: str = Query("binary", enum=["binary", "base64"])):
+    """Stream a raw request body to disk and return a path usable as image_path/video_path/wav_path.
+
+    The body is never held in memory as a whole; with encoding=base64 it is decoded chunk by chunk.
+    """
+    upload_dir = os.path.join(UPLOAD_DIR, str(uuid.uuid4()))
+    os.makedirs(upload_dir, exist_ok=True)
+    path = os.path.join(upload_dir, os.path.basename(filename) or "input.bin")
+    received = 0
+    try:
+        with open(path, "wb") as f:
+            decoder = Base64StreamDecoder(f) if encoding == "base64" else None
+            first = True
+            async for chunk in request.stream():
+                received += len(chunk)
+                if received > MAX_UPLOAD_BYTES:
+                    raise ValueError(f"Upload exceeds {MAX_UPLOAD_BYTES} bytes")
+                if decoder is None:
+                    f.write(chunk)
+                    continue
+                if first:
+                    chunk = strip_data_uri(chunk)
+                    first = False
+                decoder.feed(chunk)
+            size = decoder.close() if decoder is not None else received
+    except (ValueError, binascii.Error) as e:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        status_code = 413 if received > MAX_UPLOAD_BYTES else 400
+        return JSONResponse({"error": str(e)}, status_code=status_code)
+    logger.info(f"Upload stored: {path} ({size} bytes)")
+    return {"path": path, "size": size}
+
+
 # ----------------- Serverless-compatible async endpoints -----------------
 
-def background_job(job_id, body):
+async def execute_job(job_id, body):
+    """Scheduler runner: executes one admitted job and records its outcome."""
+    jobs.update(job_id, status="IN_PROGRESS")
+    coldstart.first_job_started()
+    # API mode keeps the video on disk unless the caller asked for base64
+    keep_file = jobs.get(job_id).get("output_format") != "base64"
+    progress = progress_by_job.get(job_id)
+    final_stage = "failed"
     try:
-        result = run_inference(body)
-        with lock:
-            jobs[job_id]["output"] = result
-            jobs[job_id]["status"] = "COMPLETED"
-            jobs[job_id]["updated_at"] = time.time()
+        result = await run_inference_async(body, keep_file=keep_file, progress=progress)
+        result_file = await asyncio.to_thread(materialize_result, job_id, result)
+        await asyncio.to_thread(jobs.update, job_id, result_file=result_file, output=result, status="COMPLETED")
+        final_stage = "completed"
+        return result
     except Exception as e:
-        with lock:
-            jobs[job_id]["status"] = "FAILED"
-            jobs[job_id]["error"] = str(e)
-            jobs[job_id]["updated_at"] = time.time()
+        jobs.update(job_id, status="FAILED", error=str(e))
+        raise
+    finally:
+        if progress is not None:
+            # Streams see the terminal stage, then read the final status from the job store
+            progress.set_stage(final_stage)
+        progress_by_job.pop(job_id, None)
+        coldstart.first_job_finished(get_client().ready_at)
 
 
-@app.post("/run")
-def run_async(request_body: dict, output: str = Query("file", enum=["file", "base64", "path"]), preset: str = Query(None)):
-    """Async job submission (serverless-compatible schema: {input:{...}})"""
-    job_input = request_body.get("input", request_body)
+scheduler = JobScheduler(execute_job)
+
+
+@app.on_event("startup")
+async def start_scheduler():
+    if coldstart.FAST_START:
+        # Connect while ComfyUI is still booting; its first status event marks it ready
+        get_client().start_listener()
+    scheduler.start()
+    coldstart.mark("worker_started")
+    background_tasks.add(asyncio.create_task(sweep_results_periodically()))
+    background_tasks.add(asyncio.create_task(asyncio.to_thread(run_warmup)))
+
+
+@app.on_event("shutdown")
+async def stop_scheduler():
+    for task in background_tasks:
+        task.cancel()
+    await scheduler.stop()
+
+
+def apply_preset(job_input: dict, preset: str):
     # fast preset (smaller dimensions to avoid timeout)
     if preset == "fast":
-        if "width" not in job_input:
-            job_input["width"] = 256
-        if "height" not in job_input:
-            job_input["height"] = 256
-        if "max_frame" not in job_input:
-            job_input["max_frame"] = 60
+        job_input.setdefault("width", 256)
+        job_input.setdefault("height", 256)
+        job_input.setdefault("max_frame", 60)
+
+
+# Retry-After for jobs refused while the boot warm-up is still running
+WARMUP_RETRY_AFTER_SECONDS = int(os.getenv("WARMUP_RETRY_AFTER_SECONDS", "10"))
+
+
+def admit_job(job_input: dict, output_format: str = "file"):
+    """Register a job and hand it to the scheduler. Returns (job_id, future) or an error response."""
+    if not is_warm():
+        # Jobs admitted now would queue behind model loading; let the client retry instead
+        return None, JSONResponse(
+            {"error": "Worker is warming up", "warmup": warmup_state()},
+            status_code=503,
+            headers={"Retry-After": str(WARMUP_RETRY_AFTER_SECONDS)},
+        )
     job_id = str(uuid.uuid4())
-    with lock:
-        jobs[job_id] = {
-            "id": job_id,
-            "status": "IN_PROGRESS",
-            "input": job_input,
-            "output": None,
-            "error": None,
-            "created_at": time.time(),
-            "updated_at": time.time(),
-        }
-    t = threading.Thread(target=background_job, args=(job_id, job_input))
-    t.start()
-    return {"id": job_id, "status": "IN_PROGRESS"}
+    # The input itself lives only in the scheduler queue until the job runs
+    jobs.create(job_id, status="IN_QUEUE", output_format=output_format)
+    progress_by_job[job_id] = JobProgress(job_id)
+    try:
+        future = scheduler.submit(job_id, job_input)
+    except (QueueFull, SchedulerClosed) as e:
+        jobs.delete(job_id)
+        progress_by_job.pop(job_id, None)
+        status_code = 429 if isinstance(e, QueueFull) else 503
+        logger.warning(f"Rejected job ({status_code}): {e}")
+        return None, JSONResponse(
+            {"error": str(e), "queue": scheduler.stats()},
+            status_code=status_code,
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    # Outcome is recorded in the job store; mark the exception as retrieved for fire-and-forget jobs
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    return job_id, future
+
+
+@app.post("/run")
+async def run_async(request_body: dict, output: str = Query("file", enum=["file", "base64", "path"]), preset: str = Query(None)):
+    """Async job submission (serverless-compatible schema: {input:{...}})"""
+    job_input = request_body.get("input", request_body)
+    apply_preset(job_input, preset)
+    job_id, future = admit_job(job_input, output)
+    if job_id is None:
+        return future
+    return {"id": job_id, "status": "IN_QUEUE", "queue_position": scheduler.position(job_id)}
+
+
+def job_status(job_id: str):
+    """Status payload shared by /status and the progress streams. None if the job is unknown."""
+    job = jobs.get(job_id)
+    if not job:
+        return None
+    response = {
+        "id": job_id,
+        "status": job["status"],
+        "output": job.get("output"),
+        "error": job.get("error"),
+    }
+    if response["status"] == "IN_QUEUE":
+        response["queue_position"] = scheduler.position(job_id)
+    progress = progress_by_job.get(job_id)
+    if progress is not None and response["status"] in ("IN_QUEUE", "IN_PROGRESS"):
+        response["progress"] = progress.snapshot()
+    return response
+
+
+# Upper bound for ?wait= long-polls on /status
+STATUS_MAX_WAIT_SECONDS = float(os.getenv("STATUS_MAX_WAIT_SECONDS", "60"))
+
+
+async def wait_for_terminal(job_id: str, timeout: float):
+    """Return once the job's progress reaches a terminal stage, or after timeout seconds."""
+    progress = progress_by_job.get(job_id)
+    if progress is None:
+        return
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    entry = progress.subscribe()
+    try:
+        while True:
+            snapshot = await asyncio.wait_for(entry[1].get(), max(0.0, deadline - loop.time()))
+            if snapshot["stage"] in ("completed", "failed"):
+                return
+    except asyncio.TimeoutError:
+        pass
+    finally:
+        progress.unsubscribe(entry)
 
 
 @app.get("/status/{job_id}")
-def get_status(job_id: str):
-    """Return job status and (if completed) outputs."""
-    with lock:
-        job = jobs.get(job_id)
-        if not job:
-            return JSONResponse({"error": "Job not found"}, status_code=404)
-        return {
-            "id": job_id,
-            "status": job["status"],
-            "output": job.get("output"),
-            "error": job.get("error"),
-        }
+async def get_status(job_id: str, wait: float = Query(0, ge=0)):
+    """Return job status, live progress while running and (if completed) outputs.
+
+    With wait=N (seconds, capped at STATUS_MAX_WAIT_SECONDS) a queued or running job
+    is held until it finishes or N elapses, so pollers learn the outcome immediately.
+    """
+    response = job_status(job_id)
+    if response is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
+    if wait > 0 and response["status"] in ("IN_QUEUE", "IN_PROGRESS"):
+        await wait_for_terminal(job_id, min(wait, STATUS_MAX_WAIT_SECONDS))
+        response = job_status(job_id)
+    return response
+
+
+# ----------------- Progress streams -----------------
+
+STREAM_HEARTBEAT_SECONDS = 15
+
+
+async def progress_updates(job_id: str):
+    """Yield ("progress", snapshot) on every change, None as a heartbeat, and finally ("status", payload)."""
+    progress = progress_by_job.get(job_id)
+    if progress is not None:
+        entry = progress.subscribe()
+        try:
+            while True:
+                try:
+                    snapshot = await asyncio.wait_for(entry[1].get(), STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                yield "progress", snapshot
+                if snapshot["stage"] in ("completed", "failed"):
+                    break
+        finally:
+            progress.unsubscribe(entry)
+    yield "status", job_status(job_id)
+
+
+@app.get("/stream/{job_id}")
+async def stream_progress(job_id: str):
+    """Server-Sent Events: "progress" events while the job runs, then one "status" event."""
+    if jobs.get(job_id) is None:
+        return JSONResponse({"error": "Job not found"}, status_code=404)
+
+    async def events():
+        async for update in progress_updates(job_id):
+            if update is None:
+                yield ": keep-alive\n\n"
+                continue
+            event, payload = update
+            yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    return StreamingResponse(
+        events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.websocket("/ws/{job_id}")
+async def websocket_progress(websocket: WebSocket, job_id: str):
+    """WebSocket variant of /stream: {"type": "progress"|"status"|"ping", ...} messages."""
+    await websocket.accept()
+    if jobs.get(job_id) is None:
+        await websocket.send_json({"type": "error", "error": "Job not found"})
+        await websocket.close(code=4404)
+        return
+    try:
+        async for update in progress_updates(job_id):
+            if update is None:
+                await websocket.send_json({"type": "ping"})
+                continue
+            event, payload = update
+            await websocket.send_json({"type": event, **(payload or {})})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
+# ----------------- Result files and retention -----------------
+
+SWEEP_INTERVAL_SECONDS = int(os.getenv("SWEEP_INTERVAL_SECONDS", "60"))
+background_tasks = set()
+
+
+def materialize_base64(video_b64: str, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    decode_base64_to_file(video_b64, path)
+    return path
+
+
+def materialize_result(job_id: str, result: dict):
+    """Return the API-owned file behind this result, if any.
+
+    Only files under RESULTS_DIR are owned (and later deleted) by the API; network-volume
+    paths are served but never evicted. Base64 results get a file on their first /download.
+    """
+    if not result:
+        return None
+    path = result.get("video_path")
+    if path and os.path.abspath(path).startswith(os.path.abspath(RESULTS_DIR) + os.sep):
+        return path
+    return None
+
+
+def sweep_results(now: float = None):
+    """Apply job store retention and delete the result files it released."""
+    expired_files = jobs.sweep(now)
+    for path in expired_files:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    if expired_files:
+        logger.info(f"Removed {len(expired_files)} expired result files")
+
+
+def sweep_uploads(now: float = None):
+    """Delete upload directories older than UPLOAD_TTL_SECONDS."""
+    now = now or time.time()
+    try:
+        entries = list(os.scandir(UPLOAD_DIR))
+    except FileNotFoundError:
+        return
+    removed = 0
+    for entry in entries:
+        try:
+            expired = entry.is_dir() and now - entry.stat().st_mtime > UPLOAD_TTL_SECONDS
+        except FileNotFoundError:
+            continue
+        if expired:
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    if removed:
+        logger.info(f"Removed {removed} expired upload directories")
+
+
+async def sweep_results_periodically():
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(sweep_results)
+            await asyncio.to_thread(sweep_uploads)
+            await asyncio.to_thread(comfy_outputs.maybe_sweep)
+        except Exception as e:
+            logger.warning(f"Result sweep failed: {e}")
+
+
+_decode_lock = threading.Lock()
+
+
+def decode_result_file(job_id: str, video_b64: str):
+    """Decode a base64 result into RESULTS_DIR once and record it as the job's result_file."""
+    path = os.path.join(RESULTS_DIR, f"infinitetalk_{job_id}.mp4")
+    with _decode_lock:
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            materialize_base64(video_b64, tmp_path)
+            os.replace(tmp_path, path)
+            jobs.update(job_id, result_file=path)
+    return path
 
 
 @app.get("/download/{job_id}")
-def download_result(job_id: str):
+def download_result(job_id: str, request: Request):
     """Download the generated file using correct MIME and ext."""
-    with lock:
-        job = jobs.get(job_id)
-        if not job or job["status"] != "COMPLETED":
-            return JSONResponse({"error": "Job not ready"}, status_code=404)
-        result = job["output"]
+    job = jobs.get(job_id)
+    if not job or job["status"] != "COMPLETED":
+        return JSONResponse({"error": "Job not ready"}, status_code=404)
+    result = job["output"]
+    result_file = job.get("result_file")
     if not result:
         return JSONResponse({"error": "No output"}, status_code=404)
+    if result.get("expired"):
+        return JSONResponse({"error": "Output expired"}, status_code=410)
+
+    if result_file and os.path.exists(result_file):
+        return stream_file(request, result_file)
 
     if "video_path" in result and os.path.exists(result["video_path"]):
-        ext, mime = detect_mime_and_ext(result["video_path"])
-        fname = os.path.basename(result["video_path"])
-        return FileResponse(result["video_path"], media_type=mime, filename=fname)
+        return stream_file(request, result["video_path"])
 
+    # Base64 results are decoded on the first download only; later requests reuse the file
     if "video" in result:
-        decoded = base64.b64decode(result["video"])
-        tmp_dir = tempfile.mkdtemp()
-        tmp_file = os.path.join(tmp_dir, result.get("filename", "result.mp4"))
-        with open(tmp_file, "wb") as f:
-            f.write(decoded)
-        ext, mime = detect_mime_and_ext(tmp_file)
-        return FileResponse(tmp_file, media_type=mime, filename=os.path.basename(tmp_file))
+        return stream_file(request, decode_result_file(job_id, result["video"]))
+    if result.get("base64_expired"):
+        return JSONResponse({"error": "Output expired"}, status_code=410)
 
     return JSONResponse({"error": "Output unavailable"}, status_code=500)
 
 
 @app.post("/runsync")
-def run_sync(request_body: dict, output: str = Query("file", enum=["file", "base64", "path"]), preset: str = Query(None)):
+async def run_sync(request: Request, request_body: dict, output: str = Query("file", enum=["file", "base64", "path"]), preset: str = Query(None)):
     """Blocking call that runs the job synchronously (like serverless /runsync)."""
     job_input = request_body.get("input", request_body)
-    if preset == "fast":
-        job_input.setdefault("width", 256)
-        job_input.setdefault("height", 256)
-        job_input.setdefault("max_frame", 60)
-    result = run_inference(job_input)
+    apply_preset(job_input, preset)
+    job_id, future = admit_job(job_input, output)
+    if job_id is None:
+        return future
+    try:
+        result = await asyncio.shield(future)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
     if "error" in result:
         return JSONResponse(result, status_code=500)
+    if output == "base64" and "video" in result:
+        return JSONResponse(result)
+    if output == "path" and "video_path" in result:
+        return JSONResponse(result)
     if "video_path" in result:
-        ext, mime = detect_mime_and_ext(result["video_path"])
-        return FileResponse(result["video_path"], media_type=mime, filename=os.path.basename(result["video_path"]))
-    if "video" in result:
-        decoded = base64.b64decode(result["video"])
-        tmp_dir = tempfile.mkdtemp()
-        temp_path = os.path.join(tmp_dir, result.get("filename", "result.mp4"))
-        with open(temp_path, "wb") as f:
-            f.write(decoded)
-        ext, mime = detect_mime_and_ext(temp_path)
-        return FileResponse(temp_path, media_type=mime, filename=os.path.basename(temp_path))
+        return stream_file(request, result["video_path"])
+    result_file = (jobs.get(job_id) or {}).get("result_file")
+    if result_file:
+        return stream_file(request, result_file)
     return JSONResponse({"error": "Unknown result format"}, status_code=500)
 
 
@@ -162,7 +544,7 @@ def run_sync(request_body: dict, output: str = Query("file", enum=["file", "base
 async def infer(request: Request, output: str = Query("file", enum=["file", "base64", "path"])):
     """Run inference and return output as file, base64 JSON, or path."""
     body = await request.json()
-    result = run_inference(body)
+    result = await run_inference_async(body)
 
     # Error case
     if "error" in result:
@@ -176,11 +558,8 @@ async def infer(request: Request, output: str = Query("file", enum=["file", "bas
         if output == "base64":
             return JSONResponse(content=result)
         # Convert base64 to temporary file
-        decoded = base64.b64decode(result["video"])
-        tmp_dir = tempfile.mkdtemp()
-        tmp_path = os.path.join(tmp_dir, "result.mp4")
-        with open(tmp_path, "wb") as f:
-            f.write(decoded)
+        tmp_path = os.path.join(RESULTS_DIR, f"infinitetalk_{uuid.uuid4()}.mp4")
+        await asyncio.to_thread(materialize_base64, result["video"], tmp_path)
         return FileResponse(tmp_path, media_type="video/mp4", filename="result.mp4")
 
     # If returning path-based video
@@ -0,0 +1,196 @@
+import logging
+import mmap
+import os
+import struct
+
+logger = logging.getLogger(__name__)
+
+# MPEG audio tables indexed by [version][layer] (version: 1 = MPEG-1, 2 = MPEG-2/2.5; layer 1..3)
+_MP3_BITRATES = {
+    (1, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (1, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (1, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (2, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (2, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (2, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+_MP3_LAYERS = {3: 1, 2: 2, 1: 3}
+
+
+def _wav_duration(f, file_size):
+    riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+    if riff != b"RIFF" or wave != b"WAVE":
+        return None
+    byte_rate = None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            return None
+        chunk_id, chunk_size = struct.unpack("<4sI", header)
+        if chunk_id == b"fmt ":
+            fmt = f.read(chunk_size)
+            byte_rate = struct.unpack("<I", fmt[8:12])[0]
+            f.seek(chunk_size % 2, os.SEEK_CUR)
+        elif chunk_id == b"data":
+            if not byte_rate:
+                return None
+            # Streamed writers leave the size unset; the data then runs to end of file
+            if chunk_size in (0, 0xFFFFFFFF):
+                chunk_size = file_size - f.tell()
+            return min(chunk_size, file_size - f.tell()) / byte_rate
+        else:
+            f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+
+def _flac_duration(f):
+    if f.read(4) != b"fLaC":
+        return None
+    block_header = f.read(4)
+    if len(block_header) < 4 or block_header[0] & 0x7F != 0:
+        return None
+    info = f.read(34)
+    if len(info) < 34:
+        return None
+    # 20 bits sample rate, 3 bits channels, 5 bits bits-per-sample, 36 bits total samples
+    packed = int.from_bytes(info[10:18], "big")
+    sample_rate = packed >> 44
+    total_samples = packed & ((1 << 36) - 1)
+    if not sample_rate or not total_samples:
+        return None
+    return total_samples / sample_rate
+
+
+def _iter_boxes(f, end):
+    while f.tell() + 8 <= end:
+        start = f.tell()
+        size, box_type = struct.unpack(">I4s", f.read(8))
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+        elif size == 0:
+            size = end - start
+        if size < 8:
+            return
+        yield box_type, start, f.tell(), start + size
+        f.seek(start + size)
+
+
+def _mp4_duration(f, file_size):
+    for box_type, _, body, box_end in _iter_boxes(f, file_size):
+        if box_type != b"moov":
+            continue
+        f.seek(body)
+        for child_type, _, child_body, _ in _iter_boxes(f, box_end):
+            if child_type != b"mvhd":
+                continue
+            f.seek(child_body)
+            version = f.read(4)[0]
+            if version == 1:
+                _, _, timescale, duration = struct.unpack(">QQIQ", f.read(28))
+                unknown = 0xFFFFFFFFFFFFFFFF
+            else:
+                _, _, timescale, duration = struct.unpack(">IIII", f.read(16))
+                unknown = 0xFFFFFFFF
+            if not timescale or duration in (0, unknown):
+                return None
+            return duration / timescale
+        return None
+    return None
+
+
+def _mp3_frame(buf, pos):
+    """Decode the frame header at pos. Returns (frame_length, samples, sample_rate, version, mono) or None."""
+    if pos + 4 > len(buf) or buf[pos] != 0xFF or buf[pos + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2, b3 = buf[pos + 1], buf[pos + 2], buf[pos + 3]
+    version_bits = (b1 >> 3) & 0x03
+    layer = _MP3_LAYERS.get((b1 >> 1) & 0x03)
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0x03
+    if version_bits == 1 or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    version = 1 if version_bits == 3 else 2
+    bitrate = _MP3_BITRATES[(version, layer)][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version_bits][rate_index]
+    padding = (b2 >> 1) & 0x01
+    if layer == 1:
+        return (12 * bitrate // sample_rate + padding) * 4, 384, sample_rate, version, False
+    samples = 576 if layer == 3 and version == 2 else 1152
+    length = samples // 8 * bitrate // sample_rate + padding
+    return length, samples, sample_rate, version, (b3 >> 6) == 3
+
+
+def _mp3_duration(buf):
+    pos = 0
+    if buf[:3] == b"ID3" and len(buf) >= 10:
+        # ID3v2 size is syncsafe (7 bits per byte), plus a 10-byte footer when flagged
+        size = (buf[6] << 21) | (buf[7] << 14) | (buf[8] << 7) | buf[9]
+        pos = 10 + size + (10 if buf[5] & 0x10 else 0)
+    end = len(buf) - (128 if buf[-128:-125] == b"TAG" else 0)
+    # Resync to the first frame whose successor also parses, to skip junk after tags
+    limit = min(end, pos + 64 * 1024)
+    while pos < limit:
+        frame = _mp3_frame(buf, pos)
+        if frame and (pos + frame[0] >= end or _mp3_frame(buf, pos + frame[0])):
+            break
+        pos += 1
+    else:
+        return None
+    length, samples, sample_rate, version, mono = frame
+
+    side_info = (17 if mono else 32) if version == 1 else (9 if mono else 17)
+    xing = pos + 4 + side_info
+    if buf[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", buf[xing + 4:xing + 8])[0]
+        if flags & 0x01:
+            frames = struct.unpack(">I", buf[xing + 8:xing + 12])[0]
+            return frames * samples / sample_rate
+    vbri = pos + 36
+    if buf[vbri:vbri + 4] == b"VBRI":
+        frames = struct.unpack(">I", buf[vbri + 14:vbri + 18])[0]
+        return frames * samples / sample_rate
+
+    # No VBR header: walk frame headers (cheap on an mmap) and sum their samples
+    total = 0
+    while pos < end:
+        frame = _mp3_frame(buf, pos)
+        if frame is None:
+            break
+        total += frame[1]
+        pos += frame[0]
+    return total / sample_rate if total else None
+
+
+def probe_duration(path):
+    """Audio duration in seconds from container/header metadata, or None if it cannot be read cheaply."""
+    file_size = os.path.getsize(path)
+    if file_size < 12:
+        return None
+    with open(path, "rb") as f:
+        head = f.read(12)
+        f.seek(0)
+        if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+            return _wav_duration(f, file_size)
+        if head[:4] == b"fLaC":
+            return _flac_duration(f)
+        if head[4:8] == b"ftyp":
+            return _mp4_duration(f, file_size)
+        if head[:3] == b"ID3" or (head[0] == 0xFF and head[1] & 0xE0 == 0xE0):
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                return _mp3_duration(buf)
+    return None
+
+
+def get_duration(path):
+    """Header probe first; full decode through librosa (imported lazily) only when that fails."""
+    try:
+        duration = probe_duration(path)
+    except (OSError, struct.error, IndexError, ValueError) as e:
+        logger.debug(f"Header probe failed for {path}: {e}")
+        duration = None
+    if duration is not None:
+        return duration
+    logger.info(f"Falling back to librosa for duration of {path}")
+    import librosa
+
+    return librosa.get_duration(path=path)
@@ -0,0 +1,56 @@
+import binascii
+
+# Multiple of 4 so every full slice decodes without carry-over
+DECODE_CHUNK_CHARS = 4 * 1024 * 1024
+_WHITESPACE = b" \t\r\n"
+
+
+def strip_data_uri(data):
+    """Drop a leading 'data:<mime>;base64,' prefix if present."""
+    if data[:5] == "data:" or data[:5] == b"data:":
+        comma = data.find("," if isinstance(data, str) else b",", 0, 256)
+        if comma != -1:
+            return data[comma + 1:]
+    return data
+
+
+class Base64StreamDecoder:
+    """Incremental base64 decoder writing to a binary file object.
+
+    Input may arrive in arbitrary slices (including whitespace); only the
+    sub-4-character tail is carried between feeds, so memory stays bounded by
+    the slice size.
+    """
+
+    def __init__(self, out):
+        self.out = out
+        self.bytes_written = 0
+        self._carry = b""
+
+    def feed(self, chunk):
+        if isinstance(chunk, str):
+            chunk = chunk.encode("ascii")
+        chunk = chunk.translate(None, _WHITESPACE)
+        if self._carry:
+            chunk = self._carry + chunk
+        usable = len(chunk) - len(chunk) % 4
+        self._carry = chunk[usable:]
+        if usable:
+            decoded = binascii.a2b_base64(memoryview(chunk)[:usable])
+            self.out.write(decoded)
+            self.bytes_written += len(decoded)
+
+    def close(self):
+        if self._carry:
+            raise binascii.Error(f"Truncated base64 input ({len(self._carry)} trailing characters)")
+        return self.bytes_written
+
+
+def decode_base64_to_file(data, file_path, chunk_chars=DECODE_CHUNK_CHARS):
+    """Decode a base64 str/bytes into file_path slice by slice. Returns the decoded size."""
+    data = strip_data_uri(data)
+    with open(file_path, "wb") as f:
+        decoder = Base64StreamDecoder(f)
+        for start in range(0, len(data), chunk_chars):
+            decoder.feed(data[start:start + chunk_chars])
+        return decoder.close()
@@ -0,0 +1,59 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# Cold-start timeline in seconds since container boot. entrypoint.sh exports
+# WORKER_BOOT_TS; without it the timeline starts when this module is imported,
+# so entry modules import it first.
+BOOT_TS = float(os.getenv("WORKER_BOOT_TS") or time.time())
+FAST_START = os.getenv("FAST_START", "0") == "1"
+
+_marks = OrderedDict()
+_lock = threading.Lock()
+_reported = False
+
+
+def mark(event, ts=None):
+    """Record the first occurrence of event (optionally at an earlier wall-clock ts)."""
+    with _lock:
+        if event in _marks:
+            return
+        _marks[event] = round((ts or time.time()) - BOOT_TS, 3)
+    logger.info(f"Cold start: {event} at +{_marks[event]}s")
+
+
+mark("python_start")
+
+
+def report():
+    with _lock:
+        marks = dict(_marks)
+    timeline = {"fast_start": FAST_START, "marks": marks}
+    if "imports_done" in marks:
+        timeline["import_seconds"] = round(marks["imports_done"] - marks["python_start"], 3)
+    if "warmup_done" in marks:
+        timeline["warmup_seconds"] = round(marks["warmup_done"] - marks["warmup_start"], 3)
+    if "first_job_done" in marks:
+        timeline["time_to_first_job_seconds"] = marks["first_job_done"]
+    return timeline
+
+
+def first_job_started():
+    mark("first_job_start")
+
+
+def first_job_finished(comfy_ready_at=None):
+    """Close the timeline on the first finished job and log the full report once."""
+    global _reported
+    if comfy_ready_at is not None:
+        mark("comfyui_ready", comfy_ready_at)
+    mark("first_job_done")
+    with _lock:
+        if _reported:
+            return
+        _reported = True
+    logger.info(f"Cold start report: {report()}")
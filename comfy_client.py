@@ -0,0 +1,692 @@
+import asyncio
+import http.client
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import urllib.parse
+import uuid
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+COMFY_PORT = 8188
+# Pool members give up reconnecting sooner so in-flight prompts fail over quickly
+BACKEND_CONNECT_SECONDS = float(os.getenv("BACKEND_CONNECT_SECONDS", "10"))
+# A backend that refused a submit is skipped for this long
+BACKEND_RETRY_SECONDS = float(os.getenv("BACKEND_RETRY_SECONDS", "15"))
+# Prompts whose events arrive before submit() has registered them
+MAX_ORPHAN_PROMPTS = 64
+# Upper bound for waiting on one prompt, so a lost prompt cannot hold a job slot forever
+PROMPT_TIMEOUT_SECONDS = float(os.getenv("PROMPT_TIMEOUT_SECONDS", "7200"))
+
+
+class ComfyUIClient:
+    """Long-lived ComfyUI connection: pooled keep-alive HTTP plus one WebSocket per client_id."""
+
+    def __init__(self, server_address, port=COMFY_PORT, client_id=None, pool_size=4, timeout=30, connect_timeout=180):
+        self.server_address = server_address
+        self.port = port
+        self.client_id = client_id or str(uuid.uuid4())
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._ws = None
+        self._ws_lock = threading.Lock()
+        self._ready = False
+        self.ready_at = None
+        # FAST_START: readiness comes from the WebSocket "status" event instead of HTTP polling
+        self.event_readiness = False
+        self._status_seen = threading.Event()
+        self.queue_remaining = None
+        # Event router state: one reader thread fans messages out to per-prompt handles
+        self._handles = {}
+        self._orphans = OrderedDict()
+        self._handles_lock = threading.Lock()
+        self._reader = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.server_address}:{self.port}"
+
+    @property
+    def ws_url(self):
+        return f"ws://{self.server_address}:{self.port}/ws?clientId={self.client_id}"
+
+    # ----------------- HTTP (keep-alive pool) -----------------
+
+    def _get_connection(self):
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return http.client.HTTPConnection(self.server_address, self.port, timeout=self.timeout)
+
+    def _release_connection(self, conn):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def request(self, method, path, body=None, headers=None, timeout=None):
+        """Send a request over a pooled connection and return (status, body bytes).
+
+        A pooled connection that the server already closed is retried once on a fresh one.
+        Requests with their own timeout use a throwaway connection.
+        """
+        headers = dict(headers or {})
+        for attempt in range(2):
+            if timeout is None:
+                conn = self._get_connection()
+            else:
+                conn = http.client.HTTPConnection(self.server_address, self.port, timeout=timeout)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.HTTPException, OSError) as e:
+                conn.close()
+                if attempt == 0 and not isinstance(e, (TimeoutError, ConnectionRefusedError)):
+                    logger.debug(f"Stale ComfyUI connection, retrying: {e}")
+                    continue
+                raise
+            if timeout is None and not response.will_close:
+                self._release_connection(conn)
+            else:
+                conn.close()
+            return response.status, data
+
+    def request_json(self, method, path, payload=None):
+        body = None
+        headers = {}
+        if payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        status, data = self.request(method, path, body=body, headers=headers)
+        if status >= 400:
+            raise ComfyUIHTTPError(status, data.decode("utf-8", errors="replace"))
+        return json.loads(data) if data else None
+
+    # ----------------- Readiness -----------------
+
+    def is_alive(self, timeout=3):
+        try:
+            status, _ = self.request("GET", "/", timeout=timeout)
+            return status < 500
+        except Exception:
+            return False
+
+    def _mark_ready(self):
+        self._ready = True
+        if self.ready_at is None:
+            self.ready_at = time.time()
+
+    def wait_until_ready(self, max_attempts=180, interval=1):
+        """Block until ComfyUI answers. Only the first call per process pays for the probe."""
+        if self._ready:
+            return
+        if self.event_readiness:
+            self.wait_for_status_event(max_attempts * interval)
+            return
+        for attempt in range(max_attempts):
+            if self.is_alive(timeout=5):
+                logger.info(f"ComfyUI HTTP ready at {self.base_url} (attempt {attempt + 1})")
+                self._mark_ready()
+                return
+            logger.warning(f"ComfyUI not reachable yet ({attempt + 1}/{max_attempts})")
+            time.sleep(interval)
+        raise ComfyUIUnavailable(f"ComfyUI at {self.base_url} did not become ready")
+
+    # ----------------- WebSocket -----------------
+
+    def wait_for_status_event(self, timeout=180):
+        """Start the reader and block until ComfyUI sends its first "status" message."""
+        self.start_listener()
+        if not self._status_seen.wait(timeout):
+            raise ComfyUIUnavailable(f"No status event from {self.ws_url} within {timeout}s")
+
+    def websocket(self, max_wait=None):
+        """Return the connected WebSocket for this client_id, (re)connecting when needed.
+
+        Retries back off from 0.25s to 5s, so a connection made while ComfyUI is
+        still booting succeeds shortly after its server starts listening.
+        """
+        import websocket
+
+        with self._ws_lock:
+            if self._ws is not None and self._ws.connected:
+                return self._ws
+            self._ws = None
+            deadline = time.monotonic() + (max_wait or self.connect_timeout)
+            delay = 0.25
+            attempt = 0
+            while True:
+                attempt += 1
+                ws = websocket.WebSocket()
+                try:
+                    ws.connect(self.ws_url, timeout=self.timeout)
+                    ws.settimeout(None)
+                    logger.info(f"WebSocket connected: {self.ws_url} (attempt {attempt})")
+                    self._ws = ws
+                    return ws
+                except Exception as e:
+                    self._ready = False
+                    if time.monotonic() + delay > deadline:
+                        raise ComfyUIUnavailable(f"Could not open WebSocket to {self.ws_url}: {e}")
+                    logger.info(f"WebSocket connect failed (attempt {attempt}), retrying in {delay}s: {e}")
+                    time.sleep(delay)
+                    delay = min(delay * 2, 5)
+
+    def reset_websocket(self):
+        with self._ws_lock:
+            if self._ws is not None:
+                try:
+                    self._ws.close()
+                except Exception:
+                    pass
+            self._ws = None
+            self._status_seen.clear()
+
+    @property
+    def connected(self):
+        """True while the WebSocket is up and ComfyUI has sent its status."""
+        return self._status_seen.is_set()
+
+    def stats(self):
+        return {"address": f"{self.server_address}:{self.port}", "connected": self.connected, "queue_remaining": self.queue_remaining}
+
+    # ----------------- Event router -----------------
+
+    def start_listener(self):
+        """Start the single background WebSocket reader (idempotent)."""
+        with self._handles_lock:
+            if self._reader is not None and self._reader.is_alive():
+                return
+            self._reader = threading.Thread(target=self._reader_loop, name="comfyui-ws-reader", daemon=True)
+            self._reader.start()
+
+    def _reader_loop(self):
+        ws = None
+        while True:
+            if ws is None:
+                try:
+                    ws = self.websocket()
+                except ComfyUIUnavailable as e:
+                    self._fail_pending(e)
+                    continue
+                self._recover_pending()
+            try:
+                out = ws.recv()
+            except Exception as e:
+                logger.warning(f"WebSocket reader disconnected, reconnecting: {e}")
+                self.reset_websocket()
+                ws = None
+                continue
+            if not isinstance(out, str):
+                # Binary frames are latent previews; nobody consumes them
+                continue
+            try:
+                message = json.loads(out)
+            except ValueError:
+                continue
+            self._route(message.get("type"), message.get("data") or {})
+
+    def _route(self, msg_type, data):
+        if msg_type == "status":
+            # Sent on connect and whenever the queue changes
+            self.queue_remaining = ((data.get("status") or {}).get("exec_info") or {}).get("queue_remaining")
+            if not self._status_seen.is_set():
+                self._mark_ready()
+                self._status_seen.set()
+            return
+        prompt_id = data.get("prompt_id")
+        if prompt_id is None:
+            return
+        with self._handles_lock:
+            handle = self._handles.get(prompt_id)
+            if handle is None:
+                # Events can outrun the /prompt response; keep them until submit() registers the handle
+                self._orphans.setdefault(prompt_id, []).append((msg_type, data))
+                while len(self._orphans) > MAX_ORPHAN_PROMPTS:
+                    self._orphans.popitem(last=False)
+                return
+        handle._dispatch(msg_type, data)
+        if handle.done:
+            self._forget(prompt_id)
+
+    def _forget(self, prompt_id):
+        with self._handles_lock:
+            self._handles.pop(prompt_id, None)
+
+    def _recover_pending(self):
+        """After a reconnect, finish any prompt whose completion we missed while offline.
+
+        A prompt in neither history nor queue was lost (ComfyUI restarted) and fails
+        with ComfyUIUnavailable, so a pool can fail it over.
+        """
+        with self._handles_lock:
+            pending = list(self._handles.values())
+        if not pending:
+            return
+        try:
+            queued = self.queued_prompt_ids()
+        except Exception as e:
+            logger.warning(f"Queue check failed after reconnect: {e}")
+            queued = None
+        for handle in pending:
+            try:
+                history = self.get_history(handle.prompt_id)
+            except Exception as e:
+                logger.warning(f"History check failed for {handle.prompt_id}: {e}")
+                continue
+            entry = (history or {}).get(handle.prompt_id)
+            if not entry:
+                if queued is not None and handle.prompt_id not in queued:
+                    logger.warning(f"Prompt {handle.prompt_id} is gone from {self.base_url} (ComfyUI restarted?)")
+                    self._forget(handle.prompt_id)
+                    handle._fail(ComfyUIUnavailable(f"Prompt {handle.prompt_id} was lost by {self.base_url}"))
+                continue
+            status = entry.get("status") or {}
+            if status.get("status_str") == "error":
+                handle._dispatch("execution_error", {"prompt_id": handle.prompt_id, "exception_message": "see history"})
+            else:
+                handle._dispatch("executing", {"prompt_id": handle.prompt_id, "node": None})
+            self._forget(handle.prompt_id)
+
+    def _fail_pending(self, error):
+        with self._handles_lock:
+            pending = list(self._handles.values())
+            self._handles.clear()
+        for handle in pending:
+            handle._fail(error)
+
+    # ----------------- ComfyUI API -----------------
+
+    def submit(self, prompt):
+        """Queue a prompt and return a PromptHandle that receives its events."""
+        # The socket must be open before queueing, or ComfyUI has nowhere to send the events
+        self.websocket()
+        self.start_listener()
+        result = self.queue_prompt(prompt)
+        handle = PromptHandle(result["prompt_id"], result)
+        handle._canceller = lambda error: self.cancel(handle.prompt_id)
+        with self._handles_lock:
+            self._handles[handle.prompt_id] = handle
+            early = self._orphans.pop(handle.prompt_id, [])
+        for msg_type, data in early:
+            handle._dispatch(msg_type, data)
+        if handle.done:
+            self._forget(handle.prompt_id)
+        return handle
+
+    def queue_prompt(self, prompt):
+        return self.request_json("POST", "/prompt", {"prompt": prompt, "client_id": self.client_id})
+
+    def get_history(self, prompt_id):
+        return self.request_json("GET", f"/history/{prompt_id}")
+
+    def _queue_state(self):
+        """(running, pending) prompt ids from GET /queue."""
+        queue_state = self.request_json("GET", "/queue") or {}
+        return tuple(
+            {item[1] for item in queue_state.get(key) or [] if len(item) > 1} for key in ("queue_running", "queue_pending")
+        )
+
+    def queued_prompt_ids(self):
+        """Prompt ids ComfyUI is running or still has queued."""
+        running, pending = self._queue_state()
+        return running | pending
+
+    def cancel(self, prompt_id):
+        """Stop routing events to a prompt and remove it from ComfyUI: interrupt it if running, else dequeue it."""
+        self._forget(prompt_id)
+        running, _ = self._queue_state()
+        if prompt_id in running:
+            self.request_json("POST", "/interrupt", {"prompt_id": prompt_id})
+        else:
+            self.request_json("POST", "/queue", {"delete": [prompt_id]})
+        logger.info(f"Cancelled prompt {prompt_id} on {self.base_url}")
+
+    def get_image(self, filename, subfolder, folder_type):
+        query = urllib.parse.urlencode({"filename": filename, "subfolder": subfolder, "type": folder_type})
+        status, data = self.request("GET", f"/view?{query}")
+        if status >= 400:
+            raise ComfyUIHTTPError(status, data.decode("utf-8", errors="replace"))
+        return data
+
+    def close(self):
+        self.reset_websocket()
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class PromptHandle:
+    """Events for one queued prompt, delivered by the client's shared WebSocket reader."""
+
+    def __init__(self, prompt_id, queue_response=None):
+        self.prompt_id = prompt_id
+        self.queue_response = queue_response or {}
+        self.current_node = None
+        # Sampler progress ("progress" events): step out of steps on progress_node
+        self.step = None
+        self.steps = None
+        self.outputs = {}
+        self.error = None
+        self._done = threading.Event()
+        self._listeners = []
+        self._done_callbacks = []
+        self._callbacks_lock = threading.Lock()
+        # Set by the owning client: canceller(error) removes the prompt from ComfyUI
+        self._canceller = None
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def add_listener(self, callback):
+        """Register callback(msg_type, data); it runs on the reader thread and must not block."""
+        self._listeners.append(callback)
+
+    def _dispatch(self, msg_type, data):
+        if self.done:
+            return
+        if msg_type == "executing":
+            self.current_node = data.get("node")
+        elif msg_type == "progress":
+            self.step, self.steps = data.get("value"), data.get("max")
+        elif msg_type == "executed":
+            self.outputs[data.get("node")] = data.get("output")
+        elif msg_type == "execution_error":
+            self.error = ComfyUIExecutionError(self.prompt_id, data)
+        elif msg_type == "execution_interrupted":
+            self.error = ComfyUIExecutionError(self.prompt_id, data, interrupted=True)
+        for callback in list(self._listeners):
+            try:
+                callback(msg_type, data)
+            except Exception as e:
+                logger.warning(f"Prompt listener failed: {e}")
+        finished = (msg_type == "executing" and data.get("node") is None) or msg_type == "execution_success"
+        if finished or self.error is not None:
+            self._finish()
+
+    def _fail(self, error):
+        if self.done:
+            return
+        self.error = error
+        self._finish()
+
+    def _finish(self):
+        with self._callbacks_lock:
+            self._done.set()
+            callbacks, self._done_callbacks = self._done_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def _on_done(self, callback):
+        with self._callbacks_lock:
+            if not self._done.is_set():
+                self._done_callbacks.append(callback)
+                return
+        callback()
+
+    def cancel(self, error):
+        """Give up on the prompt: have its client drop it from ComfyUI, then fail it with error."""
+        canceller, self._canceller = self._canceller, None
+        if canceller is not None and not self.done:
+            try:
+                canceller(error)
+            except Exception as e:
+                logger.warning(f"Could not cancel prompt {self.prompt_id}: {e}")
+        self._fail(error)
+
+    def wait(self, timeout=PROMPT_TIMEOUT_SECONDS):
+        """Block until the prompt finishes; raise if it failed. On timeout the prompt is cancelled."""
+        if not self._done.wait(timeout):
+            self.cancel(TimeoutError(f"Prompt {self.prompt_id} did not finish within {timeout}s"))
+        if self.error is not None:
+            raise self.error
+        return self
+
+    async def wait_async(self, timeout=PROMPT_TIMEOUT_SECONDS):
+        """Await completion without parking a thread; the reader thread wakes the event loop."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def _wake():
+            if not future.done():
+                future.set_result(None)
+
+        self._on_done(lambda: loop.call_soon_threadsafe(_wake))
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            # Cancelling talks to ComfyUI over HTTP; keep that off the event loop
+            await asyncio.to_thread(self.cancel, TimeoutError(f"Prompt {self.prompt_id} did not finish within {timeout}s"))
+        if self.error is not None:
+            raise self.error
+        return self
+
+
+class ComfyUIExecutionError(Exception):
+    def __init__(self, prompt_id, data, interrupted=False):
+        reason = "interrupted" if interrupted else data.get("exception_message", "execution error")
+        super().__init__(f"Prompt {prompt_id} failed on node {data.get('node_id')}: {reason}")
+        self.prompt_id = prompt_id
+        self.data = data
+
+
+class ComfyUIHTTPError(Exception):
+    def __init__(self, status, body):
+        super().__init__(f"ComfyUI HTTP {status}: {body}")
+        self.status = status
+        self.body = body
+
+
+class ComfyUIUnavailable(Exception):
+    pass
+
+
+class _Backend:
+    def __init__(self, client):
+        self.client = client
+        self.inflight = 0
+        self.down_until = 0.0
+
+    @property
+    def load(self):
+        # Our own in-flight count reacts immediately; ComfyUI's queue also counts other clients
+        return max(self.inflight, self.client.queue_remaining or 0)
+
+
+class ComfyUIPool:
+    """Several ComfyUI instances behind the ComfyUIClient interface.
+
+    Prompts go to the least-loaded connected backend. A prompt whose backend
+    drops off mid-run is resubmitted to another one under the same handle.
+    """
+
+    def __init__(self, addresses, connect_timeout=BACKEND_CONNECT_SECONDS):
+        self.client_id = str(uuid.uuid4())
+        self.backends = [
+            _Backend(ComfyUIClient(host, port, client_id=self.client_id, connect_timeout=connect_timeout))
+            for host, port in addresses
+        ]
+        self.event_readiness = True
+        self._ready = False
+        self.ready_at = None
+        self._lock = threading.Lock()
+        self._owners = OrderedDict()
+        self._next = 0
+
+    @property
+    def base_url(self):
+        return ",".join(b.client.base_url for b in self.backends)
+
+    def start_listener(self):
+        for backend in self.backends:
+            backend.client.start_listener()
+
+    def wait_until_ready(self, max_attempts=180, interval=1):
+        """Block until at least one backend is connected."""
+        if self._ready:
+            return
+        self.start_listener()
+        deadline = time.monotonic() + max_attempts * interval
+        while time.monotonic() < deadline:
+            if any(b.client.connected for b in self.backends):
+                self._ready = True
+                self.ready_at = self.ready_at or time.time()
+                logger.info(f"ComfyUI pool ready: {self.stats()}")
+                return
+            time.sleep(0.25)
+        raise ComfyUIUnavailable(f"No ComfyUI backend reachable at {self.base_url}")
+
+    def wait_for_status_event(self, timeout=180):
+        self.wait_until_ready(max_attempts=int(timeout), interval=1)
+
+    def _pick(self, exclude=()):
+        now = time.monotonic()
+        with self._lock:
+            candidates = [
+                b for b in self.backends if b not in exclude and b.client.connected and b.down_until <= now
+            ]
+            if not candidates:
+                return None
+            # Rotate the start point so equal loads spread round-robin
+            self._next = (self._next + 1) % len(self.backends)
+            order = sorted(
+                candidates, key=lambda b: (b.load, (self.backends.index(b) - self._next) % len(self.backends))
+            )
+            backend = order[0]
+            backend.inflight += 1
+            return backend
+
+    def _mark_down(self, backend, error):
+        backend.down_until = time.monotonic() + BACKEND_RETRY_SECONDS
+        logger.warning(f"ComfyUI backend {backend.client.base_url} marked down: {error}")
+
+    def _submit_once(self, prompt, exclude):
+        """Submit to the best backend, skipping ones that fail. Returns (backend, handle)."""
+        tried = list(exclude)
+        while True:
+            backend = self._pick(tried)
+            if backend is None:
+                raise ComfyUIUnavailable(f"No healthy ComfyUI backend among {self.base_url}")
+            try:
+                return backend, backend.client.submit(prompt)
+            except (OSError, http.client.HTTPException, ComfyUIUnavailable) as e:
+                with self._lock:
+                    backend.inflight -= 1
+                self._mark_down(backend, e)
+                tried.append(backend)
+
+    def submit(self, prompt):
+        self.start_listener()
+        backend, handle = self._submit_once(prompt, ())
+        pool_handle = PromptHandle(handle.prompt_id, handle.queue_response)
+        self._link(pool_handle, prompt, backend, handle, [backend])
+        return pool_handle
+
+    def _link(self, pool_handle, prompt, backend, handle, tried):
+        pool_handle.prompt_id = handle.prompt_id
+        pool_handle.queue_response = handle.queue_response
+        with self._lock:
+            self._owners[handle.prompt_id] = backend
+            while len(self._owners) > 1024:
+                self._owners.popitem(last=False)
+        handle.add_listener(pool_handle._dispatch)
+        # Cancelling the pool handle cancels the current backend prompt, whose on_done releases inflight
+        pool_handle._canceller = handle.cancel
+
+        def on_done():
+            with self._lock:
+                backend.inflight -= 1
+            if pool_handle.done:
+                return
+            if isinstance(handle.error, ComfyUIUnavailable) and len(tried) < len(self.backends):
+                self._mark_down(backend, handle.error)
+                # on_done runs on the reader thread, which must not block on a new submit
+                threading.Thread(target=self._failover, args=(pool_handle, prompt, tried), daemon=True).start()
+            elif handle.error is not None:
+                pool_handle._fail(handle.error)
+            else:
+                # Finished before our listener was attached (events drained inside submit)
+                pool_handle.outputs.update(handle.outputs)
+                pool_handle._finish()
+
+        handle._on_done(on_done)
+
+    def _failover(self, pool_handle, prompt, tried):
+        logger.warning(f"Resubmitting prompt {pool_handle.prompt_id} after backend loss")
+        try:
+            backend, handle = self._submit_once(prompt, tried)
+        except Exception as e:
+            pool_handle._fail(e)
+            return
+        self._link(pool_handle, prompt, backend, handle, tried + [backend])
+
+    def _owner(self, prompt_id):
+        with self._lock:
+            backend = self._owners.get(prompt_id)
+        return backend.client if backend else self.backends[0].client
+
+    def get_history(self, prompt_id):
+        return self._owner(prompt_id).get_history(prompt_id)
+
+    def get_image(self, filename, subfolder, folder_type):
+        last_error = None
+        for backend in self.backends:
+            try:
+                return backend.client.get_image(filename, subfolder, folder_type)
+            except (ComfyUIHTTPError, OSError) as e:
+                last_error = e
+        raise last_error
+
+    def request(self, method, path, body=None, headers=None, timeout=None):
+        """Plain request against the first connected backend (used by health checks)."""
+        connected = [b for b in self.backends if b.client.connected] or self.backends
+        return connected[0].client.request(method, path, body=body, headers=headers, timeout=timeout)
+
+    def stats(self):
+        return {"backends": [dict(b.client.stats(), inflight=b.inflight) for b in self.backends]}
+
+    def close(self):
+        for backend in self.backends:
+            backend.client.close()
+
+
+def parse_backends(value):
+    """'host[:port],host[:port]' -> [(host, port)]"""
+    backends = []
+    for item in value.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        host, _, port = item.rpartition(":") if ":" in item else (item, "", "")
+        backends.append((host, int(port) if port else COMFY_PORT))
+    return backends
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Process-wide ComfyUI client, created on first use.
+
+    SERVER_ADDRESS may list several backends ("host[:port],..."); they are then served by a ComfyUIPool.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            backends = parse_backends(os.getenv("SERVER_ADDRESS", "127.0.0.1"))
+            if len(backends) > 1:
+                _client = ComfyUIPool(backends)
+            else:
+                _client = ComfyUIClient(*backends[0])
+                _client.event_readiness = os.getenv("FAST_START", "0") == "1"
+        return _client
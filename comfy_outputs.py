@@ -0,0 +1,110 @@
+import logging
+import os
+import shutil
+import threading
+import time
+
+from output_placement import same_filesystem
+
+logger = logging.getLogger(__name__)
+
+# Must match ComfyUI's --output-directory (entrypoint.sh passes COMFY_OUTPUT_DIR through) and its temp dir
+COMFY_OUTPUT_DIR = os.getenv("COMFY_OUTPUT_DIR", "/ComfyUI/output")
+COMFY_TEMP_DIR = os.getenv("COMFY_TEMP_DIR", "/ComfyUI/temp")
+# Per-job files go to <dir>/JOB_SUBFOLDER/<task_id>/; GC in the output dir never leaves this subfolder
+JOB_SUBFOLDER = "infinitetalk"
+# Artifacts older than this are deleted; above MAX_BYTES the oldest go first (never younger than MIN_AGE)
+COMFY_GC_TTL_SECONDS = int(os.getenv("COMFY_GC_TTL_SECONDS", str(6 * 3600)))
+COMFY_GC_MAX_BYTES = int(os.getenv("COMFY_GC_MAX_BYTES", str(20 * 1024 * 1024 * 1024)))
+COMFY_GC_MIN_AGE_SECONDS = int(os.getenv("COMFY_GC_MIN_AGE_SECONDS", "3600"))
+COMFY_GC_INTERVAL_SECONDS = int(os.getenv("COMFY_GC_INTERVAL_SECONDS", "600"))
+
+_last_sweep = {"at": None, "removed_files": 0, "removed_bytes": 0, "remaining_bytes": None}
+_sweep_lock = threading.Lock()
+
+
+def output_params(task_id, destination_dir=None):
+    """VHS_VideoCombine parameters for one job.
+
+    Files land in a job-scoped subfolder. When destination_dir shares a filesystem
+    with ComfyUI's output dir the encoder saves there (save_output), so placing the
+    result is a rename; otherwise it writes to the temp dir.
+    """
+    save_output = False
+    if destination_dir:
+        try:
+            os.makedirs(destination_dir, exist_ok=True)
+            save_output = os.path.isdir(COMFY_OUTPUT_DIR) and same_filesystem(COMFY_OUTPUT_DIR, destination_dir)
+        except OSError as e:
+            logger.debug(f"Cannot compare filesystems of {COMFY_OUTPUT_DIR} and {destination_dir}: {e}")
+    return {"output_prefix": f"{JOB_SUBFOLDER}/{task_id}/infinitetalk", "save_output": save_output}
+
+
+def cleanup_job_outputs(task_id):
+    """Remove whatever the job left in ComfyUI's output and temp dirs (segments, previews, pre-mux files)."""
+    for root in (COMFY_OUTPUT_DIR, COMFY_TEMP_DIR):
+        shutil.rmtree(os.path.join(root, JOB_SUBFOLDER, task_id), ignore_errors=True)
+
+
+def _collect(root):
+    files = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+    return files
+
+
+def _remove_empty_dirs(root):
+    for dirpath, _, _ in sorted(os.walk(root), key=lambda entry: len(entry[0]), reverse=True):
+        if dirpath != root:
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass
+
+
+def sweep(now=None):
+    """Delete old ComfyUI artifacts by age, then by total size. Returns the sweep summary."""
+    now = now or time.time()
+    roots = [COMFY_TEMP_DIR, os.path.join(COMFY_OUTPUT_DIR, JOB_SUBFOLDER)]
+    files = sorted(f for root in roots if os.path.isdir(root) for f in _collect(root))
+    total = sum(size for _, size, _ in files)
+    removed_files = removed_bytes = 0
+    for mtime, size, path in files:
+        age = now - mtime
+        if age > COMFY_GC_TTL_SECONDS or (total > COMFY_GC_MAX_BYTES and age > COMFY_GC_MIN_AGE_SECONDS):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed_files += 1
+            removed_bytes += size
+    for root in roots:
+        if os.path.isdir(root):
+            _remove_empty_dirs(root)
+    if removed_files:
+        logger.info(f"Removed {removed_files} ComfyUI artifacts ({removed_bytes} bytes), {total} bytes remain")
+    _last_sweep.update(at=now, removed_files=removed_files, removed_bytes=removed_bytes, remaining_bytes=total)
+    return dict(_last_sweep)
+
+
+def maybe_sweep():
+    """Sweep at most once per COMFY_GC_INTERVAL_SECONDS (serverless workers call this after each job)."""
+    if not _sweep_lock.acquire(blocking=False):
+        return None
+    try:
+        if _last_sweep["at"] and time.time() - _last_sweep["at"] < COMFY_GC_INTERVAL_SECONDS:
+            return None
+        return sweep()
+    finally:
+        _sweep_lock.release()
+
+
+def stats():
+    return dict(_last_sweep)
@@ -0,0 +1,115 @@
+import http.client
+import logging
+import os
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_TIMEOUT = float(os.getenv("DOWNLOAD_TIMEOUT", "30"))
+DOWNLOAD_RETRIES = int(os.getenv("DOWNLOAD_RETRIES", "3"))
+# 0 disables the limit
+MAX_DOWNLOAD_BYTES = int(os.getenv("MAX_DOWNLOAD_BYTES", str(2 * 1024 * 1024 * 1024)))
+USER_AGENT = "InfiniteTalk-Worker/1.0"
+
+
+class DownloadError(Exception):
+    pass
+
+
+class DownloadTooLarge(DownloadError):
+    pass
+
+
+def _open(url, offset):
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    if offset:
+        request.add_header("Range", f"bytes={offset}-")
+    return urllib.request.urlopen(request, timeout=DOWNLOAD_TIMEOUT)
+
+
+def _check_size(url, size, max_bytes):
+    if max_bytes and size > max_bytes:
+        raise DownloadTooLarge(f"{url} exceeds the {max_bytes} byte download limit")
+
+
+def download(url, output_path, max_bytes=MAX_DOWNLOAD_BYTES, retries=DOWNLOAD_RETRIES, on_headers=None):
+    """Stream url to output_path in chunks.
+
+    Interrupted transfers resume with a Range request when the server honours it
+    (206), otherwise the file is restarted from zero.
+
+    on_headers(headers) is called once with the headers of the first full response,
+    before its body is read. If it returns True, output_path has already been
+    provided (e.g. from a cache) and the body is not downloaded.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    part_path = output_path + ".part"
+    offset = 0
+    if os.path.exists(part_path):
+        os.remove(part_path)
+    for attempt in range(retries + 1):
+        try:
+            with _open(url, offset) as response:
+                if offset and response.status != 206:
+                    # Server ignored the Range header; start over
+                    offset = 0
+                if on_headers is not None and not offset:
+                    callback, on_headers = on_headers, None
+                    if callback(response.headers):
+                        return output_path
+                length = response.headers.get("Content-Length")
+                expected = offset + int(length) if length is not None else None
+                if expected is not None:
+                    _check_size(url, expected, max_bytes)
+                with open(part_path, "ab" if offset else "wb") as f:
+                    while True:
+                        chunk = response.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        offset += len(chunk)
+                        _check_size(url, offset, max_bytes)
+            if expected is not None and offset < expected:
+                raise ConnectionError(f"connection closed at byte {offset} of {expected}")
+            os.replace(part_path, output_path)
+            return output_path
+        except DownloadTooLarge:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset:
+                # Range not satisfiable: the partial file is stale
+                offset = 0
+            elif 400 <= e.code < 500 and e.code not in (408, 429):
+                raise DownloadError(f"{url}: HTTP {e.code} {e.reason}") from e
+            error = e
+        except (urllib.error.URLError, http.client.HTTPException, OSError) as e:
+            if os.path.exists(part_path):
+                offset = os.path.getsize(part_path)
+            error = e
+        if attempt < retries:
+            delay = min(2 ** attempt, 10)
+            logger.warning(f"Download of {url} failed ({error}); retry {attempt + 1}/{retries} in {delay}s at byte {offset}")
+            time.sleep(delay)
+    raise DownloadError(f"{url}: {error}")
+
+
+def download_all(items, max_workers=4, fetch=download):
+    """Download [(url, output_path), ...] concurrently; returns paths in the same order.
+
+    fetch(url, output_path) performs each transfer. The first failure is raised
+    after all transfers have settled.
+    """
+    items = list(items)
+    if not items:
+        return []
+    if len(items) == 1:
+        return [fetch(*items[0])]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items)), thread_name_prefix="download") as pool:
+        futures = [pool.submit(fetch, url, path) for url, path in items]
+    return [future.result() for future in futures]
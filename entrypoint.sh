@@ -3,27 +3,41 @@
 # Exit immediately if a command exits with a non-zero status.
 set -e
 
+# Cold-start timeline origin (read by coldstart.py)
+export WORKER_BOOT_TS=$(date +%s.%N)
+# Per-module import times on stderr (python -X importtime) when profiling cold starts
+if [ "${COLDSTART_IMPORTTIME:-0}" = "1" ]; then
+    export PYTHONPROFILEIMPORTTIME=1
+fi
+
 # Start ComfyUI in the background
 echo "Starting ComfyUI in the background..."
-python /ComfyUI/main.py --listen --use-sage-attention &
+# COMFY_OUTPUT_DIR on the network volume lets finished videos be renamed into place (see comfy_outputs.py)
+python /ComfyUI/main.py --listen --use-sage-attention ${COMFY_OUTPUT_DIR:+--output-directory "$COMFY_OUTPUT_DIR"} &
 
-# Wait for ComfyUI to be ready
-echo "Waiting for ComfyUI to be ready..."
-max_wait=120  # 최대 2분 대기
-wait_count=0
-while [ $wait_count -lt $max_wait ]; do
-    if curl -s http://127.0.0.1:8188/ > /dev/null 2>&1; then
-        echo "ComfyUI is ready!"
-        break
-    fi
-    echo "Waiting for ComfyUI... ($wait_count/$max_wait)"
-    sleep 2
-    wait_count=$((wait_count + 2))
-done
+if [ "${FAST_START:-0}" = "1" ]; then
+    # Worker imports and warms up while ComfyUI boots; readiness comes from ComfyUI's
+    # first WebSocket status event instead of this poll loop
+    echo "FAST_START=1: starting worker without waiting for ComfyUI"
+else
+    # Wait for ComfyUI to be ready
+    echo "Waiting for ComfyUI to be ready..."
+    max_wait=120  # 최대 2분 대기
+    wait_count=0
+    while [ $wait_count -lt $max_wait ]; do
+        if curl -s http://127.0.0.1:8188/ > /dev/null 2>&1; then
+            echo "ComfyUI is ready!"
+            break
+        fi
+        echo "Waiting for ComfyUI... ($wait_count/$max_wait)"
+        sleep 2
+        wait_count=$((wait_count + 2))
+    done
 
-if [ $wait_count -ge $max_wait ]; then
-    echo "Error: ComfyUI failed to start within $max_wait seconds"
-    exit 1
+    if [ $wait_count -ge $max_wait ]; then
+        echo "Error: ComfyUI failed to start within $max_wait seconds"
+        exit 1
+    fi
 fi
 
 # Start server mode based on SERVICE_MODE
@@ -1,16 +1,21 @@
-import runpod
+import coldstart  # 가장 먼저 import해야 콜드 스타트 타임라인이 정확함
 import os
-import websocket
-import base64
-import json
 import uuid
 import logging
-import urllib.request
-import urllib.parse
 import binascii  # Base64 에러 처리를 위해 import
-import subprocess
-import librosa
 import shutil
+from audio_probe import get_duration as probe_audio_duration
+from base64_stream import decode_base64_to_file
+from comfy_client import ComfyUIHTTPError, get_client
+from downloader import DownloadError, download, download_all
+from input_cache import fetch_base64, fetch_url, get_cache as get_input_cache
+from comfy_outputs import cleanup_job_outputs, maybe_sweep, output_params
+from output_placement import NETWORK_VOLUME_DIR, place_output, volume_path
+from output_uploader import get_uploader
+import result_cache
+import segmented
+from workflow_templates import get_template, get_templates
+from warmup import run_warmup
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -26,52 +31,40 @@ def truncate_base64_for_log(base64_str, max_length=50):
     return f"{base64_str[:max_length]}... (총 {len(base64_str)} 문자)"
 
 
-server_address = os.getenv("SERVER_ADDRESS", "127.0.0.1")
-client_id = str(uuid.uuid4())
+# 프로세스 전체에서 재사용하는 ComfyUI 클라이언트 (HTTP 커넥션 풀 + 웹소켓 유지)
+comfy = get_client()
+client_id = comfy.client_id
+# 워크플로우 JSON은 시작 시 한 번만 파싱/검증 (잘못된 워크플로우는 부팅 단계에서 실패)
+get_templates()
+coldstart.mark("imports_done")
 
 
-def download_file_from_url(url, output_path):
-    """URL에서 파일을 다운로드하는 함수"""
+def download_file_from_url(url, output_path, on_headers=None):
+    """URL에서 파일을 스트리밍 다운로드하는 함수 (재시도/이어받기/크기 제한 포함)"""
     try:
-        # wget을 사용하여 파일 다운로드
-        result = subprocess.run(
-            ["wget", "-O", output_path, "--no-verbose", "--timeout=30", url],
-            capture_output=True,
-            text=True,
-            timeout=60,
+        download(url, output_path, on_headers=on_headers)
+        logger.info(
+            f"✅ URL에서 파일을 성공적으로 다운로드했습니다: {url} -> {output_path}"
         )
-
-        if result.returncode == 0:
-            logger.info(
-                f"✅ URL에서 파일을 성공적으로 다운로드했습니다: {url} -> {output_path}"
-            )
-            return output_path
-        else:
-            logger.error(f"❌ wget 다운로드 실패: {result.stderr}")
-            raise Exception(f"URL 다운로드 실패: {result.stderr}")
-    except subprocess.TimeoutExpired:
-        logger.error("❌ 다운로드 시간 초과")
-        raise Exception("다운로드 시간 초과")
-    except Exception as e:
-        logger.error(f"❌ 다운로드 중 오류 발생: {e}")
-        raise Exception(f"다운로드 중 오류 발생: {e}")
+        return output_path
+    except DownloadError as e:
+        logger.error(f"❌ 다운로드 실패: {e}")
+        raise Exception(f"URL 다운로드 실패: {e}")
 
 
 def save_base64_to_file(base64_data, temp_dir, output_filename):
-    """Base64 데이터를 파일로 저장하는 함수"""
+    """Base64 데이터를 파일로 저장하는 함수 (고정 크기 조각 단위로 디코딩하여 메모리 사용 최소화)"""
     try:
-        # Base64 문자열 디코딩
-        decoded_data = base64.b64decode(base64_data)
-
         # 디렉토리가 존재하지 않으면 생성
         os.makedirs(temp_dir, exist_ok=True)
 
-        # 파일로 저장
+        # 조각 단위로 디코딩하며 바로 파일에 기록
         file_path = os.path.abspath(os.path.join(temp_dir, output_filename))
-        with open(file_path, "wb") as f:
-            f.write(decoded_data)
+        decoded_size = decode_base64_to_file(base64_data, file_path)
 
-        logger.info(f"✅ Base64 입력을 '{file_path}' 파일로 저장했습니다.")
+        logger.info(
+            f"✅ Base64 입력을 '{file_path}' 파일로 저장했습니다. ({decoded_size} bytes)"
+        )
         return file_path
     except (binascii.Error, ValueError) as e:
         logger.error(f"❌ Base64 디코딩 실패: {e}")
@@ -89,58 +82,97 @@ def process_input(input_data, temp_dir, output_filename, input_type):
         logger.info(f"🌐 URL 입력 처리: {input_data}")
         os.makedirs(temp_dir, exist_ok=True)
         file_path = os.path.abspath(os.path.join(temp_dir, output_filename))
-        return download_file_from_url(input_data, file_path)
+        # 동일 URL(+ETag)은 입력 캐시에서 하드링크 (GET 응답 헤더로 판단, 적중 시 본문은 받지 않음)
+        return fetch_url(input_data, file_path, download_file_from_url)
     elif input_type == "base64":
-        # Base64인 경우 디코딩하여 저장
+        # Base64인 경우 디코딩하여 저장 (동일 페이로드는 입력 캐시에서 하드링크)
         logger.info(f"🔢 Base64 입력 처리")
-        return save_base64_to_file(input_data, temp_dir, output_filename)
+        os.makedirs(temp_dir, exist_ok=True)
+        file_path = os.path.abspath(os.path.join(temp_dir, output_filename))
+        return fetch_base64(
+            input_data,
+            file_path,
+            lambda data, dest: save_base64_to_file(data, temp_dir, output_filename),
+        )
     else:
         raise Exception(f"지원하지 않는 입력 타입: {input_type}")
 
 
-def queue_prompt(prompt, input_type="image", person_count="single"):
-    url = f"http://{server_address}:8188/prompt"
-    logger.info(f"Queueing prompt to: {url}")
-    p = {"prompt": prompt, "client_id": client_id}
-    data = json.dumps(p).encode("utf-8")
-
-    # 디버깅을 위해 워크플로우 내용 로깅
-    logger.info(f"워크플로우 노드 수: {len(prompt)}")
-    if input_type == "image":
-        logger.info(
-            f"이미지 노드(284) 설정: {prompt.get('284', {}).get('inputs', {}).get('image', 'NOT_FOUND')}"
-        )
-    else:
-        logger.info(
-            f"비디오 노드(228) 설정: {prompt.get('228', {}).get('inputs', {}).get('video', 'NOT_FOUND')}"
-        )
-    logger.info(
-        f"오디오 노드(125) 설정: {prompt.get('125', {}).get('inputs', {}).get('audio', 'NOT_FOUND')}"
-    )
-    logger.info(
-        f"텍스트 노드(241) 설정: {prompt.get('241', {}).get('inputs', {}).get('positive_prompt', 'NOT_FOUND')}"
-    )
+def stage_inputs(job_input, task_id, input_type, person_count):
+    """미디어/오디오 입력을 파일로 준비. URL 입력들은 동시에 다운로드하여 가장 느린 것만큼만 대기"""
+    media_kind = "image" if input_type == "image" else "video"
+    media_filename = "input_image.jpg" if input_type == "image" else "input_video.mp4"
+    slots = [
+        ("media", [f"{media_kind}_path", f"{media_kind}_url", f"{media_kind}_base64"], media_filename),
+        ("wav", ["wav_path", "wav_url", "wav_base64"], "input_audio.wav"),
+    ]
     if person_count == "multi":
-        if "307" in prompt:
-            logger.info(
-                f"두 번째 오디오 노드(307) 설정: {prompt.get('307', {}).get('inputs', {}).get('audio', 'NOT_FOUND')}"
-            )
-        elif "313" in prompt:
-            logger.info(
-                f"두 번째 오디오 노드(313) 설정: {prompt.get('313', {}).get('inputs', {}).get('audio', 'NOT_FOUND')}"
+        slots.append(("wav_2", ["wav_path_2", "wav_url_2", "wav_base64_2"], "input_audio_2.wav"))
+
+    paths = {}
+    downloads = []
+    for slot, keys, filename in slots:
+        # 슬롯마다 path, url, base64 중 먼저 있는 하나만 사용
+        for key in keys:
+            if key not in job_input:
+                continue
+            kind = key.split("_")[1]
+            if kind == "url":
+                logger.info(f"🌐 URL 입력 처리: {job_input[key]}")
+                os.makedirs(task_id, exist_ok=True)
+                file_path = os.path.abspath(os.path.join(task_id, filename))
+                downloads.append((slot, job_input[key], file_path))
+            else:
+                paths[slot] = process_input(job_input[key], task_id, filename, kind)
+            break
+
+    if downloads:
+        try:
+            results = download_all(
+                [(url, file_path) for _, url, file_path in downloads],
+                fetch=lambda url, file_path: fetch_url(url, file_path, download),
             )
+        except DownloadError as e:
+            logger.error(f"❌ 다운로드 실패: {e}")
+            raise Exception(f"URL 다운로드 실패: {e}")
+        for (slot, url, _), file_path in zip(downloads, results):
+            logger.info(f"✅ URL에서 파일을 성공적으로 다운로드했습니다: {url} -> {file_path}")
+            paths[slot] = file_path
+
+    if "media" not in paths:
+        # 기본값 사용 (비디오가 없는 경우에도 기본 이미지 사용)
+        paths["media"] = "/examples/image.jpg"
+        logger.info("기본 이미지 파일을 사용합니다: /examples/image.jpg")
+    if "wav" not in paths:
+        paths["wav"] = "/examples/audio.mp3"
+        logger.info("기본 오디오 파일을 사용합니다: /examples/audio.mp3")
+    if person_count == "multi" and "wav_2" not in paths:
+        # 기본값 사용 (첫 번째 오디오와 동일)
+        paths["wav_2"] = paths["wav"]
+        logger.info("두 번째 오디오가 없어 첫 번째 오디오를 사용합니다.")
 
-    req = urllib.request.Request(url, data=data)
-    req.add_header("Content-Type", "application/json")
+    logger.info(f"입력 캐시 상태: {get_input_cache().stats()}")
+    return paths["media"], paths["wav"], paths.get("wav_2")
+
+
+def queue_prompt(prompt, input_type="image", person_count="single"):
+    """프롬프트를 큐에 넣고 이벤트를 수신하는 PromptHandle을 반환"""
+    logger.info(f"Queueing prompt to: {comfy.base_url}/prompt")
+
+    # 디버깅을 위해 바인딩된 워크플로우 파라미터 로깅
+    logger.info(f"워크플로우 노드 수: {len(prompt)}")
+    template = get_template(input_type, person_count)
+    for param, value in template.values(prompt).items():
+        node_id, input_name = template.params[param]
+        logger.info(f"{param} 노드({node_id}.{input_name}) 설정: {value}")
 
     try:
-        response = urllib.request.urlopen(req)
-        result = json.loads(response.read())
-        logger.info(f"프롬프트 전송 성공: {result}")
-        return result
-    except urllib.error.HTTPError as e:
-        logger.error(f"HTTP 에러 발생: {e.code} - {e.reason}")
-        logger.error(f"응답 내용: {e.read().decode('utf-8')}")
+        handle = comfy.submit(prompt)
+        logger.info(f"프롬프트 전송 성공: {handle.queue_response}")
+        return handle
+    except ComfyUIHTTPError as e:
+        logger.error(f"HTTP 에러 발생: {e.status}")
+        logger.error(f"응답 내용: {e.body}")
         raise
     except Exception as e:
         logger.error(f"프롬프트 전송 중 오류: {e}")
@@ -148,40 +180,47 @@ def queue_prompt(prompt, input_type="image", person_count="single"):
 
 
 def get_image(filename, subfolder, folder_type):
-    url = f"http://{server_address}:8188/view"
-    logger.info(f"Getting image from: {url}")
-    data = {"filename": filename, "subfolder": subfolder, "type": folder_type}
-    url_values = urllib.parse.urlencode(data)
-    with urllib.request.urlopen(f"{url}?{url_values}") as response:
-        return response.read()
+    logger.info(f"Getting image from: {comfy.base_url}/view")
+    return comfy.get_image(filename, subfolder, folder_type)
 
 
 def get_history(prompt_id):
-    url = f"http://{server_address}:8188/history/{prompt_id}"
-    logger.info(f"Getting history from: {url}")
-    with urllib.request.urlopen(url) as response:
-        return json.loads(response.read())
+    logger.info(f"Getting history from: {comfy.base_url}/history/{prompt_id}")
+    return comfy.get_history(prompt_id)
 
 
-def get_videos(ws, prompt, input_type="image", person_count="single"):
-    prompt_id = queue_prompt(prompt, input_type, person_count)["prompt_id"]
-    logger.info(f"워크플로우 실행 시작: prompt_id={prompt_id}")
+def log_prompt_event(msg_type, data):
+    if msg_type == "executing" and data.get("node") is not None:
+        logger.info(f"노드 실행 중: {data['node']}")
+
+
+def get_videos(prompt, input_type="image", person_count="single"):
+    # 공유 웹소켓 리더가 prompt_id별로 이벤트를 전달하므로 동시 작업끼리 메시지를 빼앗지 않음
+    handle = queue_prompt(prompt, input_type, person_count)
+    handle.add_listener(log_prompt_event)
+    logger.info(f"워크플로우 실행 시작: prompt_id={handle.prompt_id}")
+
+    handle.wait()
+    # 백엔드 장애로 다른 백엔드에 재제출되면 prompt_id가 바뀌므로 완료 후에 읽어야 함
+    logger.info(f"워크플로우 실행 완료: prompt_id={handle.prompt_id}")
+    return collect_videos(handle.prompt_id)
+
+
+def get_segmented_videos(prompt, input_type, person_count, task_id):
+    """긴 오디오를 무음 구간에서 분할해 구간별 프롬프트로 생성한 뒤 하나의 비디오로 이어붙임"""
+    segmented_job = segmented.SegmentedJob(
+        get_template(input_type, person_count), prompt, os.path.join(task_id, "segments")
+    )
+    return segmented.render_segmented(
+        segmented_job,
+        lambda segment_prompt: queue_prompt(segment_prompt, input_type, person_count),
+        collect_videos,
+    )
 
-    output_videos = {}
-    while True:
-        out = ws.recv()
-        if isinstance(out, str):
-            message = json.loads(out)
-            if message["type"] == "executing":
-                data = message["data"]
-                if data["node"] is not None:
-                    logger.info(f"노드 실행 중: {data['node']}")
-                if data["node"] is None and data["prompt_id"] == prompt_id:
-                    logger.info("워크플로우 실행 완료")
-                    break
-        else:
-            continue
 
+def collect_videos(prompt_id):
+    """히스토리에서 노드별 출력 비디오 경로를 수집"""
+    output_videos = {}
     logger.info(f"히스토리 조회 중: prompt_id={prompt_id}")
     history = get_history(prompt_id)[prompt_id]
     logger.info(f"출력 노드 수: {len(history['outputs'])}")
@@ -233,29 +272,56 @@ def get_videos(ws, prompt, input_type="image", person_count="single"):
     return output_videos
 
 
-def load_workflow(workflow_path):
-    with open(workflow_path, "r") as file:
-        return json.load(file)
-
-
 def get_workflow_path(input_type, person_count):
     """input_type과 person_count에 따라 적절한 워크플로우 파일 경로를 반환"""
-    if input_type == "image":
-        if person_count == "single":
-            return "/I2V_single.json"
-        else:  # multi
-            return "/I2V_multi.json"
-    else:  # video
-        if person_count == "single":
-            return "/V2V_single.json"
-        else:  # multi
-            return "/V2V_multi.json"
+    return get_template(input_type, person_count).path
+
+
+def build_prompt(job_input, input_type, person_count, media_path, wav_path, wav_path_2=None, task_id=None, destination_dir=None):
+    """작업 입력을 워크플로우 템플릿의 이름 있는 파라미터에 바인딩한 프롬프트를 반환
+
+    task_id가 있으면 인코더 출력을 작업 전용 폴더로 보내고, destination_dir과 같은 파일시스템이면
+    ComfyUI output 디렉토리에 저장해 최종 배치가 rename으로 끝나게 함
+    """
+    prompt_text = job_input.get("prompt", "A person talking naturally")
+    width = job_input.get("width", 512)
+    height = job_input.get("height", 512)
+
+    # max_frame 설정 (입력이 없으면 오디오 길이 기반으로 자동 계산)
+    max_frame = job_input.get("max_frame")
+    if max_frame is None:
+        logger.info(
+            "max_frame이 입력되지 않았습니다. 오디오 길이를 기반으로 자동 계산합니다."
+        )
+        max_frame = calculate_max_frames_from_audio(
+            wav_path, wav_path_2 if person_count == "multi" else None
+        )
+    else:
+        logger.info(f"사용자 지정 max_frame: {max_frame}")
+
+    logger.info(
+        f"워크플로우 설정: prompt='{prompt_text}', width={width}, height={height}, max_frame={max_frame}"
+    )
+    params = {
+        "media": media_path,
+        "audio": wav_path,
+        "prompt": prompt_text,
+        "width": width,
+        "height": height,
+        "max_frame": max_frame,
+        "seed": job_input.get("seed"),
+    }
+    if person_count == "multi":
+        params["audio_2"] = wav_path_2
+    if task_id:
+        params.update(output_params(task_id, destination_dir))
+    return get_template(input_type, person_count).bind(**params)
 
 
 def get_audio_duration(audio_path):
-    """오디오 파일의 길이(초)를 반환"""
+    """오디오 파일의 길이(초)를 반환 (헤더 메타데이터 우선, 실패 시에만 librosa 디코딩)"""
     try:
-        duration = librosa.get_duration(path=audio_path)
+        duration = probe_audio_duration(audio_path)
         return duration
     except Exception as e:
         logger.warning(f"오디오 길이 계산 실패 ({audio_path}): {e}")
@@ -294,7 +360,20 @@ def calculate_max_frames_from_audio(wav_path, wav_path_2=None, fps=25):
 
 
 def handler(job):
-    job_input = job.get("input", {})
+    task_id = f"task_{uuid.uuid4()}"
+    coldstart.first_job_started()
+    try:
+        return process_job(job.get("input", {}), task_id)
+    finally:
+        # 작업별 입력 디렉토리와 ComfyUI 출력 폴더 정리 (재사용 입력은 입력 캐시에 남아 있음)
+        shutil.rmtree(task_id, ignore_errors=True)
+        cleanup_job_outputs(task_id)
+        # 오래된 ComfyUI temp/output 파일 정리 (COMFY_GC_INTERVAL_SECONDS마다 한 번)
+        maybe_sweep()
+        coldstart.first_job_finished(comfy.ready_at)
+
+
+def process_job(job_input, task_id):
 
     # job_input을 로깅할 때 base64 데이터는 truncate해서 출력
     log_input = job_input.copy()
@@ -303,7 +382,6 @@ def handler(job):
             log_input[key] = truncate_base64_for_log(log_input[key])
 
     logger.info(f"Received job input: {log_input}")
-    task_id = f"task_{uuid.uuid4()}"
 
     # 입력 타입과 인물 수 확인
     input_type = job_input.get("input_type", "image")  # "image" 또는 "video"
@@ -315,112 +393,16 @@ def handler(job):
     workflow_path = get_workflow_path(input_type, person_count)
     logger.info(f"사용할 워크플로우: {workflow_path}")
 
-    # 이미지/비디오 입력 처리
-    media_path = None
-    if input_type == "image":
-        # 이미지 입력 처리 (image_path, image_url, image_base64 중 하나만 사용)
-        if "image_path" in job_input:
-            media_path = process_input(
-                job_input["image_path"], task_id, "input_image.jpg", "path"
-            )
-        elif "image_url" in job_input:
-            media_path = process_input(
-                job_input["image_url"], task_id, "input_image.jpg", "url"
-            )
-        elif "image_base64" in job_input:
-            media_path = process_input(
-                job_input["image_base64"], task_id, "input_image.jpg", "base64"
-            )
-        else:
-            # 기본값 사용
-            media_path = "/examples/image.jpg"
-            logger.info("기본 이미지 파일을 사용합니다: /examples/image.jpg")
-    else:  # video
-        # 비디오 입력 처리 (video_path, video_url, video_base64 중 하나만 사용)
-        if "video_path" in job_input:
-            media_path = process_input(
-                job_input["video_path"], task_id, "input_video.mp4", "path"
-            )
-        elif "video_url" in job_input:
-            media_path = process_input(
-                job_input["video_url"], task_id, "input_video.mp4", "url"
-            )
-        elif "video_base64" in job_input:
-            media_path = process_input(
-                job_input["video_base64"], task_id, "input_video.mp4", "base64"
-            )
-        else:
-            # 기본값 사용 (비디오가 없는 경우 기본 이미지 사용)
-            media_path = "/examples/image.jpg"
-            logger.info("기본 이미지 파일을 사용합니다: /examples/image.jpg")
-
-    # 오디오 입력 처리 (wav_path, wav_url, wav_base64 중 하나만 사용)
-    wav_path = None
-    wav_path_2 = None  # 다중 인물용 두 번째 오디오
-
-    if "wav_path" in job_input:
-        wav_path = process_input(
-            job_input["wav_path"], task_id, "input_audio.wav", "path"
-        )
-    elif "wav_url" in job_input:
-        wav_path = process_input(
-            job_input["wav_url"], task_id, "input_audio.wav", "url"
-        )
-    elif "wav_base64" in job_input:
-        wav_path = process_input(
-            job_input["wav_base64"], task_id, "input_audio.wav", "base64"
-        )
-    else:
-        # 기본값 사용
-        wav_path = "/examples/audio.mp3"
-        logger.info("기본 오디오 파일을 사용합니다: /examples/audio.mp3")
-
-    # 다중 인물용 두 번째 오디오 처리
-    if person_count == "multi":
-        if "wav_path_2" in job_input:
-            wav_path_2 = process_input(
-                job_input["wav_path_2"], task_id, "input_audio_2.wav", "path"
-            )
-        elif "wav_url_2" in job_input:
-            wav_path_2 = process_input(
-                job_input["wav_url_2"], task_id, "input_audio_2.wav", "url"
-            )
-        elif "wav_base64_2" in job_input:
-            wav_path_2 = process_input(
-                job_input["wav_base64_2"], task_id, "input_audio_2.wav", "base64"
-            )
-        else:
-            # 기본값 사용 (첫 번째 오디오와 동일)
-            wav_path_2 = wav_path
-            logger.info("두 번째 오디오가 없어 첫 번째 오디오를 사용합니다.")
-
-    # 필수 필드 검증 및 기본값 설정
-    prompt_text = job_input.get("prompt", "A person talking naturally")
-    width = job_input.get("width", 512)
-    height = job_input.get("height", 512)
-
-    # max_frame 설정 (입력이 없으면 오디오 길이 기반으로 자동 계산)
-    max_frame = job_input.get("max_frame")
-    if max_frame is None:
-        logger.info(
-            "max_frame이 입력되지 않았습니다. 오디오 길이를 기반으로 자동 계산합니다."
-        )
-        max_frame = calculate_max_frames_from_audio(
-            wav_path, wav_path_2 if person_count == "multi" else None
-        )
-    else:
-        logger.info(f"사용자 지정 max_frame: {max_frame}")
-
-    logger.info(
-        f"워크플로우 설정: prompt='{prompt_text}', width={width}, height={height}, max_frame={max_frame}"
+    # 이미지/비디오 및 오디오 입력 처리 (URL 입력은 병렬 다운로드)
+    media_path, wav_path, wav_path_2 = stage_inputs(
+        job_input, task_id, input_type, person_count
     )
+
     logger.info(f"미디어 경로: {media_path}")
     logger.info(f"오디오 경로: {wav_path}")
     if person_count == "multi":
         logger.info(f"두 번째 오디오 경로: {wav_path_2}")
 
-    prompt = load_workflow(workflow_path)
-
     # 파일 존재 여부 확인
     if not os.path.exists(media_path):
         logger.error(f"미디어 파일이 존재하지 않습니다: {media_path}")
@@ -439,76 +421,30 @@ def handler(job):
     if person_count == "multi" and wav_path_2:
         logger.info(f"두 번째 오디오 파일 크기: {os.path.getsize(wav_path_2)} bytes")
 
-    # 워크플로우 노드 설정
-    if input_type == "image":
-        # I2V 워크플로우: 이미지 입력 설정
-        prompt["284"]["inputs"]["image"] = media_path
-    else:
-        # V2V 워크플로우: 비디오 입력 설정
-        prompt["228"]["inputs"]["video"] = media_path
-
-    # 공통 설정
-    prompt["125"]["inputs"]["audio"] = wav_path
-    prompt["241"]["inputs"]["positive_prompt"] = prompt_text
-    prompt["245"]["inputs"]["value"] = width
-    prompt["246"]["inputs"]["value"] = height
-
-    prompt["270"]["inputs"]["value"] = max_frame
-
-    # 다중 인물용 두 번째 오디오 설정
-    if person_count == "multi":
-        # 워크플로우 타입에 따라 두 번째 오디오 노드 설정
-        if input_type == "image":  # I2V_multi.json의 경우
-            if "307" in prompt:
-                prompt["307"]["inputs"]["audio"] = wav_path_2
-        else:  # V2V_multi.json의 경우
-            if "313" in prompt:
-                prompt["313"]["inputs"]["audio"] = wav_path_2
-
-    ws_url = f"ws://{server_address}:8188/ws?clientId={client_id}"
-    logger.info(f"Connecting to WebSocket: {ws_url}")
-
-    # 먼저 HTTP 연결이 가능한지 확인
-    http_url = f"http://{server_address}:8188/"
-    logger.info(f"Checking HTTP connection to: {http_url}")
-
-    # HTTP 연결 확인 (최대 1분)
-    max_http_attempts = 180
-    for http_attempt in range(max_http_attempts):
-        try:
-            import urllib.request
-
-            response = urllib.request.urlopen(http_url, timeout=5)
-            logger.info(f"HTTP 연결 성공 (시도 {http_attempt+1})")
-            break
-        except Exception as e:
-            logger.warning(
-                f"HTTP 연결 실패 (시도 {http_attempt+1}/{max_http_attempts}): {e}"
-            )
-            if http_attempt == max_http_attempts - 1:
-                raise Exception(
-                    "ComfyUI 서버에 연결할 수 없습니다. 서버가 실행 중인지 확인하세요."
-                )
-            time.sleep(1)
+    # 워크플로우 템플릿에 파라미터 바인딩 (노드 ID는 workflow_templates에서 관리)
+    destination_dir = NETWORK_VOLUME_DIR if job_input.get("network_volume", False) else None
+    prompt = build_prompt(
+        job_input, input_type, person_count, media_path, wav_path, wav_path_2, task_id, destination_dir
+    )
 
-    ws = websocket.WebSocket()
-    # 웹소켓 연결 시도 (최대 3분)
-    max_attempts = int(180 / 5)  # 3분 (1초에 한 번씩 시도)
-    for attempt in range(max_attempts):
-        import time
+    # 구간 분할 생성은 결과가 달라지므로 캐시 키에 포함
+    use_segments = segmented.should_segment(job_input, wav_path, wav_path_2)
 
-        try:
-            ws.connect(ws_url)
-            logger.info(f"웹소켓 연결 성공 (시도 {attempt+1})")
-            break
-        except Exception as e:
-            logger.warning(f"웹소켓 연결 실패 (시도 {attempt+1}/{max_attempts}): {e}")
-            if attempt == max_attempts - 1:
-                raise Exception("웹소켓 연결 시간 초과 (3분)")
-            time.sleep(5)
-    videos = get_videos(ws, prompt, input_type, person_count)
-    ws.close()
-    logger.info("웹소켓 연결 종료")
+    # 동일한 그래프+입력 파일이면 결과 캐시에서 바로 반환 (cache: "bypass"로 우회)
+    cache_key, cached_video = result_cache.lookup(
+        job_input, prompt, os.path.join(task_id, "cached_result.mp4"), use_segments
+    )
+    if cached_video:
+        videos = {"result_cache": [cached_video]}
+    else:
+        # 첫 작업에서만 HTTP 준비 확인 및 웹소켓 연결 비용 발생 (웜 작업은 재사용)
+        comfy.wait_until_ready()
+        if use_segments:
+            logger.info("긴 오디오: 구간 분할 모드로 생성합니다.")
+            videos = get_segmented_videos(prompt, input_type, person_count, task_id)
+        else:
+            videos = get_videos(prompt, input_type, person_count)
+        result_cache.store(cache_key, videos)
 
     # 비디오가 없는 경우 처리
     output_video_path = None
@@ -536,68 +472,57 @@ def handler(job):
     logger.info(f"네트워크 볼륨 사용 여부: {use_network_volume}")
 
     if use_network_volume:
-        # 네트워크 볼륨 사용: 파일 복사
-        logger.info("네트워크 볼륨에 비디오 복사 시작")
+        # 네트워크 볼륨 사용: 같은 파일시스템이면 rename, 아니면 hardlink → 커널 복사 순으로 배치
+        logger.info("네트워크 볼륨에 비디오 배치 시작")
         try:
-            # 결과 비디오 파일 경로 생성
-            output_filename = f"infinitetalk_{task_id}.mp4"
-            output_path = f"/runpod-volume/{output_filename}"
+            output_path = volume_path(f"infinitetalk_{task_id}.mp4")
             logger.info(f"원본 파일: {output_video_path}")
             logger.info(f"대상 경로: {output_path}")
 
-            # 원본 파일 크기 확인
-            source_file_size = os.path.getsize(output_video_path)
-            logger.info(f"원본 파일 크기: {source_file_size} bytes")
-
-            # 파일 복사 (shutil.copy2는 메타데이터도 함께 복사)
-            shutil.copy2(output_video_path, output_path)
-            logger.info("파일 복사 완료")
-
-            # 복사된 파일 크기 확인
-            copied_file_size = os.path.getsize(output_path)
-            logger.info(f"복사된 파일 크기: {copied_file_size} bytes")
-
-            if source_file_size == copied_file_size:
-                logger.info(
-                    f"✅ 결과 비디오를 '{output_path}'에 성공적으로 복사했습니다"
-                )
-            else:
-                logger.warning(
-                    f"⚠️ 파일 크기가 일치하지 않습니다: 원본={source_file_size}, 복사본={copied_file_size}"
-                )
+            # 결과 캐시는 이미 저장되었으므로 원본(임시 출력)은 옮겨도 됨. 크기 검증은 place_output에서 수행
+            method = place_output(output_video_path, output_path, move=True)
+            logger.info(
+                f"✅ 결과 비디오를 '{output_path}'에 배치했습니다 ({method}, {os.path.getsize(output_path)} bytes)"
+            )
 
             return {"video_path": output_path}
 
         except Exception as e:
-            logger.error(f"❌ 비디오 복사 실패: {e}")
-            return {"error": f"비디오 복사 실패: {e}"}
+            logger.error(f"❌ 비디오 배치 실패: {e}")
+            return {"error": f"비디오 배치 실패: {e}"}
     else:
-        # 네트워크 볼륨 미사용: Base64 인코딩하여 반환
-        logger.info("Base64 인코딩 시작")
+        # 네트워크 볼륨 미사용: 업로더로 전달 (기본값은 Base64, output_upload_url/OUTPUT_UPLOADER로 스트리밍 업로드)
         logger.info(f"비디오 파일 경로: {output_video_path}")
 
         try:
-            # 파일 크기 확인
+            uploader = get_uploader(job_input)
             file_size = os.path.getsize(output_video_path)
-            logger.info(f"원본 파일 크기: {file_size} bytes")
+            logger.info(f"출력 전달 방식: {uploader.name}, 원본 파일 크기: {file_size} bytes")
 
-            # 파일을 읽어 base64 인코딩
-            with open(output_video_path, "rb") as f:
-                video_data = base64.b64encode(f.read()).decode("utf-8")
-
-            encoded_size = len(video_data)
-            logger.info(f"Base64 인코딩 완료: {encoded_size} 문자")
-            logger.info(
-                f"✅ Base64 인코딩된 비디오 반환: {truncate_base64_for_log(video_data)}"
-            )
-            return {"video": video_data}
+            result = uploader.upload(output_video_path, job_input, task_id)
+            if "video" in result:
+                logger.info(f"Base64 인코딩 완료: {len(result['video'])} 문자")
+                logger.info(
+                    f"✅ Base64 인코딩된 비디오 반환: {truncate_base64_for_log(result['video'])}"
+                )
+            else:
+                logger.info(f"✅ 비디오 업로드 완료: {result}")
+            return result
 
         except Exception as e:
-            logger.error(f"❌ Base64 인코딩 실패: {e}")
-            return {"error": f"Base64 인코딩 실패: {e}"}
+            logger.error(f"❌ 비디오 전달 실패: {e}")
+            return {"error": f"비디오 전달 실패: {e}"}
 
 
 if os.getenv("SERVICE_MODE", "serverless") == "serverless":
+    import runpod
+
+    if coldstart.FAST_START:
+        # ComfyUI 부팅과 병렬로 웹소켓 연결 시도, 첫 status 이벤트가 오면 준비 완료
+        comfy.start_listener()
+    # WARMUP=1이면 작은 합성 작업으로 모델 로딩/torch.compile을 끝낸 뒤에 작업을 받기 시작
+    run_warmup()
+    coldstart.mark("worker_started")
     runpod.serverless.start({"handler": handler})
 # In API mode, do nothing here to avoid circular import
 else:
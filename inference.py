@@ -1,30 +1,39 @@
 import os
+import asyncio
 import logging
-import websocket
-import urllib.request
-import base64
-import json
 import shutil
-import time
 import uuid
 from handler import (
-    process_input,
+    stage_inputs,
     get_workflow_path,
-    load_workflow,
-    calculate_max_frames_from_audio,
+    build_prompt,
     get_videos,
+    get_segmented_videos,
+    queue_prompt,
+    collect_videos,
+    log_prompt_event,
     truncate_base64_for_log,
 )
-from handler import client_id as comfy_client_id
+from comfy_client import get_client
+from output_uploader import get_uploader
+from comfy_outputs import cleanup_job_outputs
+from output_placement import NETWORK_VOLUME_DIR, place_output, volume_path
+import result_cache
+import segmented
+from workflow_templates import get_template
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-server_address = os.getenv("SERVER_ADDRESS", "127.0.0.1")
+# API mode keeps finished videos here and streams them from disk
+RESULTS_DIR = os.getenv("RESULTS_DIR", "/tmp/infinitetalk/results")
 
-def run_inference(job_input: dict):
-    from handler import get_audio_duration  # reuse existing function
 
+def prepare_job(job_input: dict, keep_file: bool = False):
+    """Stage inputs and bind the workflow. Returns the per-job context used by the later stages.
+
+    The encoder output is routed next to where finalize_output will place it.
+    """
     task_id = f"task_{uuid.uuid4()}"
     input_type = job_input.get("input_type", "image")
     person_count = job_input.get("person_count", "single")
@@ -32,83 +41,32 @@ def run_inference(job_input: dict):
     workflow_path = get_workflow_path(input_type, person_count)
     logger.info(f"Workflow: {workflow_path}, type={input_type}, persons={person_count}")
 
-    media_path = None
-    if input_type == "image":
-        for key in ("image_path", "image_url", "image_base64"):
-            if key in job_input:
-                media_path = process_input(job_input[key], task_id, "input_image.jpg", key.split("_")[-1])
-                break
-        if media_path is None:
-            media_path = "/examples/image.jpg"
-    else:
-        for key in ("video_path", "video_url", "video_base64"):
-            if key in job_input:
-                media_path = process_input(job_input[key], task_id, "input_video.mp4", key.split("_")[-1])
-                break
-        if media_path is None:
-            media_path = "/examples/image.jpg"
-
-    wav_path = None
-    wav_path_2 = None
-    for key in ("wav_path", "wav_url", "wav_base64"):
-        if key in job_input:
-            wav_path = process_input(job_input[key], task_id, "input_audio.wav", key.split("_")[-1])
-            break
-    if wav_path is None:
-        wav_path = "/examples/audio.mp3"
-    if person_count == "multi":
-        for key in ("wav_path_2", "wav_url_2", "wav_base64_2"):
-            if key in job_input:
-                wav_path_2 = process_input(job_input[key], task_id, "input_audio_2.wav", key.split("_")[-1])
-                break
-        if wav_path_2 is None:
-            wav_path_2 = wav_path
-
-    prompt = load_workflow(workflow_path)
-    prompt_text = job_input.get("prompt", "A person talking naturally")
-    width = job_input.get("width", 512)
-    height = job_input.get("height", 512)
-    max_frame = job_input.get("max_frame")
-    if max_frame is None:
-        max_frame = calculate_max_frames_from_audio(wav_path, wav_path_2 if person_count == "multi" else None)
-
-    if input_type == "image":
-        prompt["284"]["inputs"]["image"] = media_path
-    else:
-        prompt["228"]["inputs"]["video"] = media_path
-    prompt["125"]["inputs"]["audio"] = wav_path
-    prompt["241"]["inputs"]["positive_prompt"] = prompt_text
-    prompt["245"]["inputs"]["value"] = width
-    prompt["246"]["inputs"]["value"] = height
-    prompt["270"]["inputs"]["value"] = max_frame
-    if person_count == "multi":
-        if input_type == "image" and "307" in prompt:
-            prompt["307"]["inputs"]["audio"] = wav_path_2
-        elif input_type == "video" and "313" in prompt:
-            prompt["313"]["inputs"]["audio"] = wav_path_2
-
-    http_url = f"http://{server_address}:8188/"
-    for attempt in range(60):
-        try:
-            urllib.request.urlopen(http_url, timeout=5)
-            logger.info(f"ComfyUI ready after {attempt}s")
-            break
-        except Exception:
-            time.sleep(1)
-
-    ws_url = f"ws://{server_address}:8188/ws?clientId={comfy_client_id}"
-    ws = websocket.WebSocket()
-    for _ in range(5):
-        try:
-            ws.connect(ws_url)
-            break
-        except Exception as e:
-            logger.warning(f"WebSocket connect failed: {e}")
-            time.sleep(2)
+    try:
+        media_path, wav_path, wav_path_2 = stage_inputs(job_input, task_id, input_type, person_count)
+        if job_input.get("network_volume"):
+            destination_dir = NETWORK_VOLUME_DIR
+        else:
+            destination_dir = RESULTS_DIR if keep_file else None
+        prompt = build_prompt(
+            job_input, input_type, person_count, media_path, wav_path, wav_path_2, task_id, destination_dir
+        )
+        use_segments = segmented.should_segment(job_input, wav_path, wav_path_2)
+    except Exception:
+        shutil.rmtree(task_id, ignore_errors=True)
+        raise
 
-    videos = get_videos(ws, prompt, input_type, person_count)
-    ws.close()
+    return {
+        "task_id": task_id,
+        "input_type": input_type,
+        "person_count": person_count,
+        "prompt": prompt,
+        "segmented": use_segments,
+    }
 
+
+def finalize_output(job: dict, videos: dict, job_input: dict, keep_file: bool = False):
+    """Pick the produced video and deliver it as a network-volume path, a kept local file
+    (keep_file, used by the API) or through the configured output uploader."""
     output_video_path = None
     for node_id, vidlist in videos.items():
         if vidlist:
@@ -117,13 +75,107 @@ def run_inference(job_input: dict):
     if not output_video_path or not os.path.exists(output_video_path):
         return {"error": "No output video found"}
 
+    # The result cache already holds its own link, so the produced file can be moved
     if job_input.get("network_volume"):
-        out_path = f"/runpod-volume/infinitetalk_{task_id}.mp4"
-        os.makedirs("/runpod-volume", exist_ok=True)
-        shutil.copy2(output_video_path, out_path)
+        out_path = volume_path(f"infinitetalk_{job['task_id']}.mp4")
+        place_output(output_video_path, out_path, move=True)
+        return {"video_path": out_path}
+    if keep_file:
+        out_path = os.path.join(RESULTS_DIR, f"infinitetalk_{job['task_id']}.mp4")
+        place_output(output_video_path, out_path, move=True)
         return {"video_path": out_path}
-    else:
-        with open(output_video_path, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode("utf-8")
-        logger.info(f"Returning base64 video: {truncate_base64_for_log(b64)}")
-        return {"video": b64}
+    result = get_uploader(job_input).upload(output_video_path, job_input, job["task_id"])
+    if "video" in result:
+        logger.info(f"Returning base64 video: {truncate_base64_for_log(result['video'])}")
+    return result
+
+
+def lookup_result(job: dict, job_input: dict):
+    """Result cache lookup for a prepared job. Returns (key, cached video path or None)."""
+    return result_cache.lookup(
+        job_input, job["prompt"], os.path.join(job["task_id"], "cached_result.mp4"), job["segmented"]
+    )
+
+
+def cleanup_job(job: dict):
+    """Remove the job's staged inputs and ComfyUI outputs; reusable inputs stay in the input cache."""
+    shutil.rmtree(job["task_id"], ignore_errors=True)
+    cleanup_job_outputs(job["task_id"])
+
+
+def run_inference(job_input: dict):
+    """Synchronous entry point, kept for callers that run jobs on their own threads."""
+    job = prepare_job(job_input)
+    try:
+        cache_key, cached_video = lookup_result(job, job_input)
+        if cached_video:
+            return finalize_output(job, {"result_cache": [cached_video]}, job_input)
+        # Shared per-process client: warm jobs skip the readiness probe and WebSocket handshake
+        get_client().wait_until_ready(max_attempts=60)
+        if job["segmented"]:
+            videos = get_segmented_videos(job["prompt"], job["input_type"], job["person_count"], job["task_id"])
+        else:
+            videos = get_videos(job["prompt"], job["input_type"], job["person_count"])
+        result_cache.store(cache_key, videos)
+        return finalize_output(job, videos, job_input)
+    finally:
+        cleanup_job(job)
+
+
+async def render_segments_async(job: dict, progress=None):
+    """Segmented mode: queue all segment prompts, await them together, then stitch."""
+    segmented_job = segmented.SegmentedJob(
+        get_template(job["input_type"], job["person_count"]), job["prompt"], os.path.join(job["task_id"], "segments")
+    )
+    prompts = await asyncio.to_thread(segmented_job.prepare)
+    handles = []
+    for prompt in prompts:
+        handles.append(await asyncio.to_thread(queue_prompt, prompt, job["input_type"], job["person_count"]))
+        if progress is not None:
+            progress.track(handles[-1])
+    logger.info(f"Queued {len(handles)} segment prompts")
+    if progress is not None:
+        progress.set_stage("rendering")
+    await asyncio.gather(*(handle.wait_async() for handle in handles))
+    if progress is not None:
+        progress.set_stage("stitching")
+    videos = []
+    for handle in handles:
+        videos.append(segmented.first_video(await asyncio.to_thread(collect_videos, handle.prompt_id)))
+    return {"segmented": [await asyncio.to_thread(segmented_job.stitch, videos)]}
+
+
+async def run_inference_async(job_input: dict, keep_file: bool = False, progress=None):
+    """Coroutine pipeline: file and HTTP stages run briefly in the default executor,
+    while the long ComfyUI wait is a future resolved by the shared WebSocket reader.
+
+    progress (a job_progress.JobProgress) receives stage changes and the prompts' ComfyUI events.
+    """
+    def stage(name):
+        if progress is not None:
+            progress.set_stage(name)
+
+    stage("preparing")
+    job = await asyncio.to_thread(prepare_job, job_input, keep_file)
+    try:
+        cache_key, cached_video = await asyncio.to_thread(lookup_result, job, job_input)
+        if cached_video:
+            stage("finalizing")
+            return await asyncio.to_thread(finalize_output, job, {"result_cache": [cached_video]}, job_input, keep_file)
+        await asyncio.to_thread(get_client().wait_until_ready, 60)
+        if job["segmented"]:
+            videos = await render_segments_async(job, progress)
+        else:
+            handle = await asyncio.to_thread(queue_prompt, job["prompt"], job["input_type"], job["person_count"])
+            handle.add_listener(log_prompt_event)
+            if progress is not None:
+                progress.track(handle)
+            stage("rendering")
+            logger.info(f"Prompt queued: {handle.prompt_id}")
+            await handle.wait_async()
+            videos = await asyncio.to_thread(collect_videos, handle.prompt_id)
+        await asyncio.to_thread(result_cache.store, cache_key, videos)
+        stage("finalizing")
+        return await asyncio.to_thread(finalize_output, job, videos, job_input, keep_file)
+    finally:
+        await asyncio.to_thread(cleanup_job, job)
@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Asyncio Infinitetalk API client with S3 upload functionality
+Same surface as InfinitetalkS3Client, for orchestrators driving many generations from one event loop
+Requires httpx in addition to the blocking client's dependencies (pip install -r requirements-client.txt)
+"""
+
+import os
+import json
+import time
+import asyncio
+import inspect
+import logging
+from typing import Optional, Dict, Any, List, Callable
+
+import httpx
+
+from infinitetalk_s3_client import (
+    BATCH_MANIFEST_NAME,
+    BATCH_MAX_IN_FLIGHT,
+    BATCH_UPLOAD_CONCURRENCY,
+    HTTP_POOL_SIZE,
+    POLL_MAX_INTERVAL,
+    BatchManifest,
+    InfinitetalkS3Client,
+    batch_entry_done,
+    batch_output_file,
+    build_job_input,
+    count_batch_result,
+    find_batch_files,
+    job_status_result,
+    new_batch_results,
+    next_poll_interval,
+    pending_poll_interval,
+    resumable_job_id,
+)
+
+logger = logging.getLogger(__name__)
+
+# Pooled HTTP connections to the API; status polls are short, so a few hundred cover thousands of jobs
+ASYNC_HTTP_POOL_SIZE = 256
+# S3 transfers run on worker threads (boto3 is blocking); this bounds how many at once
+S3_CONCURRENCY = HTTP_POOL_SIZE
+
+
+class AsyncInfinitetalkS3Client:
+    """
+    Asyncio counterpart of InfinitetalkS3Client
+
+    RunPod / api.py calls go through one pooled httpx.AsyncClient, so an outstanding
+    job costs a coroutine rather than a thread. S3 transfers reuse the blocking
+    client's parallel multipart upload and ranged download on worker threads.
+    """
+
+    def __init__(
+        self,
+        runpod_endpoint_id: str,
+        runpod_api_key: str,
+        s3_endpoint_url: str,
+        s3_access_key_id: str,
+        s3_secret_access_key: str,
+        s3_bucket_name: str,
+        s3_region: str = 'eu-ro-1',
+        api_base_url: Optional[str] = None,
+        max_connections: int = ASYNC_HTTP_POOL_SIZE
+    ):
+        """
+        Initialize async Infinitetalk S3 client
+
+        Args:
+            runpod_endpoint_id: RunPod endpoint ID
+            runpod_api_key: RunPod API key
+            s3_endpoint_url: S3 endpoint URL
+            s3_access_key_id: S3 access key ID
+            s3_secret_access_key: S3 secret access key
+            s3_bucket_name: S3 bucket name
+            s3_region: S3 region
+            api_base_url: Base URL of a self-hosted api.py to use instead of the RunPod endpoint
+            max_connections: Size of the HTTP connection pool
+        """
+        self.sync_client = InfinitetalkS3Client(
+            runpod_endpoint_id,
+            runpod_api_key,
+            s3_endpoint_url,
+            s3_access_key_id,
+            s3_secret_access_key,
+            s3_bucket_name,
+            s3_region,
+            api_base_url
+        )
+        self.runpod_api_endpoint = self.sync_client.runpod_api_endpoint
+        self.status_url = self.sync_client.status_url
+        self.long_poll_seconds = self.sync_client.long_poll_seconds
+
+        self.http = httpx.AsyncClient(
+            headers={
+                'Authorization': f'Bearer {runpod_api_key}',
+                'Content-Type': 'application/json'
+            },
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=httpx.Timeout(30.0)
+        )
+        self._s3_slots = asyncio.Semaphore(S3_CONCURRENCY)
+
+    async def __aenter__(self) -> "AsyncInfinitetalkS3Client":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the HTTP connection pool"""
+        await self.http.aclose()
+
+    async def _s3(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a blocking S3 call on a worker thread"""
+        async with self._s3_slots:
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    async def upload_to_s3(self, file_path: str, s3_key: str) -> Optional[str]:
+        """Upload file to S3 under an explicit key; returns the S3 path or None"""
+        return await self._s3(self.sync_client.upload_to_s3, file_path, s3_key)
+
+    async def upload_content_addressed(self, file_path: str) -> Optional[str]:
+        """Upload file under its content-hash key, skipping objects already stored"""
+        return await self._s3(self.sync_client.upload_content_addressed, file_path)
+
+    async def upload_inputs(self, file_paths: List[str]) -> Dict[str, Optional[str]]:
+        """Upload several inputs concurrently (content-addressed)"""
+        unique_paths = list(dict.fromkeys(file_paths))
+        s3_paths = await asyncio.gather(*(self.upload_content_addressed(path) for path in unique_paths))
+        return dict(zip(unique_paths, s3_paths))
+
+    async def submit_job(self, input_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Submit job to RunPod
+
+        Args:
+            input_data: API input data
+
+        Returns:
+            Job ID or None (on failure)
+        """
+        try:
+            logger.info(f"Submitting job to RunPod: {self.runpod_api_endpoint}")
+            logger.debug(f"Input data: {json.dumps(input_data, ensure_ascii=False)}")
+
+            response = await self.http.post(self.runpod_api_endpoint, json={"input": input_data})
+            response.raise_for_status()
+
+            response_data = response.json()
+            job_id = response_data.get('id')
+
+            if job_id:
+                logger.info(f"✅ Job submission successful! Job ID: {job_id}")
+                return job_id
+            logger.error(f"❌ Failed to receive Job ID: {response_data}")
+            return None
+
+        except httpx.HTTPError as e:
+            logger.error(f"❌ Job submission failed: {e}")
+            return None
+
+    async def wait_for_completion(
+        self,
+        job_id: str,
+        check_interval: float = POLL_MAX_INTERVAL,
+        max_wait_time: int = 1800,
+        expected_seconds: Optional[float] = None,
+        long_poll_seconds: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Wait for job completion (same adaptive polling and long-poll as the blocking client)
+
+        Args:
+            job_id: Job ID
+            check_interval: Longest interval between status checks (seconds)
+            max_wait_time: Maximum wait time (seconds)
+            expected_seconds: Expected render time once the job starts
+            long_poll_seconds: Ask the server to hold each status request up to this long
+
+        Returns:
+            Job result dictionary
+        """
+        if long_poll_seconds is None:
+            long_poll_seconds = self.long_poll_seconds
+        start_time = time.time()
+        deadline = start_time + max_wait_time
+        running_since = None
+        interval = None
+
+        while time.time() < deadline:
+            request_started = time.time()
+            try:
+                wait = min(long_poll_seconds, max(0, int(deadline - request_started)))
+                response = await self.http.get(
+                    f"{self.status_url}/{job_id}",
+                    params={'wait': wait} if wait else None,
+                    timeout=30 + wait
+                )
+                response.raise_for_status()
+
+                status_data = response.json()
+                result = job_status_result(job_id, status_data, start_time)
+                if result is not None:
+                    return result
+                if wait and time.time() - request_started >= wait / 2:
+                    # The server held the request; ask again right away
+                    interval = None
+                    continue
+                interval, running_since = pending_poll_interval(
+                    status_data.get('status'), interval, running_since, expected_seconds, check_interval
+                )
+
+            except httpx.HTTPError as e:
+                logger.error(f"❌ Error checking status ({job_id}): {e}")
+                interval = next_poll_interval(interval, None, check_interval)
+
+            await asyncio.sleep(max(0, min(interval, deadline - time.time())))
+
+        logger.error(f"❌ Job wait timeout ({max_wait_time} seconds)")
+        return {
+            'status': 'TIMEOUT',
+            'job_id': job_id
+        }
+
+    async def save_video_result(self, result: Dict[str, Any], output_path: str) -> bool:
+        """Save video file from job result (ranged S3 download or streaming base64 decode)"""
+        return await self._s3(self.sync_client.save_video_result, result, output_path)
+
+    async def get_result_url(self, result: Dict[str, Any]) -> Optional[str]:
+        """Presigned URL for a completed network-volume job"""
+        return await asyncio.to_thread(self.sync_client.get_result_url, result)
+
+    async def create_video_from_files(
+        self,
+        image_path: str,
+        audio_path: str,
+        audio_path_2: Optional[str] = None,
+        prompt: str = "A person talking naturally",
+        width: int = 512,
+        height: int = 512,
+        max_frame: Optional[int] = None,
+        person_count: str = "single",
+        input_type: str = "image",
+        use_network_volume: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Create video from local files (including S3 upload)
+
+        Args:
+            image_path: Image file path
+            audio_path: Audio file path
+            audio_path_2: Second audio file path (for multiple people)
+            prompt: Prompt text
+            width: Output width
+            height: Output height
+            max_frame: Maximum frame count
+            person_count: Number of people ("single" or "multi")
+            input_type: Input type ("image" or "video")
+            use_network_volume: Whether to use network volume (if True, saves result to S3)
+
+        Returns:
+            Job result dictionary
+        """
+        # Check file existence
+        if not os.path.exists(image_path):
+            return {"error": f"Image file does not exist: {image_path}"}
+
+        if not os.path.exists(audio_path):
+            return {"error": f"Audio file does not exist: {audio_path}"}
+
+        if person_count == "multi" and audio_path_2 and not os.path.exists(audio_path_2):
+            return {"error": f"Second audio file does not exist: {audio_path_2}"}
+
+        use_audio_2 = person_count == "multi" and audio_path_2
+        uploaded = await self.upload_inputs([image_path, audio_path] + ([audio_path_2] if use_audio_2 else []))
+
+        if not uploaded[image_path]:
+            return {"error": "Image S3 upload failed"}
+        if not uploaded[audio_path]:
+            return {"error": "Audio S3 upload failed"}
+        if use_audio_2 and not uploaded[audio_path_2]:
+            return {"error": "Second audio S3 upload failed"}
+
+        input_data = build_job_input(
+            input_type, person_count, prompt, width, height, uploaded[image_path],
+            uploaded[audio_path], uploaded.get(audio_path_2), max_frame, use_network_volume
+        )
+
+        job_id = await self.submit_job(input_data)
+        if not job_id:
+            return {"error": "Job submission failed"}
+
+        expected_seconds = self.sync_client.estimate_job_seconds([audio_path, audio_path_2], max_frame)
+        return await self.wait_for_completion(job_id, expected_seconds=expected_seconds)
+
+    async def batch_process_audio_files(
+        self,
+        image_path: str,
+        audio_folder_path: str,
+        output_folder_path: str,
+        valid_extensions: tuple = ('.wav', '.mp3', '.m4a', '.flac'),
+        prompt: str = "A person talking naturally",
+        width: int = 512,
+        height: int = 512,
+        max_frame: Optional[int] = None,
+        person_count: str = "single",
+        input_type: str = "image",
+        max_in_flight: int = BATCH_MAX_IN_FLIGHT,
+        upload_concurrency: int = BATCH_UPLOAD_CONCURRENCY,
+        manifest_path: Optional[str] = None,
+        on_result: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        presign_results: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Batch process all audio files in folder
+
+        Same pipeline and manifest as the blocking client; max_in_flight can be
+        in the thousands since waiting jobs are coroutines. on_result may be a
+        plain function or a coroutine function. Manifest writes run on a worker
+        thread so they never block the event loop.
+
+        Returns:
+            Batch processing result dictionary
+        """
+        audio_files, error = find_batch_files(image_path, audio_folder_path, output_folder_path, valid_extensions)
+        if error:
+            return error
+
+        manifest = await asyncio.to_thread(
+            BatchManifest, manifest_path or os.path.join(output_folder_path, BATCH_MANIFEST_NAME)
+        )
+        results = new_batch_results(len(audio_files))
+
+        async def update(filename, **fields):
+            return await asyncio.to_thread(manifest.update, filename, **fields)
+
+        async def report(result):
+            count_batch_result(results, result)
+            if on_result:
+                try:
+                    outcome = on_result(result)
+                    if inspect.isawaitable(outcome):
+                        await outcome
+                except Exception as e:
+                    logger.error(f"[{result['filename']}] on_result callback failed: {e}")
+
+        try:
+            pending = []
+            for filename in audio_files:
+                entry = manifest.get(filename)
+                if batch_entry_done(entry, presign_results):
+                    if presign_results:
+                        # Earlier URLs may have expired
+                        video_url = await asyncio.to_thread(self.sync_client.get_video_url, entry["video_path"])
+                        entry = await update(filename, video_url=video_url)
+                    results["resumed"] += 1
+                    await report(entry)
+                else:
+                    pending.append(filename)
+
+            logger.info(f"Batch processing started: {len(pending)} files ({results['resumed']} already done)")
+
+            image_s3_path = None
+            if pending:
+                image_s3_path = await self.upload_content_addressed(image_path)
+                if not image_s3_path:
+                    return {"error": "Common image S3 upload failed"}
+
+            base_input = build_job_input(
+                input_type, person_count, prompt, width, height, image_s3_path,
+                None, max_frame=max_frame, network_volume=presign_results
+            )
+
+            upload_slots = asyncio.Semaphore(max(1, upload_concurrency))
+            job_slots = asyncio.Semaphore(max(1, max_in_flight))
+
+            async def process(filename):
+                audio_path = os.path.join(audio_folder_path, filename)
+                entry = manifest.get(filename)
+
+                async def fail(error):
+                    logger.error(f"[{filename}] {error}")
+                    return await update(filename, status="failed", error=error)
+
+                audio_s3_path = entry.get("audio_s3_path")
+                if not audio_s3_path:
+                    async with upload_slots:
+                        audio_s3_path = await self.upload_content_addressed(audio_path)
+                    if not audio_s3_path:
+                        return await fail("S3 upload failed")
+                    await update(filename, status="uploaded", audio_s3_path=audio_s3_path)
+
+                job_id = resumable_job_id(entry)
+                if not job_id:
+                    job_id = await self.submit_job({**base_input, "wav_path": audio_s3_path})
+                    if not job_id:
+                        return await fail("Job submission failed")
+                    await update(filename, status="submitted", job_id=job_id)
+
+                expected_seconds = await asyncio.to_thread(self.sync_client.estimate_job_seconds, [audio_path], max_frame)
+                result = await self.wait_for_completion(job_id, expected_seconds=expected_seconds)
+                if result.get('status') != 'COMPLETED':
+                    # Forget the job so a resumed run submits it again
+                    await update(filename, job_id=None)
+                    return await fail(f"Job failed: {result.get('error', result.get('status'))}")
+
+                if presign_results:
+                    video_url = await self.get_result_url(result)
+                    if not video_url:
+                        return await fail("Presigned URL generation failed")
+                    logger.info(f"✅ [{filename}] Processing completed")
+                    return await update(
+                        filename, status="success", video_path=result['output']['video_path'], video_url=video_url, error=None
+                    )
+
+                output_filename = batch_output_file(output_folder_path, filename)
+                if not await self.save_video_result(result, output_filename):
+                    return await fail("Result save failed")
+
+                logger.info(f"✅ [{filename}] Processing completed")
+                return await update(filename, status="success", output_file=output_filename, error=None)
+
+            async def run(filename):
+                async with job_slots:
+                    try:
+                        return await process(filename)
+                    except Exception as e:
+                        logger.error(f"[{filename}] Unexpected error: {e}")
+                        return await update(filename, status="failed", error=str(e))
+
+            for task in asyncio.as_completed([run(filename) for filename in pending]):
+                await report(await task)
+        finally:
+            await asyncio.to_thread(manifest.close)
+
+        logger.info(f"\n🎉 Batch processing completed: {results['successful']}/{results['total_files']} successful")
+        return results
+
+
+async def main():
+    """Usage example"""
+
+    async with AsyncInfinitetalkS3Client(
+        runpod_endpoint_id="your-endpoint-id",
+        runpod_api_key="your-runpod-api-key",
+        s3_endpoint_url="https://s3api-eu-ro-1.runpod.io/",
+        s3_access_key_id="your-s3-access-key",
+        s3_secret_access_key="your-s3-secret-key",
+        s3_bucket_name="your-bucket-name",
+        s3_region="eu-ro-1"
+    ) as client:
+        result = await client.create_video_from_files(
+            image_path="./examples/image.jpg",
+            audio_path="./examples/audio.mp3",
+            use_network_volume=True
+        )
+        if result.get('status') == 'COMPLETED':
+            await client.save_video_result(result, "./output_async.mp4")
+        else:
+            print(f"Error: {result.get('error')}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
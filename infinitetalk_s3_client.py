@@ -7,17 +7,308 @@ Complete client that uploads files using RunPod Network Volume S3 and calls infi
 import os
 import requests
 import json
+import hashlib
 import boto3
+from boto3.s3.transfer import TransferConfig
 from botocore.client import Config
+from botocore.exceptions import ClientError
 import time
+import random
 import base64
-from typing import Optional, Dict, Any, List, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Dict, Any, List, Union, Callable, Tuple
 import logging
 
+try:
+    from audio_probe import probe_duration
+except ImportError:  # client used outside the repository
+    probe_duration = None
+try:
+    from base64_stream import decode_base64_to_file
+except ImportError:
+    decode_base64_to_file = None
+
 # Logging configuration
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Status polling: interval bounds, backoff factor and +/- jitter fraction
+POLL_MIN_INTERVAL = 1.0
+POLL_MAX_INTERVAL = 15.0
+POLL_BACKOFF = 1.5
+POLL_JITTER = 0.2
+# Rough render cost used to seed polling: seconds of GPU time per second of audio, plus fixed overhead
+RENDER_SECONDS_PER_AUDIO_SECOND = 8.0
+RENDER_OVERHEAD_SECONDS = 20.0
+# Output frame rate of the workflows, used to cap the estimate by max_frame
+OUTPUT_FPS = 25
+# Batch pipeline: files processed at once, concurrent uploads, manifest (JSON-lines journal) file name
+BATCH_MAX_IN_FLIGHT = 8
+BATCH_UPLOAD_CONCURRENCY = 4
+BATCH_MANIFEST_NAME = "batch_manifest.jsonl"
+# Connection pool size for RunPod HTTP and S3 (one connection per concurrent worker)
+HTTP_POOL_SIZE = 32
+# S3 uploads: multipart part size and parallel parts per file
+UPLOAD_CHUNK_SIZE = 16 * 1024 * 1024
+UPLOAD_PART_CONCURRENCY = 8
+# Prefix for content-addressed input objects (<prefix>/<sha256><ext>)
+INPUT_PREFIX = "input/infinitetalk"
+HASH_BLOCK_SIZE = 1024 * 1024
+# S3 downloads: ranged GET size, parallel ranges per file, streaming read size
+DOWNLOAD_PART_SIZE = 16 * 1024 * 1024
+DOWNLOAD_CONCURRENCY = 8
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+PRESIGNED_URL_SECONDS = 3600
+
+
+def next_poll_interval(previous: Optional[float], remaining: Optional[float], ceiling: float) -> float:
+    """
+    Seconds to sleep before the next status check
+
+    While the expected finish is ahead, poll sparsely and converge on it;
+    past it (or with no estimate), back off exponentially from POLL_MIN_INTERVAL.
+    """
+    if remaining is not None and remaining > 0:
+        interval = remaining / 2
+    elif previous is None:
+        interval = POLL_MIN_INTERVAL
+    else:
+        interval = previous * POLL_BACKOFF
+    interval = min(max(interval, POLL_MIN_INTERVAL), ceiling)
+    return interval * random.uniform(1 - POLL_JITTER, 1 + POLL_JITTER)
+
+
+def job_status_result(job_id: str, status_data: Dict[str, Any], start_time: float) -> Optional[Dict[str, Any]]:
+    """
+    Interpret one status response
+
+    Returns the final job result dictionary, or None while the job is queued or running.
+    """
+    status = status_data.get('status')
+    if status == 'COMPLETED':
+        logger.info(f"✅ Job completed! ({job_id}, {time.time() - start_time:.1f}s)")
+        return {
+            'status': 'COMPLETED',
+            'output': status_data.get('output'),
+            'job_id': job_id
+        }
+    if status == 'FAILED':
+        logger.error(f"❌ Job failed. ({job_id})")
+        return {
+            'status': 'FAILED',
+            'error': status_data.get('error', 'Unknown error'),
+            'job_id': job_id
+        }
+    if status in ['IN_QUEUE', 'IN_PROGRESS']:
+        logger.info(f"🏃 Job in progress... (status: {status})")
+        return None
+    logger.warning(f"❓ Unknown status: {status}")
+    return {
+        'status': 'UNKNOWN',
+        'data': status_data,
+        'job_id': job_id
+    }
+
+
+def pending_poll_interval(
+    status: str,
+    previous: Optional[float],
+    running_since: Optional[float],
+    expected_seconds: Optional[float],
+    ceiling: float
+) -> Tuple[float, Optional[float]]:
+    """
+    Next poll interval for a queued or running job
+
+    Returns (interval, running_since); the expected remaining time counts from the first IN_PROGRESS.
+    """
+    remaining = None
+    if status == 'IN_PROGRESS':
+        running_since = running_since or time.time()
+        if expected_seconds:
+            remaining = expected_seconds - (time.time() - running_since)
+    return next_poll_interval(previous, remaining, ceiling), running_since
+
+
+def build_job_input(
+    input_type: str,
+    person_count: str,
+    prompt: str,
+    width: int,
+    height: int,
+    media_path: Optional[str],
+    wav_path: Optional[str],
+    wav_path_2: Optional[str] = None,
+    max_frame: Optional[int] = None,
+    network_volume: bool = False
+) -> Dict[str, Any]:
+    """API input data for one job from already uploaded (network volume) paths"""
+    input_data = {
+        "input_type": input_type,
+        "person_count": person_count,
+        "prompt": prompt,
+        "width": width,
+        "height": height
+    }
+    
+    # Set media input
+    if input_type == "image":
+        input_data["image_path"] = media_path
+    else:
+        input_data["video_path"] = media_path
+    
+    # Set audio input
+    if wav_path:
+        input_data["wav_path"] = wav_path
+    
+    # Set second audio (for multiple people)
+    if person_count == "multi" and wav_path_2:
+        input_data["wav_path_2"] = wav_path_2
+    
+    # Set max_frame
+    if max_frame:
+        input_data["max_frame"] = max_frame
+    
+    # Set network_volume
+    if network_volume:
+        input_data["network_volume"] = True
+    
+    return input_data
+
+
+def find_batch_files(
+    image_path: str,
+    audio_folder_path: str,
+    output_folder_path: str,
+    valid_extensions: tuple
+) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+    """Check the batch paths and list the audio files to process. Returns (files, error dictionary or None)"""
+    # Check paths
+    if not os.path.exists(image_path):
+        return [], {"error": f"Image file does not exist: {image_path}"}
+
+    if not os.path.isdir(audio_folder_path):
+        return [], {"error": f"Audio folder does not exist: {audio_folder_path}"}
+
+    # Create output folder
+    os.makedirs(output_folder_path, exist_ok=True)
+
+    # Get audio file list
+    audio_files = sorted(
+        f for f in os.listdir(audio_folder_path)
+        if f.lower().endswith(valid_extensions)
+    )
+
+    if not audio_files:
+        return [], {"error": f"No audio files to process: {audio_folder_path}"}
+    return audio_files, None
+
+
+def batch_entry_done(entry: Dict[str, Any], presign_results: bool) -> bool:
+    """True if a manifest entry finished in an earlier run and its result is still available"""
+    if entry.get("status") != "success":
+        return False
+    if presign_results:
+        return bool(entry.get("video_path"))
+    return os.path.exists(entry.get("output_file", ""))
+
+
+def resumable_job_id(entry: Dict[str, Any]) -> Optional[str]:
+    """Job submitted by an earlier run that has not finished yet"""
+    return entry.get("job_id") if entry.get("status") == "submitted" else None
+
+
+def batch_output_file(output_folder_path: str, filename: str) -> str:
+    base_filename = os.path.splitext(filename)[0]
+    return os.path.join(output_folder_path, f"result_{base_filename}.mp4")
+
+
+def new_batch_results(total_files: int) -> Dict[str, Any]:
+    return {
+        "total_files": total_files,
+        "successful": 0,
+        "failed": 0,
+        "resumed": 0,
+        "results": []
+    }
+
+
+def count_batch_result(results: Dict[str, Any], result: Dict[str, Any]) -> None:
+    results["successful" if result["status"] == "success" else "failed"] += 1
+    results["results"].append(result)
+
+
+class BatchManifest:
+    """
+    Per-file batch state kept as an append-only JSON-lines journal so an interrupted batch can resume
+    
+    Entries move through uploaded -> submitted -> success | failed. Each update appends one
+    line, so its cost does not grow with the batch; loading replays the journal (ignoring a
+    torn last line) and compacts it to one line per file.
+    
+    Earlier versions wrote the whole state as one JSON document ({"files": {...}}) to
+    batch_manifest.json. Such a manifest is still read, from path itself or from the .json
+    file next to a missing .jsonl path, and is rewritten as a journal at path.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._files: Dict[str, Dict[str, Any]] = {}
+        source = path
+        legacy_path = f"{os.path.splitext(path)[0]}.json"
+        if not os.path.exists(path) and legacy_path != path and os.path.exists(legacy_path):
+            source = legacy_path
+        if os.path.exists(source):
+            self._files = self._read(source)
+            logger.info(f"Resuming batch from manifest: {source} ({len(self._files)} files)")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for entry in self._files.values():
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, path)
+        self._journal = open(path, 'a', encoding='utf-8')
+    
+    @staticmethod
+    def _read(path: str) -> Dict[str, Dict[str, Any]]:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        try:
+            document = json.loads(text)
+        except ValueError:
+            document = None
+        if isinstance(document, dict) and isinstance(document.get("files"), dict):
+            logger.info(f"Converting whole-file JSON manifest {path} to the journal format")
+            return {filename: {**entry, "filename": filename} for filename, entry in document["files"].items()}
+        files = {}
+        for line in text.splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and record.get("filename"):
+                files.setdefault(record["filename"], {}).update(record)
+        return files
+    
+    def get(self, filename: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._files.get(filename, {}))
+    
+    def update(self, filename: str, **fields) -> Dict[str, Any]:
+        """Merge fields into the file's entry, append them to the journal, and return the entry"""
+        with self._lock:
+            entry = self._files.setdefault(filename, {"filename": filename})
+            entry.update(fields)
+            self._journal.write(json.dumps({"filename": filename, **fields}, ensure_ascii=False) + "\n")
+            self._journal.flush()
+            return dict(entry)
+    
+    def close(self) -> None:
+        with self._lock:
+            self._journal.close()
+
+
 class InfinitetalkS3Client:
     def __init__(
         self,
@@ -27,7 +318,8 @@ class InfinitetalkS3Client:
         s3_access_key_id: str,
         s3_secret_access_key: str,
         s3_bucket_name: str,
-        s3_region: str = 'eu-ro-1'
+        s3_region: str = 'eu-ro-1',
+        api_base_url: Optional[str] = None
     ):
         """
         Initialize Infinitetalk S3 client
@@ -40,11 +332,16 @@ class InfinitetalkS3Client:
             s3_secret_access_key: S3 secret access key
             s3_bucket_name: S3 bucket name
             s3_region: S3 region
+            api_base_url: Base URL of a self-hosted api.py to use instead of the RunPod endpoint
+                (its /status supports long-polling)
         """
         self.runpod_endpoint_id = runpod_endpoint_id
         self.runpod_api_key = runpod_api_key
-        self.runpod_api_endpoint = f"https://api.runpod.ai/v2/{runpod_endpoint_id}/run"
-        self.status_url = f"https://api.runpod.ai/v2/{runpod_endpoint_id}/status"
+        base_url = api_base_url.rstrip('/') if api_base_url else f"https://api.runpod.ai/v2/{runpod_endpoint_id}"
+        self.runpod_api_endpoint = f"{base_url}/run"
+        self.status_url = f"{base_url}/status"
+        # Only our own api.py honours ?wait= on /status
+        self.long_poll_seconds = 30 if api_base_url else 0
         
         # S3 configuration
         self.s3_endpoint_url = s3_endpoint_url
@@ -60,11 +357,23 @@ class InfinitetalkS3Client:
             aws_access_key_id=s3_access_key_id,
             aws_secret_access_key=s3_secret_access_key,
             region_name=s3_region,
-            config=Config(signature_version='s3v4')
+            config=Config(signature_version='s3v4', max_pool_connections=HTTP_POOL_SIZE)
         )
         
-        # Initialize HTTP session
+        self.transfer_config = TransferConfig(
+            multipart_threshold=UPLOAD_CHUNK_SIZE,
+            multipart_chunksize=UPLOAD_CHUNK_SIZE,
+            max_concurrency=UPLOAD_PART_CONCURRENCY,
+            use_threads=True
+        )
+        # sha256 per (path, size, mtime), so repeated inputs are hashed once
+        self._digests: Dict[tuple, str] = {}
+        
+        # Initialize HTTP session (shared by batch worker threads)
         self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'Authorization': f'Bearer {runpod_api_key}',
             'Content-Type': 'application/json'
@@ -72,13 +381,14 @@ class InfinitetalkS3Client:
         
         logger.info(f"InfinitetalkS3Client initialized - Endpoint: {runpod_endpoint_id}")
     
-    def upload_to_s3(self, file_path: str, s3_key: str) -> Optional[str]:
+    def upload_to_s3(self, file_path: str, s3_key: str, metadata: Optional[Dict[str, str]] = None) -> Optional[str]:
         """
-        Upload file to S3
+        Upload file to S3 (multipart, parts in parallel)
         
         Args:
             file_path: Local path of file to upload
             s3_key: Key (path) to store in S3
+            metadata: Optional object metadata
         
         Returns:
             S3 path or None (on failure)
@@ -90,7 +400,10 @@ class InfinitetalkS3Client:
             
             logger.info(f"S3 upload started: {file_path} -> s3://{self.s3_bucket_name}/{s3_key}")
             
-            self.s3_client.upload_file(file_path, self.s3_bucket_name, s3_key)
+            extra_args = {'Metadata': metadata} if metadata else None
+            self.s3_client.upload_file(
+                file_path, self.s3_bucket_name, s3_key, ExtraArgs=extra_args, Config=self.transfer_config
+            )
             
             s3_path = f"/runpod-volume/{s3_key}"
             logger.info(f"✅ S3 upload successful: {s3_path}")
@@ -100,9 +413,73 @@ class InfinitetalkS3Client:
             logger.error(f"❌ S3 upload failed: {e}")
             return None
     
+    def file_sha256(self, file_path: str) -> str:
+        """sha256 hex digest of a local file, memoised on (path, size, mtime)"""
+        st = os.stat(file_path)
+        stamp = (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+        digest = self._digests.get(stamp)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                    sha.update(block)
+            digest = self._digests[stamp] = sha.hexdigest()
+        return digest
+    
+    def object_exists(self, s3_key: str, size: int) -> bool:
+        """HEAD the key; True if an object of the given size is already stored"""
+        try:
+            head = self.s3_client.head_object(Bucket=self.s3_bucket_name, Key=s3_key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchKey', 'NotFound'):
+                logger.warning(f"HEAD failed for {s3_key}, uploading anyway: {e}")
+            return False
+        return head.get('ContentLength') == size
+    
+    def upload_content_addressed(self, file_path: str, prefix: str = INPUT_PREFIX) -> Optional[str]:
+        """
+        Upload file under a key derived from its content, skipping objects already stored
+        
+        Args:
+            file_path: Local path of file to upload
+            prefix: Key prefix
+        
+        Returns:
+            S3 path or None (on failure)
+        """
+        try:
+            if not os.path.exists(file_path):
+                logger.error(f"File does not exist: {file_path}")
+                return None
+            digest = self.file_sha256(file_path)
+            ext = os.path.splitext(file_path)[1].lower()
+            s3_key = f"{prefix}/{digest}{ext}"
+            if self.object_exists(s3_key, os.path.getsize(file_path)):
+                logger.info(f"⏭️ Already on S3, skipping upload: {file_path} -> {s3_key}")
+                return f"/runpod-volume/{s3_key}"
+        except Exception as e:
+            logger.error(f"❌ S3 upload failed: {e}")
+            return None
+        return self.upload_to_s3(file_path, s3_key, metadata={'sha256': digest})
+    
+    def upload_inputs(self, file_paths: List[str]) -> Dict[str, Optional[str]]:
+        """
+        Upload several inputs concurrently (content-addressed)
+        
+        Args:
+            file_paths: List of local paths of files to upload
+        
+        Returns:
+            Dictionary with local path as key and S3 path as value
+        """
+        unique_paths = list(dict.fromkeys(file_paths))
+        with ThreadPoolExecutor(max_workers=max(1, len(unique_paths)), thread_name_prefix="upload") as executor:
+            s3_paths = executor.map(self.upload_content_addressed, unique_paths)
+            return dict(zip(unique_paths, s3_paths))
+    
     def upload_multiple_files(self, file_paths: List[str], s3_keys: List[str]) -> Dict[str, Optional[str]]:
         """
-        Upload multiple files to S3
+        Upload multiple files to S3 concurrently
         
         Args:
             file_paths: List of local paths of files to upload
@@ -111,14 +488,9 @@ class InfinitetalkS3Client:
         Returns:
             Dictionary with filename as key and S3 path as value
         """
-        results = {}
-        
-        for file_path, s3_key in zip(file_paths, s3_keys):
-            filename = os.path.basename(file_path)
-            s3_path = self.upload_to_s3(file_path, s3_key)
-            results[filename] = s3_path
-        
-        return results
+        with ThreadPoolExecutor(max_workers=max(1, len(file_paths)), thread_name_prefix="upload") as executor:
+            s3_paths = executor.map(self.upload_to_s3, file_paths, s3_keys)
+            return {os.path.basename(path): s3_path for path, s3_path in zip(file_paths, s3_paths)}
     
     def submit_job(self, input_data: Dict[str, Any]) -> Optional[str]:
         """
@@ -153,58 +525,101 @@ class InfinitetalkS3Client:
             logger.error(f"❌ Job submission failed: {e}")
             return None
     
-    def wait_for_completion(self, job_id: str, check_interval: int = 10, max_wait_time: int = 1800) -> Dict[str, Any]:
+    def estimate_job_seconds(
+        self,
+        audio_paths: List[Optional[str]],
+        max_frame: Optional[int] = None
+    ) -> Optional[float]:
+        """
+        Estimate render time from local audio length
+        
+        Args:
+            audio_paths: Local audio file paths (None entries are ignored)
+            max_frame: Maximum frame count, which caps the rendered length
+        
+        Returns:
+            Expected seconds or None if no duration could be read
+        """
+        if probe_duration is None:
+            return None
+        durations = []
+        for path in filter(None, audio_paths):
+            try:
+                duration = probe_duration(path)
+            except (OSError, ValueError) as e:
+                logger.debug(f"Audio duration probe failed for {path}: {e}")
+                duration = None
+            if duration:
+                durations.append(duration)
+        if not durations:
+            return None
+        seconds = max(durations)
+        if max_frame:
+            seconds = min(seconds, max_frame / OUTPUT_FPS)
+        return RENDER_OVERHEAD_SECONDS + seconds * RENDER_SECONDS_PER_AUDIO_SECOND
+    
+    def wait_for_completion(
+        self,
+        job_id: str,
+        check_interval: float = POLL_MAX_INTERVAL,
+        max_wait_time: int = 1800,
+        expected_seconds: Optional[float] = None,
+        long_poll_seconds: Optional[int] = None
+    ) -> Dict[str, Any]:
         """
         Wait for job completion
         
+        Polls adaptively: sparse checks while the expected finish is still ahead,
+        then exponential backoff with jitter, never longer than check_interval.
+        
         Args:
             job_id: Job ID
-            check_interval: Status check interval (seconds)
+            check_interval: Longest interval between status checks (seconds)
             max_wait_time: Maximum wait time (seconds)
+            expected_seconds: Expected render time once the job starts (see estimate_job_seconds)
+            long_poll_seconds: Ask the server to hold each status request up to this long
+                (defaults to 30 for api_base_url, 0 for RunPod)
         
         Returns:
             Job result dictionary
         """
+        if long_poll_seconds is None:
+            long_poll_seconds = self.long_poll_seconds
         start_time = time.time()
+        deadline = start_time + max_wait_time
+        running_since = None
+        interval = None
         
-        while time.time() - start_time < max_wait_time:
+        while time.time() < deadline:
+            request_started = time.time()
             try:
                 logger.info(f"⏱️ Checking job status... (Job ID: {job_id})")
                 
-                response = self.session.get(f"{self.status_url}/{job_id}", timeout=30)
+                wait = min(long_poll_seconds, max(0, int(deadline - request_started)))
+                response = self.session.get(
+                    f"{self.status_url}/{job_id}",
+                    params={'wait': wait} if wait else None,
+                    timeout=30 + wait
+                )
                 response.raise_for_status()
                 
                 status_data = response.json()
-                status = status_data.get('status')
-                
-                if status == 'COMPLETED':
-                    logger.info("✅ Job completed!")
-                    return {
-                        'status': 'COMPLETED',
-                        'output': status_data.get('output'),
-                        'job_id': job_id
-                    }
-                elif status == 'FAILED':
-                    logger.error("❌ Job failed.")
-                    return {
-                        'status': 'FAILED',
-                        'error': status_data.get('error', 'Unknown error'),
-                        'job_id': job_id
-                    }
-                elif status in ['IN_QUEUE', 'IN_PROGRESS']:
-                    logger.info(f"🏃 Job in progress... (status: {status})")
-                    time.sleep(check_interval)
-                else:
-                    logger.warning(f"❓ Unknown status: {status}")
-                    return {
-                        'status': 'UNKNOWN',
-                        'data': status_data,
-                        'job_id': job_id
-                    }
+                result = job_status_result(job_id, status_data, start_time)
+                if result is not None:
+                    return result
+                if wait and time.time() - request_started >= wait / 2:
+                    # The server held the request; ask again right away
+                    interval = None
+                    continue
+                interval, running_since = pending_poll_interval(
+                    status_data.get('status'), interval, running_since, expected_seconds, check_interval
+                )
                     
             except requests.exceptions.RequestException as e:
-                logger.error(f"❌ Error checking status: {e}")
-                time.sleep(check_interval)
+                logger.error(f"❌ Error checking status ({job_id}): {e}")
+                interval = next_poll_interval(interval, None, check_interval)
+            
+            time.sleep(max(0, min(interval, deadline - time.time())))
         
         logger.error(f"❌ Job wait timeout ({max_wait_time} seconds)")
         return {
@@ -244,13 +659,14 @@ class InfinitetalkS3Client:
                 return False
             
             # Create directory
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
             
-            # Decode and save video
-            decoded_video = base64.b64decode(video_b64)
-            
-            with open(output_path, 'wb') as f:
-                f.write(decoded_video)
+            # Decode and save video (slice by slice when base64_stream is available)
+            if decode_base64_to_file is not None:
+                decode_base64_to_file(video_b64, output_path)
+            else:
+                with open(output_path, 'wb') as f:
+                    f.write(base64.b64decode(video_b64))
             
             file_size = os.path.getsize(output_path)
             logger.info(f"✅ Video saved successfully: {output_path} ({file_size / (1024*1024):.1f}MB)")
@@ -262,7 +678,11 @@ class InfinitetalkS3Client:
     
     def download_video_from_s3(self, s3_path: str, output_path: str) -> bool:
         """
-        Download video file from S3
+        Download video file from S3 with parallel ranged GETs
+        
+        Parts are written in place into a preallocated temporary file, verified against the
+        object's size and checksum (sha256 metadata or a single-part MD5 ETag),
+        then renamed to output_path.
         
         Args:
             s3_path: S3 file path (e.g., /runpod-volume/infinitetalk_task_12345.mp4)
@@ -271,6 +691,7 @@ class InfinitetalkS3Client:
         Returns:
             Download success status
         """
+        tmp_path = f"{output_path}.part"
         try:
             # Extract key from S3 path (remove /runpod-volume/)
             s3_key = s3_path.replace('/runpod-volume/', '')
@@ -278,19 +699,109 @@ class InfinitetalkS3Client:
             logger.info(f"Downloading video from S3: s3://{self.s3_bucket_name}/{s3_key}")
             
             # Create directory
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
             
-            # Download file from S3
-            self.s3_client.download_file(self.s3_bucket_name, s3_key, output_path)
+            head = self.s3_client.head_object(Bucket=self.s3_bucket_name, Key=s3_key)
+            size = head['ContentLength']
+            etag = head.get('ETag', '')
+            ranges = [
+                (start, min(start + DOWNLOAD_PART_SIZE, size) - 1)
+                for start in range(0, size, DOWNLOAD_PART_SIZE)
+            ]
             
-            file_size = os.path.getsize(output_path)
-            logger.info(f"✅ S3 video download completed: {output_path} ({file_size / (1024*1024):.1f}MB)")
+            with open(tmp_path, 'wb') as f:
+                f.truncate(size)
+            with ThreadPoolExecutor(max_workers=DOWNLOAD_CONCURRENCY, thread_name_prefix="download") as executor:
+                # list() re-raises the first failed part
+                list(executor.map(lambda r: self._download_range(s3_key, etag, tmp_path, *r), ranges))
+            
+            self._verify_download(tmp_path, size, etag, head.get('Metadata', {}).get('sha256'))
+            os.replace(tmp_path, output_path)
+            
+            logger.info(
+                f"✅ S3 video download completed: {output_path} "
+                f"({size / (1024*1024):.1f}MB, {len(ranges)} parts)"
+            )
             return True
             
         except Exception as e:
             logger.error(f"❌ S3 video download failed: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
             return False
     
+    def _download_range(self, s3_key: str, etag: str, path: str, start: int, end: int) -> None:
+        """Stream bytes start..end (inclusive) of the object into path at the same offset"""
+        extra = {'IfMatch': etag} if etag else {}
+        response = self.s3_client.get_object(
+            Bucket=self.s3_bucket_name, Key=s3_key, Range=f"bytes={start}-{end}", **extra
+        )
+        offset = start
+        # Own handle per range: portable (no os.pwrite on Windows) and no shared file position
+        with open(path, 'r+b') as f:
+            f.seek(start)
+            for chunk in response['Body'].iter_chunks(DOWNLOAD_CHUNK_SIZE):
+                f.write(chunk)
+                offset += len(chunk)
+        if offset != end + 1:
+            raise IOError(f"Short read for bytes {start}-{end}: got {offset - start} bytes")
+    
+    def _verify_download(self, path: str, size: int, etag: str, sha256: Optional[str]) -> None:
+        """Raise IOError if the downloaded file does not match the object"""
+        if os.path.getsize(path) != size:
+            raise IOError(f"Size mismatch: expected {size}, got {os.path.getsize(path)}")
+        etag = etag.strip('"')
+        if sha256:
+            expected, digest = sha256, hashlib.sha256()
+        elif len(etag) == 32 and '-' not in etag:
+            # A multipart ETag (with "-N") is not a content hash; only size is checked then
+            expected, digest = etag, hashlib.md5()
+        else:
+            return
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        if digest.hexdigest() != expected:
+            raise IOError(f"Checksum mismatch: expected {expected}, got {digest.hexdigest()}")
+    
+    def get_video_url(self, s3_path: str, expires_in: int = PRESIGNED_URL_SECONDS) -> Optional[str]:
+        """
+        Presigned GET URL for a video on the network volume
+        
+        Args:
+            s3_path: S3 file path (e.g., /runpod-volume/infinitetalk_task_12345.mp4)
+            expires_in: URL lifetime (seconds)
+        
+        Returns:
+            URL or None (on failure)
+        """
+        try:
+            return self.s3_client.generate_presigned_url(
+                'get_object',
+                Params={'Bucket': self.s3_bucket_name, 'Key': s3_path.replace('/runpod-volume/', '')},
+                ExpiresIn=expires_in
+            )
+        except Exception as e:
+            logger.error(f"❌ Presigned URL generation failed: {e}")
+            return None
+    
+    def get_result_url(self, result: Dict[str, Any], expires_in: int = PRESIGNED_URL_SECONDS) -> Optional[str]:
+        """
+        Presigned URL for a completed network-volume job, so consumers fetch straight from storage
+        
+        Args:
+            result: Job result dictionary
+            expires_in: URL lifetime (seconds)
+        
+        Returns:
+            URL or None (job not completed or result not on the network volume)
+        """
+        video_path = (result.get('output') or {}).get('video_path')
+        if result.get('status') != 'COMPLETED' or not video_path:
+            logger.error("Presigned URLs need a completed network_volume job")
+            return None
+        return self.get_video_url(video_path, expires_in)
+    
     def create_video_from_files(
         self,
         image_path: str,
@@ -332,65 +843,38 @@ class InfinitetalkS3Client:
         if person_count == "multi" and audio_path_2 and not os.path.exists(audio_path_2):
             return {"error": f"Second audio file does not exist: {audio_path_2}"}
         
-        # Upload files to S3
-        timestamp = int(time.time())
+        # Upload files to S3 concurrently; content-addressed, so repeated inputs are not re-sent
+        use_audio_2 = person_count == "multi" and audio_path_2
+        uploaded = self.upload_inputs([image_path, audio_path] + ([audio_path_2] if use_audio_2 else []))
         
-        # Upload image
-        image_s3_key = f"input/infinitetalk/{timestamp}_{os.path.basename(image_path)}"
-        image_s3_path = self.upload_to_s3(image_path, image_s3_key)
+        image_s3_path = uploaded[image_path]
         if not image_s3_path:
             return {"error": "Image S3 upload failed"}
         
-        # Upload audio
-        audio_s3_key = f"input/infinitetalk/{timestamp}_{os.path.basename(audio_path)}"
-        audio_s3_path = self.upload_to_s3(audio_path, audio_s3_key)
+        audio_s3_path = uploaded[audio_path]
         if not audio_s3_path:
             return {"error": "Audio S3 upload failed"}
         
-        # Upload second audio (for multiple people)
+        # Second audio (for multiple people)
         audio_s3_path_2 = None
-        if person_count == "multi" and audio_path_2:
-            audio_s3_key_2 = f"input/infinitetalk/{timestamp}_{os.path.basename(audio_path_2)}"
-            audio_s3_path_2 = self.upload_to_s3(audio_path_2, audio_s3_key_2)
+        if use_audio_2:
+            audio_s3_path_2 = uploaded[audio_path_2]
             if not audio_s3_path_2:
                 return {"error": "Second audio S3 upload failed"}
         
         # Configure API input data
-        input_data = {
-            "input_type": input_type,
-            "person_count": person_count,
-            "prompt": prompt,
-            "width": width,
-            "height": height
-        }
-        
-        # Set media input
-        if input_type == "image":
-            input_data["image_path"] = image_s3_path
-        else:
-            input_data["video_path"] = image_s3_path
-        
-        # Set audio input
-        input_data["wav_path"] = audio_s3_path
-        
-        # Set second audio (for multiple people)
-        if person_count == "multi" and audio_s3_path_2:
-            input_data["wav_path_2"] = audio_s3_path_2
-        
-        # Set max_frame
-        if max_frame:
-            input_data["max_frame"] = max_frame
-        
-        # Set network_volume
-        if use_network_volume:
-            input_data["network_volume"] = True
+        input_data = build_job_input(
+            input_type, person_count, prompt, width, height, image_s3_path,
+            audio_s3_path, audio_s3_path_2, max_frame, use_network_volume
+        )
         
         # Submit job and wait
         job_id = self.submit_job(input_data)
         if not job_id:
             return {"error": "Job submission failed"}
         
-        result = self.wait_for_completion(job_id)
+        expected_seconds = self.estimate_job_seconds([audio_path, audio_path_2], max_frame)
+        result = self.wait_for_completion(job_id, expected_seconds=expected_seconds)
         return result
     
     def batch_process_audio_files(
@@ -404,11 +888,20 @@ class InfinitetalkS3Client:
         height: int = 512,
         max_frame: Optional[int] = None,
         person_count: str = "single",
-        input_type: str = "image"
+        input_type: str = "image",
+        max_in_flight: int = BATCH_MAX_IN_FLIGHT,
+        upload_concurrency: int = BATCH_UPLOAD_CONCURRENCY,
+        manifest_path: Optional[str] = None,
+        on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+        presign_results: bool = False
     ) -> Dict[str, Any]:
         """
         Batch process all audio files in folder
         
+        Files are pipelined: up to max_in_flight files are uploaded, submitted, polled
+        and downloaded at once. Progress is recorded in a manifest so that re-running
+        the same batch after a crash skips finished files and resumes pending jobs.
+        
         Args:
             image_path: Common image file path to use
             audio_folder_path: Folder path containing audio files
@@ -420,136 +913,123 @@ class InfinitetalkS3Client:
             max_frame: Maximum frame count
             person_count: Number of people
             input_type: Input type
+            max_in_flight: Maximum number of files processed concurrently
+            upload_concurrency: Maximum number of concurrent S3 uploads
+            manifest_path: Manifest file (default: <output_folder_path>/batch_manifest.jsonl; an existing
+                batch_manifest.json from earlier versions is resumed and converted)
+            on_result: Called with each per-file result as soon as it is final
+            presign_results: Record presigned video URLs instead of downloading results
+                (needs network_volume; it is enabled automatically)
         
         Returns:
             Batch processing result dictionary
         """
-        # Check paths
-        if not os.path.exists(image_path):
-            return {"error": f"Image file does not exist: {image_path}"}
-        
-        if not os.path.isdir(audio_folder_path):
-            return {"error": f"Audio folder does not exist: {audio_folder_path}"}
-        
-        # Create output folder
-        os.makedirs(output_folder_path, exist_ok=True)
-        
-        # Get audio file list
-        audio_files = [
-            f for f in os.listdir(audio_folder_path)
-            if f.lower().endswith(valid_extensions)
-        ]
-        
-        if not audio_files:
-            return {"error": f"No audio files to process: {audio_folder_path}"}
-        
-        logger.info(f"Batch processing started: {len(audio_files)} files")
-        
-        results = {
-            "total_files": len(audio_files),
-            "successful": 0,
-            "failed": 0,
-            "results": []
-        }
+        audio_files, error = find_batch_files(image_path, audio_folder_path, output_folder_path, valid_extensions)
+        if error:
+            return error
         
-        # Pre-upload common image to S3
-        timestamp = int(time.time())
-        image_s3_key = f"input/infinitetalk/batch_{timestamp}_{os.path.basename(image_path)}"
-        image_s3_path = self.upload_to_s3(image_path, image_s3_key)
+        manifest = BatchManifest(manifest_path or os.path.join(output_folder_path, BATCH_MANIFEST_NAME))
+        results = new_batch_results(len(audio_files))
         
-        if not image_s3_path:
-            return {"error": "Common image S3 upload failed"}
+        def report(result):
+            count_batch_result(results, result)
+            if on_result:
+                try:
+                    on_result(result)
+                except Exception as e:
+                    logger.error(f"[{result['filename']}] on_result callback failed: {e}")
         
-        # Process each audio file
-        for filename in audio_files:
-            logger.info(f"\n==================== Processing started: {filename} ====================")
-            
-            audio_path = os.path.join(audio_folder_path, filename)
-            
-            # Upload audio file to S3
-            audio_s3_key = f"input/infinitetalk/batch_{timestamp}_{filename}"
-            audio_s3_path = self.upload_to_s3(audio_path, audio_s3_key)
-            
-            if not audio_s3_path:
-                logger.error(f"[{filename}] S3 upload failed")
-                results["failed"] += 1
-                results["results"].append({
-                    "filename": filename,
-                    "status": "failed",
-                    "error": "S3 upload failed"
-                })
-                continue
-            
-            # Configure API input data
-            input_data = {
-                "input_type": input_type,
-                "person_count": person_count,
-                "prompt": prompt,
-                "width": width,
-                "height": height
-            }
-            
-            # Set media input
-            if input_type == "image":
-                input_data["image_path"] = image_s3_path
-            else:
-                input_data["video_path"] = image_s3_path
+        try:
+            pending = []
+            for filename in audio_files:
+                entry = manifest.get(filename)
+                if batch_entry_done(entry, presign_results):
+                    if presign_results:
+                        # Earlier URLs may have expired
+                        entry = manifest.update(filename, video_url=self.get_video_url(entry["video_path"]))
+                    results["resumed"] += 1
+                    report(entry)
+                else:
+                    pending.append(filename)
             
-            # Set audio input
-            input_data["wav_path"] = audio_s3_path
+            logger.info(f"Batch processing started: {len(pending)} files ({results['resumed']} already done)")
             
-            # Set max_frame
-            if max_frame:
-                input_data["max_frame"] = max_frame
+            # Pre-upload common image to S3
+            image_s3_path = None
+            if pending:
+                image_s3_path = self.upload_content_addressed(image_path)
+                if not image_s3_path:
+                    return {"error": "Common image S3 upload failed"}
             
-            # Submit job and wait
-            job_id = self.submit_job(input_data)
-            if not job_id:
-                logger.error(f"[{filename}] Job submission failed")
-                results["failed"] += 1
-                results["results"].append({
-                    "filename": filename,
-                    "status": "failed",
-                    "error": "Job submission failed"
-                })
-                continue
+            # Configure API input data shared by every file (wav_path is set per file)
+            base_input = build_job_input(
+                input_type, person_count, prompt, width, height, image_s3_path,
+                None, max_frame=max_frame, network_volume=presign_results
+            )
             
-            result = self.wait_for_completion(job_id)
+            upload_slots = threading.Semaphore(max(1, upload_concurrency))
             
-            if result.get('status') == 'COMPLETED':
-                # Save result file
-                base_filename = os.path.splitext(filename)[0]
-                output_filename = os.path.join(output_folder_path, f"result_{base_filename}.mp4")
+            def process(filename):
+                audio_path = os.path.join(audio_folder_path, filename)
+                entry = manifest.get(filename)
+                
+                def fail(error):
+                    logger.error(f"[{filename}] {error}")
+                    return manifest.update(filename, status="failed", error=error)
+                
+                # Upload audio file to S3
+                audio_s3_path = entry.get("audio_s3_path")
+                if not audio_s3_path:
+                    with upload_slots:
+                        audio_s3_path = self.upload_content_addressed(audio_path)
+                    if not audio_s3_path:
+                        return fail("S3 upload failed")
+                    manifest.update(filename, status="uploaded", audio_s3_path=audio_s3_path)
+                
+                # Submit job unless a previous run already did
+                job_id = resumable_job_id(entry)
+                if not job_id:
+                    job_id = self.submit_job({**base_input, "wav_path": audio_s3_path})
+                    if not job_id:
+                        return fail("Job submission failed")
+                    manifest.update(filename, status="submitted", job_id=job_id)
+                
+                expected_seconds = self.estimate_job_seconds([audio_path], max_frame)
+                result = self.wait_for_completion(job_id, expected_seconds=expected_seconds)
+                if result.get('status') != 'COMPLETED':
+                    # Forget the job so a resumed run submits it again
+                    manifest.update(filename, job_id=None)
+                    return fail(f"Job failed: {result.get('error', result.get('status'))}")
                 
-                if self.save_video_result(result, output_filename):
+                if presign_results:
+                    video_url = self.get_result_url(result)
+                    if not video_url:
+                        return fail("Presigned URL generation failed")
                     logger.info(f"✅ [{filename}] Processing completed")
-                    results["successful"] += 1
-                    results["results"].append({
-                        "filename": filename,
-                        "status": "success",
-                        "output_file": output_filename,
-                        "job_id": job_id
-                    })
-                else:
-                    logger.error(f"[{filename}] Result save failed")
-                    results["failed"] += 1
-                    results["results"].append({
-                        "filename": filename,
-                        "status": "failed",
-                        "error": "Result save failed",
-                        "job_id": job_id
-                    })
-            else:
-                logger.error(f"[{filename}] Job failed: {result.get('error', 'Unknown error')}")
-                results["failed"] += 1
-                results["results"].append({
-                    "filename": filename,
-                    "status": "failed",
-                    "error": result.get('error', 'Unknown error'),
-                    "job_id": job_id
-                })
+                    return manifest.update(
+                        filename, status="success", video_path=result['output']['video_path'], video_url=video_url, error=None
+                    )
+                
+                # Save result file
+                output_filename = batch_output_file(output_folder_path, filename)
+                if not self.save_video_result(result, output_filename):
+                    return fail("Result save failed")
+                
+                logger.info(f"✅ [{filename}] Processing completed")
+                return manifest.update(filename, status="success", output_file=output_filename, error=None)
             
-            logger.info(f"==================== Processing completed: {filename} ====================")
+            with ThreadPoolExecutor(max_workers=max(1, max_in_flight), thread_name_prefix="batch") as executor:
+                futures = {executor.submit(process, filename): filename for filename in pending}
+                for future in as_completed(futures):
+                    filename = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"[{filename}] Unexpected error: {e}")
+                        result = manifest.update(filename, status="failed", error=str(e))
+                    report(result)
+        finally:
+            manifest.close()
         
         logger.info(f"\n🎉 Batch processing completed: {results['successful']}/{results['total_files']} successful")
         return results
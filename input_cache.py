@@ -0,0 +1,238 @@
+import hashlib
+import logging
+import os
+import threading
+import urllib.parse
+from collections import OrderedDict
+
+from output_placement import copy_file
+
+logger = logging.getLogger(__name__)
+
+INPUT_CACHE_DIR = os.getenv("INPUT_CACHE_DIR", "/tmp/infinitetalk/input_cache")
+# 0 disables the cache
+INPUT_CACHE_MAX_BYTES = int(os.getenv("INPUT_CACHE_MAX_BYTES", str(10 * 1024 * 1024 * 1024)))
+HASH_CHUNK_CHARS = 4 * 1024 * 1024
+# Sidecar whose mtime records when an entry was last stored or served
+USED_SUFFIX = ".used"
+
+
+def link_or_copy(src, dst):
+    """Hardlink src to dst, falling back to a kernel-side copy across filesystems."""
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        copy_file(src, dst)
+    return dst
+
+
+# Query parameters of presigned URLs that change per signature, not per object
+_SIGNING_PARAMS = ("x-amz-", "x-goog-", "awsaccesskeyid", "signature", "expires")
+
+
+def _cache_url(url):
+    """url without presigning parameters, so re-signed URLs for one object share a key."""
+    parts = urllib.parse.urlsplit(url)
+    query = [
+        (name, value)
+        for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith(_SIGNING_PARAMS)
+    ]
+    return urllib.parse.urlunsplit(parts._replace(query=urllib.parse.urlencode(query), fragment=""))
+
+
+def url_cache_key(url, headers):
+    """Key a URL by the validators of its GET response (ETag, else Last-Modified + length).
+
+    None if the response has neither.
+    """
+    etag = headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        validator = f"etag:{etag}"
+    elif headers.get("Last-Modified"):
+        validator = f"lm:{headers.get('Last-Modified')}:{headers.get('Content-Length')}"
+    else:
+        return None
+    return hashlib.sha256(f"url\0{_cache_url(url)}\0{validator}".encode("utf-8")).hexdigest()
+
+
+def base64_cache_key(data):
+    """Hash a base64 payload in slices so a large string is never copied whole."""
+    digest = hashlib.sha256(b"base64\0")
+    for start in range(0, len(data), HASH_CHUNK_CHARS):
+        digest.update(data[start:start + HASH_CHUNK_CHARS].encode("ascii", errors="ignore"))
+    return digest.hexdigest()
+
+
+class InputCache:
+    """Content-addressed on-disk cache with LRU eviction by total bytes."""
+
+    label = "Input cache"
+
+    def __init__(self, root=INPUT_CACHE_DIR, max_bytes=INPUT_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        if self.enabled:
+            os.makedirs(root, exist_ok=True)
+            self._load()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def _load(self):
+        found = []
+        for dirpath, _, filenames in os.walk(self.root):
+            names = set(filenames)
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if name.endswith(".tmp") or (name.endswith(USED_SUFFIX) and name[:-len(USED_SUFFIX)] not in names):
+                    os.remove(path)
+                    continue
+                if name.endswith(USED_SUFFIX):
+                    continue
+                found.append((self.last_used(name), name, os.path.getsize(path)))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total += size
+        if found:
+            logger.info(f"{self.label}: {len(found)} entries, {self._total} bytes in {self.root}")
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def _used_path(self, key):
+        return self._path(key) + USED_SUFFIX
+
+    def _touch(self, key):
+        # Recency lives in a sidecar: the entry shares its inode with files handed to jobs
+        with open(self._used_path(key), "a"):
+            pass
+        os.utime(self._used_path(key))
+
+    def last_used(self, key):
+        """Time key was last stored or served (its mtime for entries without a sidecar)."""
+        try:
+            return os.path.getmtime(self._used_path(key))
+        except FileNotFoundError:
+            return os.path.getmtime(self._path(key))
+
+    def get(self, key, dest):
+        """Hardlink the cached entry to dest. Returns dest on a hit, None on a miss."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        path = self._path(key)
+        try:
+            link_or_copy(path, dest)
+            self._touch(key)
+        except FileNotFoundError:
+            with self._lock:
+                self._total -= self._entries.pop(key, 0)
+                self.hits -= 1
+                self.misses += 1
+            return None
+        return dest
+
+    def put(self, key, src):
+        """Adopt src into the cache (by hardlink when possible) and evict down to max_bytes."""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        link_or_copy(src, tmp)
+        os.replace(tmp, path)
+        self._touch(key)
+        size = os.path.getsize(path)
+        with self._lock:
+            self._total += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            evicted = []
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._total -= old_size
+                evicted.append(old_key)
+        for old_key in evicted:
+            self._remove(old_key)
+        if evicted:
+            logger.info(f"{self.label} evicted {len(evicted)} entries")
+
+    def _remove(self, key):
+        for path in (self._path(key), self._used_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # A concurrent eviction or expiry removed it first
+                pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = InputCache()
+        return _cache
+
+
+def fetch_url(url, dest, fetch):
+    """Serve url from the cache, or let fetch(url, dest, on_headers) download it and remember the result.
+
+    The key comes from the GET response itself (see downloader.download's on_headers),
+    so a hit costs the response headers only and presigned GET URLs are cached too.
+    """
+    cache = get_cache()
+    if not cache.enabled:
+        return fetch(url, dest)
+    lookup = {"key": None, "hit": False}
+
+    def on_headers(headers):
+        key = lookup["key"] = url_cache_key(url, headers)
+        lookup["hit"] = key is not None and cache.get(key, dest) is not None
+        return lookup["hit"]
+
+    fetch(url, dest, on_headers=on_headers)
+    if lookup["hit"]:
+        logger.info(f"Input cache hit: {url}")
+    elif lookup["key"] is not None:
+        cache.put(lookup["key"], dest)
+    return dest
+
+
+def fetch_base64(data, dest, decode):
+    """Serve a base64 payload from the cache, or call decode(data, dest) and remember the result."""
+    cache = get_cache()
+    if not cache.enabled:
+        return decode(data, dest)
+    key = base64_cache_key(data)
+    if cache.get(key, dest):
+        logger.info("Input cache hit: base64 payload")
+        return dest
+    decode(data, dest)
+    cache.put(key, dest)
+    return dest
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+
+# Seconds without any ComfyUI event after which a running job is flagged as stalled
+STALL_SECONDS = 120
+
+
+class JobProgress:
+    """Per-job progress fed by ComfyUI events (reader thread) and read by API streams (event loop).
+
+    percent averages the sampler step fraction over every prompt of the job
+    (several for segmented jobs); eta extrapolates from the rate since the first step.
+    Prompts are tracked per handle, so a pool failover (new prompt_id on the same
+    handle) restarts that prompt's fraction instead of dropping its events.
+    """
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.stage = "queued"
+        self.node = None
+        self.step = None
+        self.steps = None
+        self.created_at = time.time()
+        self.updated_at = self.created_at
+        # handle index -> [current prompt_id, step fraction]
+        self._prompts = {}
+        self._first_step_at = None
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def set_stage(self, stage):
+        with self._lock:
+            self.stage = stage
+            self.updated_at = time.time()
+        self._publish()
+
+    def track(self, handle):
+        """Follow a queued PromptHandle."""
+        with self._lock:
+            key = len(self._prompts)
+            self._prompts[key] = [handle.prompt_id, 0.0]
+        handle.add_listener(lambda msg_type, data: self.on_event(msg_type, data, key))
+
+    def on_event(self, msg_type, data, key=None):
+        with self._lock:
+            prompt = self._prompts.get(key)
+            prompt_id = data.get("prompt_id")
+            if prompt is not None and prompt_id and prompt_id != prompt[0]:
+                # The pool resubmitted this prompt elsewhere; it renders from the start again
+                prompt[0], prompt[1] = prompt_id, 0.0
+            if msg_type == "executing":
+                self.node = data.get("node")
+                if self.node is None and prompt is not None:
+                    prompt[1] = 1.0
+            elif msg_type == "progress":
+                self.node = data.get("node", self.node)
+                self.step, self.steps = data.get("value"), data.get("max")
+                if self.steps and prompt is not None:
+                    prompt[1] = max(prompt[1], self.step / self.steps)
+                    self._first_step_at = self._first_step_at or time.time()
+            elif msg_type not in ("executed", "execution_cached", "execution_start"):
+                return
+            self.updated_at = time.time()
+        self._publish()
+
+    def snapshot(self):
+        with self._lock:
+            now = time.time()
+            fractions = [fraction for _, fraction in self._prompts.values()]
+            percent = round(100 * sum(fractions) / len(fractions), 1) if fractions else 0.0
+            eta = None
+            if self._first_step_at and 0 < percent < 100:
+                eta = round((now - self._first_step_at) * (100 - percent) / percent, 1)
+            idle = round(now - self.updated_at, 1)
+            return {
+                "id": self.job_id,
+                "stage": self.stage,
+                "node": self.node,
+                "step": self.step,
+                "steps": self.steps,
+                "percent": percent,
+                "eta_seconds": eta,
+                "elapsed_seconds": round(now - self.created_at, 1),
+                "idle_seconds": idle,
+                "stalled": self.stage == "rendering" and idle > STALL_SECONDS,
+            }
+
+    def _publish(self):
+        snapshot = self.snapshot()
+        for loop, queue in list(self._subscribers):
+            loop.call_soon_threadsafe(queue.put_nowait, snapshot)
+
+    def subscribe(self):
+        """Register an asyncio.Queue (on the running loop) that receives every new snapshot."""
+        queue = asyncio.Queue()
+        entry = (asyncio.get_running_loop(), queue)
+        self._subscribers.add(entry)
+        queue.put_nowait(self.snapshot())
+        return entry
+
+    def unsubscribe(self, entry):
+        self._subscribers.discard(entry)
@@ -0,0 +1,132 @@
+import asyncio
+import collections
+import logging
+import math
+import os
+import time
+
+from comfy_client import parse_backends
+
+logger = logging.getLogger(__name__)
+
+# ComfyUI renders one prompt at a time per GPU. Two in flight per backend lets the
+# next job stage its inputs and sit in ComfyUI's queue while the current one renders.
+BACKEND_COUNT = len(parse_backends(os.getenv("SERVER_ADDRESS", "127.0.0.1")))
+MAX_INFLIGHT_JOBS = int(os.getenv("MAX_INFLIGHT_JOBS", str(2 * BACKEND_COUNT)))
+MAX_PENDING_JOBS = int(os.getenv("MAX_PENDING_JOBS", "32"))
+# Initial guess for Retry-After until real job durations have been observed
+DEFAULT_JOB_SECONDS = float(os.getenv("DEFAULT_JOB_SECONDS", "120"))
+
+
+class QueueFull(Exception):
+    def __init__(self, retry_after):
+        super().__init__(f"Job queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class SchedulerClosed(Exception):
+    def __init__(self, retry_after):
+        super().__init__("Scheduler is not accepting jobs")
+        self.retry_after = retry_after
+
+
+class JobScheduler:
+    """Bounded FIFO admission queue in front of a fixed number of async workers."""
+
+    def __init__(self, runner, max_inflight=MAX_INFLIGHT_JOBS, max_pending=MAX_PENDING_JOBS):
+        self._runner = runner
+        self.max_inflight = max(1, max_inflight)
+        self.max_pending = max(0, max_pending)
+        self._pending = collections.deque()
+        self._available = None
+        self._workers = []
+        self._inflight = set()
+        self._closed = False
+        self._avg_seconds = DEFAULT_JOB_SECONDS
+
+    def start(self):
+        """Spawn the worker coroutines. Must be called from the running event loop."""
+        if self._workers:
+            return
+        self._available = asyncio.Semaphore(0)
+        self._closed = False
+        for i in range(self.max_inflight):
+            self._workers.append(asyncio.create_task(self._worker(i)))
+        logger.info(f"Job scheduler started: max_inflight={self.max_inflight}, max_pending={self.max_pending}")
+
+    async def stop(self):
+        self._closed = True
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        while self._pending:
+            _, _, future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(SchedulerClosed(self.retry_after()))
+
+    def submit(self, job_id, job_input):
+        """Enqueue a job and return a future for the runner's result.
+
+        Raises QueueFull when the pending queue is at capacity and SchedulerClosed
+        while the scheduler is not running.
+        """
+        if self._closed or not self._workers:
+            raise SchedulerClosed(self.retry_after())
+        idle_workers = self.max_inflight - len(self._inflight)
+        if len(self._pending) >= self.max_pending + idle_workers:
+            raise QueueFull(self.retry_after())
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((job_id, job_input, future))
+        self._available.release()
+        return future
+
+    def position(self, job_id):
+        """1-based position in the pending queue, or None once the job has started."""
+        for index, (pending_id, _, _) in enumerate(self._pending):
+            if pending_id == job_id:
+                return index + 1
+        return None
+
+    def retry_after(self):
+        """Rough seconds until a worker frees a slot, based on observed job durations."""
+        return max(1, math.ceil(self._avg_seconds / self.max_inflight))
+
+    def stats(self):
+        return {
+            "pending": len(self._pending),
+            "inflight": len(self._inflight),
+            "max_pending": self.max_pending,
+            "max_inflight": self.max_inflight,
+            "avg_job_seconds": round(self._avg_seconds, 1),
+        }
+
+    async def _worker(self, index):
+        while True:
+            await self._available.acquire()
+            if not self._pending:
+                continue
+            job_id, job_input, future = self._pending.popleft()
+            if future.cancelled():
+                continue
+            self._inflight.add(job_id)
+            started = time.time()
+            try:
+                result = await self._runner(job_id, job_input)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                logger.error(f"Job {job_id} failed in worker {index}: {e}")
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self._inflight.discard(job_id)
+                # Exponential moving average keeps Retry-After tracking the current workload
+                self._avg_seconds = 0.8 * self._avg_seconds + 0.2 * (time.time() - started)
+            # Drop the reference to the (possibly base64-laden) input as soon as the job is done
+            del job_input
@@ -0,0 +1,303 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+JOB_STORE = os.getenv("JOB_STORE", "memory")
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "/tmp/infinitetalk/jobs.sqlite3")
+# Job metadata (status, error, paths) is forgotten this long after the job finishes
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", str(7 * 24 * 3600)))
+JOB_STORE_MAX_ENTRIES = int(os.getenv("JOB_STORE_MAX_ENTRIES", "10000"))
+# Cap on base64 payload bytes held by the store; oldest payloads are dropped first
+JOB_STORE_MAX_BYTES = int(os.getenv("JOB_STORE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Materialised result files are removed this long after completion
+RESULT_TTL_SECONDS = int(os.getenv("RESULT_TTL_SECONDS", str(24 * 3600)))
+# Base64 payloads (output=base64) are dropped from job output after this long
+BASE64_TTL_SECONDS = int(os.getenv("BASE64_TTL_SECONDS", "600"))
+
+TERMINAL_STATUSES = ("COMPLETED", "FAILED")
+# Output key that carries the (large) base64 payload
+PAYLOAD_KEY = "video"
+
+
+def _payload_size(output):
+    if output and isinstance(output.get(PAYLOAD_KEY), str):
+        return len(output[PAYLOAD_KEY])
+    return 0
+
+
+class MemoryJobStore:
+    """In-process job store with TTL, entry-count and payload-byte limits."""
+
+    def __init__(
+        self,
+        ttl=JOB_TTL_SECONDS,
+        max_entries=JOB_STORE_MAX_ENTRIES,
+        max_bytes=JOB_STORE_MAX_BYTES,
+        payload_ttl=BASE64_TTL_SECONDS,
+        result_ttl=RESULT_TTL_SECONDS,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.payload_ttl = payload_ttl
+        self.result_ttl = result_ttl
+        self._jobs = OrderedDict()
+        self._payload_bytes = 0
+        self._lock = threading.Lock()
+
+    def create(self, job_id, **fields):
+        now = time.time()
+        job = {"id": job_id, "output": None, "error": None, "result_file": None, "created_at": now, "updated_at": now}
+        job.update(fields)
+        with self._lock:
+            self._jobs[job_id] = job
+        return dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return False
+            if "output" in fields:
+                self._payload_bytes += _payload_size(fields["output"]) - _payload_size(job.get("output"))
+            job.update(fields)
+            job["updated_at"] = time.time()
+            return True
+
+    def delete(self, job_id):
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is not None:
+                self._payload_bytes -= _payload_size(job.get("output"))
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def sweep(self, now=None):
+        """Apply retention. Returns result files that should be deleted from disk."""
+        now = now or time.time()
+        expired_files = []
+        with self._lock:
+            finished = [job for job in self._jobs.values() if job["status"] in TERMINAL_STATUSES]
+            finished.sort(key=lambda job: job["updated_at"])
+            over_entries = max(0, len(self._jobs) - self.max_entries)
+            for job in finished:
+                age = now - job["updated_at"]
+                if age > self.ttl or over_entries > 0:
+                    if job.get("result_file"):
+                        expired_files.append(job["result_file"])
+                    self._payload_bytes -= _payload_size(job.get("output"))
+                    del self._jobs[job["id"]]
+                    over_entries -= 1
+                    continue
+                if _payload_size(job.get("output")) and (age > self.payload_ttl or self._payload_bytes > self.max_bytes):
+                    self._payload_bytes -= _payload_size(job["output"])
+                    job["output"] = _drop_payload(job["output"])
+                if job.get("result_file") and age > self.result_ttl:
+                    expired_files.append(job["result_file"])
+                    job["result_file"] = None
+                    job["output"] = {"expired": True}
+        return expired_files
+
+    def stats(self):
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._jobs), "payload_bytes": self._payload_bytes}
+
+
+def _drop_payload(output):
+    output = {k: v for k, v in output.items() if k != PAYLOAD_KEY}
+    output["base64_expired"] = True
+    return output
+
+
+class SQLiteJobStore:
+    """Job metadata in SQLite so /status survives a restart.
+
+    Base64 payloads go to a separate table on disk rather than RAM and follow
+    their own (shorter) retention.
+    """
+
+    def __init__(
+        self,
+        path=JOB_STORE_PATH,
+        ttl=JOB_TTL_SECONDS,
+        max_entries=JOB_STORE_MAX_ENTRIES,
+        max_bytes=JOB_STORE_MAX_BYTES,
+        payload_ttl=BASE64_TTL_SECONDS,
+        result_ttl=RESULT_TTL_SECONDS,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.payload_ttl = payload_ttl
+        self.result_ttl = result_ttl
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT, fields TEXT, result_file TEXT, "
+            "created_at REAL, updated_at REAL)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS payloads (id TEXT PRIMARY KEY, data TEXT, size INTEGER)")
+        # Jobs that were queued or running when the process died will never finish
+        interrupted = self._db.execute(
+            "UPDATE jobs SET status = 'FAILED', updated_at = ?, "
+            "fields = json_set(fields, '$.error', 'Interrupted by API restart') "
+            "WHERE status NOT IN ('COMPLETED', 'FAILED')",
+            (time.time(),),
+        ).rowcount
+        if interrupted:
+            logger.warning(f"Marked {interrupted} interrupted jobs as FAILED")
+
+    def _row_to_job(self, row):
+        job_id, status, fields, result_file, created_at, updated_at = row
+        job = json.loads(fields)
+        job.update(id=job_id, status=status, result_file=result_file, created_at=created_at, updated_at=updated_at)
+        output = job.get("output")
+        if output and output.get("_payload"):
+            payload = self._db.execute("SELECT data FROM payloads WHERE id = ?", (job_id,)).fetchone()
+            output = {k: v for k, v in output.items() if k != "_payload"}
+            if payload is not None:
+                output[PAYLOAD_KEY] = payload[0]
+            else:
+                output["base64_expired"] = True
+            job["output"] = output
+        return job
+
+    def _write(self, job):
+        fields = {k: v for k, v in job.items() if k not in ("id", "status", "result_file", "created_at", "updated_at")}
+        output = fields.get("output")
+        if output and PAYLOAD_KEY in output:
+            payload = output[PAYLOAD_KEY]
+            fields["output"] = {k: v for k, v in output.items() if k != PAYLOAD_KEY}
+            fields["output"]["_payload"] = True
+            self._db.execute(
+                "INSERT OR REPLACE INTO payloads (id, data, size) VALUES (?, ?, ?)", (job["id"], payload, len(payload))
+            )
+        self._db.execute(
+            "INSERT OR REPLACE INTO jobs (id, status, fields, result_file, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job["id"], job["status"], json.dumps(fields), job.get("result_file"), job["created_at"], job["updated_at"]),
+        )
+
+    def create(self, job_id, **fields):
+        now = time.time()
+        job = {"id": job_id, "output": None, "error": None, "result_file": None, "created_at": now, "updated_at": now}
+        job.update(fields)
+        with self._lock:
+            self._write(job)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, status, fields, result_file, created_at, updated_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            return self._row_to_job(row) if row else None
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, status, fields, result_file, created_at, updated_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            job = self._row_to_job(row)
+            job.update(fields)
+            job["updated_at"] = time.time()
+            self._db.execute("BEGIN")
+            try:
+                self._write(job)
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            return True
+
+    def delete(self, job_id):
+        with self._lock:
+            self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+            self._db.execute("DELETE FROM payloads WHERE id = ?", (job_id,))
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def sweep(self, now=None):
+        """Apply retention. Returns result files that should be deleted from disk."""
+        now = now or time.time()
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN")
+            try:
+                terminal = "status IN ('COMPLETED', 'FAILED')"
+                expired_files = [
+                    row[0]
+                    for row in db.execute(
+                        f"SELECT result_file FROM jobs WHERE {terminal} AND result_file IS NOT NULL "
+                        "AND updated_at < ?",
+                        (now - min(self.ttl, self.result_ttl),),
+                    )
+                ]
+                db.execute(f"DELETE FROM jobs WHERE {terminal} AND updated_at < ?", (now - self.ttl,))
+                excess = db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] - self.max_entries
+                if excess > 0:
+                    oldest = f"SELECT id FROM jobs WHERE {terminal} ORDER BY updated_at LIMIT ?"
+                    expired_files += [
+                        row[0]
+                        for row in db.execute(
+                            f"SELECT result_file FROM jobs WHERE id IN ({oldest}) AND result_file IS NOT NULL", (excess,)
+                        )
+                    ]
+                    db.execute(f"DELETE FROM jobs WHERE id IN ({oldest})", (excess,))
+                db.execute(
+                    f"UPDATE jobs SET result_file = NULL, fields = json_set(fields, '$.output', json('{{\"expired\": true}}')) "
+                    f"WHERE {terminal} AND result_file IS NOT NULL AND updated_at < ?",
+                    (now - self.result_ttl,),
+                )
+                db.execute("DELETE FROM payloads WHERE id NOT IN (SELECT id FROM jobs)")
+                db.execute(
+                    "DELETE FROM payloads WHERE id IN (SELECT id FROM jobs WHERE updated_at < ?)",
+                    (now - self.payload_ttl,),
+                )
+                total = db.execute("SELECT COALESCE(SUM(size), 0) FROM payloads").fetchone()[0]
+                if total > self.max_bytes:
+                    for payload_id, size in db.execute(
+                        "SELECT p.id, p.size FROM payloads p JOIN jobs j ON j.id = p.id ORDER BY j.updated_at"
+                    ).fetchall():
+                        db.execute("DELETE FROM payloads WHERE id = ?", (payload_id,))
+                        total -= size
+                        if total <= self.max_bytes:
+                            break
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return expired_files
+
+    def stats(self):
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+            payload_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM payloads").fetchone()[0]
+        return {"backend": "sqlite", "path": self.path, "entries": entries, "payload_bytes": payload_bytes}
+
+
+def create_job_store(backend=JOB_STORE):
+    if backend == "sqlite":
+        return SQLiteJobStore()
+    if backend == "memory":
+        return MemoryJobStore()
+    raise ValueError(f"Unknown JOB_STORE: {backend}")
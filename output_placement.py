@@ -0,0 +1,97 @@
+import errno
+import logging
+import os
+import shutil
+import threading
+
+logger = logging.getLogger(__name__)
+
+NETWORK_VOLUME_DIR = os.getenv("NETWORK_VOLUME_DIR", "/runpod-volume")
+# Bytes per copy_file_range/sendfile call; the kernel moves the data without a userspace buffer
+COPY_CHUNK_BYTES = 64 * 1024 * 1024
+
+# errnos meaning "this mechanism is unavailable here", as opposed to a real I/O failure
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EPERM, errno.EMLINK}
+
+
+def volume_path(filename):
+    return os.path.join(NETWORK_VOLUME_DIR, filename)
+
+
+def same_filesystem(src, dest_dir):
+    return os.stat(src).st_dev == os.stat(dest_dir).st_dev
+
+
+def _kernel_copy(src_fd, dst_fd, size):
+    """Copy size bytes with copy_file_range, else sendfile. Returns the method used, None if neither works."""
+    for method in ("copy_file_range", "sendfile"):
+        func = getattr(os, method, None)
+        if func is None:
+            continue
+        offset = 0
+        try:
+            while offset < size:
+                count = min(COPY_CHUNK_BYTES, size - offset)
+                if method == "copy_file_range":
+                    sent = func(src_fd, dst_fd, count, offset, offset)
+                else:
+                    sent = func(dst_fd, src_fd, offset, count)
+                if sent == 0:
+                    break
+                offset += sent
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED or offset:
+                raise
+            continue
+        if offset != size:
+            raise OSError(f"{method} stopped at {offset} of {size} bytes")
+        return method
+    return None
+
+
+def copy_file(src, dst):
+    """Copy src to dst in the kernel where possible. Returns the method used."""
+    size = os.path.getsize(src)
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        method = _kernel_copy(fsrc.fileno(), fdst.fileno(), size)
+        if method is None:
+            shutil.copyfileobj(fsrc, fdst, COPY_CHUNK_BYTES)
+            method = "copy"
+    return method
+
+
+def place_output(src, dest, move=False):
+    """Put src at dest as cheaply as possible: rename (move only), hardlink, kernel copy, plain copy.
+
+    dest appears atomically and complete; with move=True src is gone afterwards.
+    Returns the mechanism used.
+    """
+    dest_dir = os.path.dirname(dest) or "."
+    os.makedirs(dest_dir, exist_ok=True)
+    size = os.path.getsize(src)
+    if move and same_filesystem(src, dest_dir):
+        os.replace(src, dest)
+        method = "rename"
+    else:
+        tmp = f"{dest}.{threading.get_ident()}.tmp"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        try:
+            try:
+                os.link(src, tmp)
+                method = "hardlink"
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+                method = copy_file(src, tmp)
+            if os.path.getsize(tmp) != size:
+                raise OSError(f"Size mismatch placing {src}: {os.path.getsize(tmp)} != {size}")
+            os.replace(tmp, dest)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        if move:
+            os.remove(src)
+    logger.info(f"Placed {src} -> {dest} ({size} bytes, {method})")
+    return method
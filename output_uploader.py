@@ -0,0 +1,118 @@
+import base64
+import http.client
+import logging
+import os
+import urllib.parse
+
+logger = logging.getLogger(__name__)
+
+# Default delivery for serverless jobs without network_volume / output_upload_url
+OUTPUT_UPLOADER = os.getenv("OUTPUT_UPLOADER", "base64")
+UPLOAD_BLOCK_SIZE = 1024 * 1024
+UPLOAD_TIMEOUT = float(os.getenv("OUTPUT_UPLOAD_TIMEOUT", "300"))
+
+
+class Base64Uploader:
+    """Legacy delivery: the whole video as base64 inside the JSON result."""
+
+    name = "base64"
+
+    def upload(self, path, job_input, task_id):
+        # Encode in 3-byte-aligned blocks so padding only appears at the very end
+        parts = []
+        with open(path, "rb") as f:
+            while True:
+                block = f.read(3 * UPLOAD_BLOCK_SIZE)
+                if not block:
+                    break
+                parts.append(base64.b64encode(block).decode("ascii"))
+        return {"video": "".join(parts)}
+
+
+class PresignedPutUploader:
+    """PUT the file to a caller-supplied presigned URL (job input "output_upload_url")."""
+
+    name = "presigned_put"
+
+    def upload(self, path, job_input, task_id):
+        url = job_input["output_upload_url"]
+        parsed = urllib.parse.urlsplit(url)
+        conn_cls = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+        conn = conn_cls(parsed.netloc, timeout=UPLOAD_TIMEOUT)
+        conn.blocksize = UPLOAD_BLOCK_SIZE
+        target = parsed.path + (f"?{parsed.query}" if parsed.query else "")
+        headers = {
+            "Content-Length": str(os.path.getsize(path)),
+            "Content-Type": job_input.get("output_content_type", "video/mp4"),
+        }
+        try:
+            with open(path, "rb") as f:
+                # http.client streams file bodies in blocksize chunks
+                conn.request("PUT", target, body=f, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+        finally:
+            conn.close()
+        if response.status >= 300:
+            raise RuntimeError(f"Output upload failed: HTTP {response.status} {body[:200]!r}")
+        return {"video_url": urllib.parse.urlunsplit(parsed._replace(query="", fragment=""))}
+
+
+class S3Uploader:
+    """Multipart upload to an S3-compatible bucket; returns a presigned GET URL."""
+
+    name = "s3"
+
+    def __init__(self):
+        self.bucket = os.environ["OUTPUT_S3_BUCKET"]
+        self.prefix = os.getenv("OUTPUT_S3_PREFIX", "output/infinitetalk/")
+        self.url_expires = int(os.getenv("OUTPUT_S3_URL_EXPIRES", "86400"))
+        self._client = None
+
+    def _s3(self):
+        if self._client is None:
+            import boto3
+            from botocore.client import Config
+
+            self._client = boto3.client(
+                "s3",
+                endpoint_url=os.getenv("OUTPUT_S3_ENDPOINT_URL"),
+                aws_access_key_id=os.getenv("OUTPUT_S3_ACCESS_KEY_ID"),
+                aws_secret_access_key=os.getenv("OUTPUT_S3_SECRET_ACCESS_KEY"),
+                region_name=os.getenv("OUTPUT_S3_REGION"),
+                config=Config(signature_version="s3v4"),
+            )
+        return self._client
+
+    def upload(self, path, job_input, task_id):
+        from boto3.s3.transfer import TransferConfig
+
+        key = f"{self.prefix}infinitetalk_{task_id}.mp4"
+        config = TransferConfig(multipart_chunksize=16 * 1024 * 1024, max_concurrency=8)
+        self._s3().upload_file(path, self.bucket, key, ExtraArgs={"ContentType": "video/mp4"}, Config=config)
+        url = self._s3().generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=self.url_expires
+        )
+        return {"video_url": url, "s3_key": key}
+
+
+UPLOADERS = {
+    Base64Uploader.name: Base64Uploader,
+    PresignedPutUploader.name: PresignedPutUploader,
+    S3Uploader.name: S3Uploader,
+}
+_instances = {}
+
+
+def register_uploader(name, uploader_cls):
+    UPLOADERS[name] = uploader_cls
+
+
+def get_uploader(job_input):
+    """A per-job output_upload_url wins; otherwise OUTPUT_UPLOADER selects the delivery."""
+    name = PresignedPutUploader.name if job_input.get("output_upload_url") else OUTPUT_UPLOADER
+    if name not in UPLOADERS:
+        raise ValueError(f"Unknown OUTPUT_UPLOADER: {name}")
+    if name not in _instances:
+        _instances[name] = UPLOADERS[name]()
+    return _instances[name]
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+from input_cache import InputCache
+from output_placement import same_filesystem
+from workflow_templates import VOLATILE_INPUTS
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "/tmp/infinitetalk/result_cache")
+# 0 disables the cache
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(20 * 1024 * 1024 * 1024)))
+# Entries not served for this long are dropped
+RESULT_CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class ResultCache(InputCache):
+    """Finished videos keyed by the bound workflow graph; LRU by bytes plus an idle TTL."""
+
+    label = "Result cache"
+
+    def __init__(self, root=RESULT_CACHE_DIR, max_bytes=RESULT_CACHE_MAX_BYTES, ttl=RESULT_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        super().__init__(root, max_bytes)
+
+    def get(self, key, dest):
+        try:
+            expired = time.time() - self.last_used(key) > self.ttl
+        except FileNotFoundError:
+            expired = False
+        if expired:
+            with self._lock:
+                self._total -= self._entries.pop(key, 0)
+            self._remove(key)
+            logger.info(f"Result cache entry expired: {key}")
+        return super().get(key, dest)
+
+
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def file_digest(path):
+    """sha256 of a file's content, memoised on (inode, size, mtime)."""
+    st = os.stat(path)
+    stamp = (path, st.st_ino, st.st_size, st.st_mtime_ns)
+    with _digests_lock:
+        if stamp in _digests:
+            return _digests[stamp]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    with _digests_lock:
+        if len(_digests) > 1024:
+            _digests.clear()
+        _digests[stamp] = digest.hexdigest()
+    return _digests[stamp]
+
+
+def result_cache_key(prompt, segmented=False):
+    """Hash the bound graph with input files replaced by their content digests.
+
+    Per-job paths (task directories, uploads) therefore hash the same when the
+    bytes are the same; VOLATILE_INPUTS are left out entirely. A segmented render
+    of the same graph produces a different video, so it gets its own key.
+    """
+    normalized = {}
+    for node_id, node in prompt.items():
+        inputs = {}
+        for name, value in node.get("inputs", {}).items():
+            if (node_id, name) in VOLATILE_INPUTS:
+                continue
+            if isinstance(value, str) and os.path.isabs(value) and os.path.isfile(value):
+                value = {"sha256": file_digest(value)}
+            inputs[name] = value
+        normalized[node_id] = {"class_type": node.get("class_type"), "inputs": inputs}
+    if segmented:
+        normalized = {"segmented": True, "graph": normalized}
+    canonical = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResultCache()
+        return _cache
+
+
+def lookup(job_input, prompt, dest, segmented=False):
+    """Return (key, dest) on a hit or (key, None) on a miss; key is None when caching is off.
+
+    cache: "bypass" in the job input skips the lookup; the fresh result still replaces the entry.
+    """
+    cache = get_cache()
+    if not cache.enabled:
+        return None, None
+    key = result_cache_key(prompt, segmented)
+    if job_input.get("cache") == "bypass":
+        logger.info(f"Result cache bypassed: {key}")
+        return key, None
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    if cache.get(key, dest):
+        logger.info(f"Result cache hit: {key}")
+        return key, dest
+    return key, None
+
+
+def store(key, videos):
+    """Remember the first produced video for key (videos as returned by collect_videos).
+
+    Only outputs on the cache's filesystem are adopted (a hardlink); copying one back
+    from elsewhere, e.g. a network volume output dir, would cost a full read of the video.
+    Point RESULT_CACHE_DIR at that filesystem to cache those jobs too.
+    """
+    if key is None:
+        return
+    for paths in videos.values():
+        for path in paths:
+            if path and os.path.exists(path):
+                cache = get_cache()
+                if not same_filesystem(path, cache.root):
+                    logger.info(f"Result cache skipped, {path} is not on the filesystem of {cache.root}")
+                    return
+                cache.put(key, path)
+                return
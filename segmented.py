@@ -0,0 +1,208 @@
+import logging
+import math
+import os
+import re
+import subprocess
+
+from audio_probe import get_duration
+
+logger = logging.getLogger(__name__)
+
+FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
+# Output frame rate of the workflows (VHS_VideoCombine / wav2vec fps)
+FPS = 25
+# Target segment length; actual cuts snap to silences near the target
+SEGMENT_SECONDS = float(os.getenv("SEGMENT_SECONDS", "30"))
+SEGMENT_MIN_SECONDS = float(os.getenv("SEGMENT_MIN_SECONDS", "8"))
+# Audio longer than this is segmented unless the job sets "segmented": false (0 = only on request)
+SEGMENT_AUTO_SECONDS = float(os.getenv("SEGMENT_AUTO_SECONDS", "0"))
+SILENCE_NOISE_DB = os.getenv("SILENCE_NOISE_DB", "-35")
+SILENCE_MIN_SECONDS = float(os.getenv("SILENCE_MIN_SECONDS", "0.3"))
+
+_SILENCE_RE = re.compile(r"silence_(start|end): (-?[0-9.]+)")
+
+
+class SegmentationError(Exception):
+    pass
+
+
+def run_ffmpeg(args):
+    result = subprocess.run([FFMPEG_BIN, "-hide_banner", "-nostdin", "-y", *args], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SegmentationError(f"ffmpeg failed ({result.returncode}): {result.stderr[-1000:]}")
+    return result.stderr
+
+
+def detect_silences(audio_paths):
+    """[(start, end)] of silent stretches; with two tracks, of their mix."""
+    args = []
+    for path in audio_paths:
+        args += ["-i", path]
+    detect = f"silencedetect=noise={SILENCE_NOISE_DB}dB:d={SILENCE_MIN_SECONDS}"
+    if len(audio_paths) > 1:
+        args += ["-filter_complex", f"amix=inputs={len(audio_paths)}:duration=longest,{detect}"]
+    else:
+        args += ["-af", detect]
+    output = run_ffmpeg(args + ["-f", "null", "-"])
+    silences, start = [], None
+    for kind, value in _SILENCE_RE.findall(output):
+        if kind == "start":
+            start = max(0.0, float(value))
+        elif start is not None:
+            silences.append((start, float(value)))
+            start = None
+    return silences
+
+
+def aligned_frames(frames, frame_window, motion_frame):
+    """Round frames up to what the sampler renders: one window plus whole (window - motion) steps."""
+    if frames <= frame_window:
+        return frame_window
+    step = frame_window - motion_frame
+    return frame_window + math.ceil((frames - frame_window) / step) * step
+
+
+def plan_segments(duration, silences, frame_window, motion_frame, target=SEGMENT_SECONDS, min_seconds=SEGMENT_MIN_SECONDS):
+    """Split [0, duration] into frame-aligned (start, end) spans.
+
+    Hard cut points sit on window boundaries (target rounded to the window grid);
+    a silence within one window step of that point is preferred.
+    """
+    step_seconds = (frame_window - motion_frame) / FPS
+    target = aligned_frames(round(target * FPS), frame_window, motion_frame) / FPS
+    midpoints = sorted((start + end) / 2 for start, end in silences)
+    cuts, pos = [], 0.0
+    while duration - pos > target + min_seconds:
+        goal = pos + target
+        candidates = [m for m in midpoints if abs(m - goal) <= step_seconds and duration - m >= min_seconds]
+        cut = min(candidates, key=lambda m: abs(m - goal)) if candidates else goal
+        cut = round(cut * FPS) / FPS
+        cuts.append(cut)
+        pos = cut
+    bounds = [0.0] + cuts + [duration]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def should_segment(job_input, wav_path, wav_path_2=None):
+    requested = job_input.get("segmented")
+    if requested is False:
+        return False
+    if requested is None and SEGMENT_AUTO_SECONDS <= 0:
+        return False
+    try:
+        duration = max(get_duration(p) for p in filter(None, (wav_path, wav_path_2)))
+    except Exception as e:
+        logger.warning(f"Cannot measure audio duration, rendering unsegmented: {e}")
+        return False
+    if job_input.get("max_frame") is not None:
+        duration = min(duration, float(job_input["max_frame"]) / FPS)
+    threshold = SEGMENT_AUTO_SECONDS if requested is None else SEGMENT_SECONDS + SEGMENT_MIN_SECONDS
+    return duration > threshold
+
+
+def first_video(videos):
+    for paths in videos.values():
+        for path in paths:
+            if path and os.path.exists(path):
+                return path
+    raise SegmentationError("Segment produced no video")
+
+
+class SegmentedJob:
+    """One long job as several independent prompts, stitched back into a single video.
+
+    Every segment after the first starts motion_frame frames early so the sampler
+    has audio context across the cut; those lead-in frames are trimmed when stitching.
+    """
+
+    def __init__(self, template, prompt, work_dir):
+        self.template = template
+        self.values = template.values(prompt)
+        self.work_dir = work_dir
+        self.is_video = template.name.startswith("video")
+        self.audio_paths = [p for p in (self.values["audio"], self.values.get("audio_2")) if p]
+        self.frame_window, self.motion_frame = template.frame_window()
+        self.segments = []
+        self.duration = None
+
+    def prepare(self):
+        """Cut the inputs and return one bound prompt per segment.
+
+        The bound max_frame caps the rendered length, as it does for an unsegmented job.
+        """
+        os.makedirs(self.work_dir, exist_ok=True)
+        duration = max(get_duration(p) for p in self.audio_paths)
+        if self.values.get("max_frame") is not None:
+            duration = min(duration, float(self.values["max_frame"]) / FPS)
+        self.duration = duration
+        spans = plan_segments(duration, detect_silences(self.audio_paths), self.frame_window, self.motion_frame)
+        lead_in = self.motion_frame / FPS
+        prompts = []
+        for index, (start, end) in enumerate(spans):
+            cut_start = max(0.0, start - lead_in) if index else 0.0
+            length = end - cut_start
+            frames = round(length * FPS)
+            values = dict(self.values)
+            values["max_frame"] = aligned_frames(frames, self.frame_window, self.motion_frame)
+            for key, source in (("audio", self.values["audio"]), ("audio_2", self.values.get("audio_2"))):
+                if source:
+                    values[key] = self._cut_audio(source, key, index, cut_start, length)
+            if self.is_video:
+                values["media"] = self._cut_video(self.values["media"], index, cut_start, length)
+            self.segments.append(
+                {"start": start, "end": end, "drop": round((start - cut_start) * FPS), "frames": round((end - start) * FPS)}
+            )
+            prompts.append(self.template.bind(**values))
+        logger.info(f"Segmented {duration:.1f}s of audio into {len(spans)} prompts: {[(round(s, 2), round(e, 2)) for s, e in spans]}")
+        return prompts
+
+    def _cut_audio(self, source, key, index, start, length):
+        path = os.path.join(self.work_dir, f"{key}_{index:03d}.wav")
+        run_ffmpeg(["-i", source, "-ss", f"{start:.3f}", "-t", f"{length:.3f}", "-c:a", "pcm_s16le", path])
+        return path
+
+    def _cut_video(self, source, index, start, length):
+        path = os.path.join(self.work_dir, f"media_{index:03d}.mp4")
+        run_ffmpeg(
+            ["-ss", f"{start:.3f}", "-i", source, "-t", f"{length:.3f}", "-an", "-c:v", "libx264", "-crf", "16", path]
+        )
+        return path
+
+    def stitch(self, segment_videos):
+        """Concatenate trimmed segment videos and mux the original audio over the whole timeline."""
+        output = os.path.join(self.work_dir, "stitched.mp4")
+        args, filters = [], []
+        for index, (path, segment) in enumerate(zip(segment_videos, self.segments)):
+            args += ["-i", path]
+            # Drop the lead-in, then pad/trim to the exact frame count so audio and video stay aligned
+            filters.append(
+                f"[{index}:v]trim=start_frame={segment['drop']},setpts=PTS-STARTPTS,"
+                f"tpad=stop_mode=clone:stop=2,trim=end_frame={segment['frames']},setpts=PTS-STARTPTS[v{index}]"
+            )
+        count = len(segment_videos)
+        filters.append("".join(f"[v{i}]" for i in range(count)) + f"concat=n={count}:v=1:a=0[v]")
+        for path in self.audio_paths:
+            args += ["-i", path]
+        if len(self.audio_paths) > 1:
+            # Multi-person workflows render both speakers summed ("para"); amix averages, so scale back up
+            filters.append(f"[{count}:a][{count + 1}:a]amix=inputs=2:duration=longest:dropout_transition=0,volume=2[a]")
+            audio_map = "[a]"
+        else:
+            audio_map = f"{count}:a"
+        run_ffmpeg(
+            args
+            + ["-filter_complex", ";".join(filters), "-map", "[v]", "-map", audio_map]
+            + ["-r", str(FPS), "-c:v", "libx264", "-crf", "19", "-pix_fmt", "yuv420p", "-c:a", "aac"]
+            + ["-t", f"{self.duration:.3f}", output]
+        )
+        logger.info(f"Stitched {count} segments into {output}")
+        return output
+
+
+def render_segmented(segmented_job, submit, collect):
+    """Queue every segment at once (spread across backends by the client), then stitch in order."""
+    handles = [submit(prompt) for prompt in segmented_job.prepare()]
+    for handle in handles:
+        handle.wait()
+    videos = [first_video(collect(handle.prompt_id)) for handle in handles]
+    return {"segmented": [segmented_job.stitch(videos)]}
@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# Workflow JSON files live next to the modules in the repository
+os.environ.setdefault("WORKFLOW_DIR", ROOT)
+# Importing handler (via api) must not start the RunPod serverless worker
+os.environ.setdefault("SERVICE_MODE", "api")
@@ -0,0 +1,72 @@
+import base64
+import types
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+import api  # noqa: E402
+from api import RangeNotSatisfiable, parse_range  # noqa: E402
+from job_store import MemoryJobStore  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-99", (0, 99)),
+        ("bytes=10-", (10, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=990-5000", (990, 999)),
+        ("bytes= 5 - 9", (5, 9)),
+    ],
+)
+def test_parse_range_satisfiable(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize(
+    "header",
+    [None, "", "items=0-9", "bytes=0-9,20-29", "bytes=abc", "bytes=-", "bytes=9-5", "bytes=1-x", "bytes=5"],
+)
+def test_parse_range_ignores_unsupported_or_malformed(header):
+    assert parse_range(header, 1000) is None
+
+
+@pytest.mark.parametrize("header, size", [("bytes=1000-", 1000), ("bytes=1000-1005", 1000), ("bytes=-0", 1000), ("bytes=-10", 0)])
+def test_parse_range_unsatisfiable(header, size):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, size)
+
+
+@pytest.fixture
+def job_store(tmp_path, monkeypatch):
+    store = MemoryJobStore()
+    monkeypatch.setattr(api, "jobs", store)
+    monkeypatch.setattr(api, "RESULTS_DIR", str(tmp_path / "results"))
+    return store
+
+
+def test_base64_result_is_decoded_on_first_download(job_store):
+    video = base64.b64encode(b"video bytes").decode("ascii")
+    job_store.create("job", status="COMPLETED", output={"video": video})
+    assert api.materialize_result("job", {"video": video}) is None
+    response = api.download_result("job", types.SimpleNamespace(headers={}))
+    assert response.status_code == 200
+    result_file = job_store.get("job")["result_file"]
+    assert open(result_file, "rb").read() == b"video bytes"
+    assert api.decode_result_file("job", "not used again") == result_file
+
+
+def test_expired_base64_result_is_gone(job_store):
+    job_store.create("job", status="COMPLETED", output={"base64_expired": True})
+    assert api.download_result("job", types.SimpleNamespace(headers={})).status_code == 410
+
+
+def test_jobs_are_refused_while_warming_up(job_store, monkeypatch):
+    monkeypatch.setattr(api, "is_warm", lambda: False)
+    job_id, response = api.admit_job({"prompt": "hi"})
+    assert job_id is None
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(api.WARMUP_RETRY_AFTER_SECONDS)
+    assert len(job_store) == 0
@@ -0,0 +1,65 @@
+import struct
+import wave
+
+import pytest
+
+from audio_probe import probe_duration
+
+MP3_FRAME_HEADER = b"\xff\xfb\x90\x00"  # MPEG-1 layer III, 128 kbit/s, 44.1 kHz, stereo
+MP3_FRAME_LENGTH = 417
+MP3_FRAME_SECONDS = 1152 / 44100
+
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def mp3_frame(body=b""):
+    return (MP3_FRAME_HEADER + body).ljust(MP3_FRAME_LENGTH, b"\0")
+
+
+def test_wav(tmp_path):
+    path = str(tmp_path / "a.wav")
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\0\0" * 16000 * 2)
+    assert probe_duration(path) == pytest.approx(2.0)
+
+
+def test_flac(tmp_path):
+    packed = (48000 << 44) | (1 << 41) | (15 << 36) | (48000 * 3)
+    streaminfo = bytes(10) + packed.to_bytes(8, "big") + bytes(16)
+    path = write(tmp_path / "a.flac", b"fLaC" + bytes([0x80, 0, 0, 34]) + streaminfo)
+    assert probe_duration(path) == pytest.approx(3.0)
+
+
+def test_mp4(tmp_path):
+    mvhd = struct.pack(">I4sIIIII", 28, b"mvhd", 0, 0, 0, 1000, 4500)
+    moov = struct.pack(">I4s", 8 + len(mvhd), b"moov") + mvhd
+    ftyp = struct.pack(">I4s4sI", 16, b"ftyp", b"M4A ", 0)
+    assert probe_duration(write(tmp_path / "a.m4a", ftyp + moov)) == pytest.approx(4.5)
+
+
+def test_cbr_mp3_counts_frames(tmp_path):
+    path = write(tmp_path / "a.mp3", mp3_frame() * 10)
+    assert probe_duration(path) == pytest.approx(10 * MP3_FRAME_SECONDS)
+
+
+def test_mp3_skips_id3_tag(tmp_path):
+    tag = b"ID3\x04\x00\x00" + bytes([0, 0, 0, 20]) + bytes(20)
+    path = write(tmp_path / "a.mp3", tag + mp3_frame() * 5)
+    assert probe_duration(path) == pytest.approx(5 * MP3_FRAME_SECONDS)
+
+
+def test_mp3_xing_header(tmp_path):
+    xing = bytes(32) + b"Xing" + struct.pack(">II", 1, 250)
+    path = write(tmp_path / "a.mp3", mp3_frame(xing) + mp3_frame() * 2)
+    assert probe_duration(path) == pytest.approx(250 * MP3_FRAME_SECONDS)
+
+
+def test_unknown_format(tmp_path):
+    assert probe_duration(write(tmp_path / "a.bin", b"not an audio file")) is None
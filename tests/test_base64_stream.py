@@ -0,0 +1,48 @@
+import base64
+import binascii
+import io
+import os
+
+import pytest
+
+from base64_stream import Base64StreamDecoder, decode_base64_to_file, strip_data_uri
+
+PAYLOAD = os.urandom(1000)
+ENCODED = base64.b64encode(PAYLOAD).decode("ascii")
+
+
+@pytest.mark.parametrize("slice_size", [1, 3, 4, 7, 64, len(ENCODED)])
+def test_decoder_handles_any_slicing(slice_size):
+    out = io.BytesIO()
+    decoder = Base64StreamDecoder(out)
+    for start in range(0, len(ENCODED), slice_size):
+        decoder.feed(ENCODED[start:start + slice_size])
+    assert decoder.close() == len(PAYLOAD)
+    assert out.getvalue() == PAYLOAD
+
+
+def test_decoder_skips_whitespace():
+    wrapped = "\r\n".join(ENCODED[i:i + 76] for i in range(0, len(ENCODED), 76))
+    out = io.BytesIO()
+    decoder = Base64StreamDecoder(out)
+    decoder.feed(wrapped.encode("ascii"))
+    decoder.close()
+    assert out.getvalue() == PAYLOAD
+
+
+def test_truncated_input_is_rejected():
+    decoder = Base64StreamDecoder(io.BytesIO())
+    decoder.feed(ENCODED[:-1])
+    with pytest.raises(binascii.Error):
+        decoder.close()
+
+
+@pytest.mark.parametrize("data", ["data:audio/wav;base64,QUJD", b"data:audio/wav;base64,QUJD", "QUJD"])
+def test_strip_data_uri(data):
+    assert strip_data_uri(data) in ("QUJD", b"QUJD")
+
+
+def test_decode_to_file(tmp_path):
+    path = str(tmp_path / "out.bin")
+    assert decode_base64_to_file("data:application/octet-stream;base64," + ENCODED, path, chunk_chars=8) == len(PAYLOAD)
+    assert open(path, "rb").read() == PAYLOAD
@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("boto3")
+
+from infinitetalk_s3_client import BatchManifest  # noqa: E402
+
+
+def test_updates_survive_reopen(tmp_path):
+    path = str(tmp_path / "batch_manifest.jsonl")
+    manifest = BatchManifest(path)
+    manifest.update("a.wav", status="uploaded", audio_s3_path="s3://a")
+    manifest.update("a.wav", status="submitted", job_id="job-1")
+    manifest.update("b.wav", status="failed", error="boom")
+    manifest.close()
+    resumed = BatchManifest(path)
+    assert resumed.get("a.wav") == {
+        "filename": "a.wav", "status": "submitted", "audio_s3_path": "s3://a", "job_id": "job-1"
+    }
+    assert resumed.get("b.wav")["status"] == "failed"
+    assert resumed.get("c.wav") == {}
+    resumed.close()
+    with open(path) as f:
+        assert len(f.read().splitlines()) == 2
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / "batch_manifest.jsonl"
+    path.write_text(json.dumps({"filename": "a.wav", "status": "success"}) + '\n{"filename": "b.wa')
+    manifest = BatchManifest(str(path))
+    assert manifest.get("a.wav")["status"] == "success"
+    assert manifest.get("b.wav") == {}
+    manifest.close()
+
+
+def test_resumes_whole_file_json_manifest(tmp_path):
+    legacy = tmp_path / "batch_manifest.json"
+    legacy.write_text(json.dumps({"meta": {}, "files": {"a.wav": {"filename": "a.wav", "status": "success"}}}))
+    path = str(tmp_path / "batch_manifest.jsonl")
+    BatchManifest(path).close()
+    manifest = BatchManifest(path)
+    assert manifest.get("a.wav")["status"] == "success"
+    manifest.close()
@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("boto3")
+
+from infinitetalk_s3_client import (  # noqa: E402
+    POLL_JITTER,
+    POLL_MIN_INTERVAL,
+    job_status_result,
+    next_poll_interval,
+    pending_poll_interval,
+)
+
+
+def within_jitter(value, expected):
+    return expected * (1 - POLL_JITTER) <= value <= expected * (1 + POLL_JITTER)
+
+
+def test_first_poll_is_fast():
+    assert within_jitter(next_poll_interval(None, None, 15.0), POLL_MIN_INTERVAL)
+
+
+def test_backs_off_without_estimate_up_to_ceiling():
+    assert within_jitter(next_poll_interval(4.0, None, 15.0), 6.0)
+    assert within_jitter(next_poll_interval(14.0, None, 15.0), 15.0)
+
+
+def test_converges_on_expected_finish():
+    assert within_jitter(next_poll_interval(1.0, 20.0, 15.0), 10.0)
+    assert within_jitter(next_poll_interval(1.0, 0.5, 15.0), POLL_MIN_INTERVAL)
+
+
+def test_running_since_starts_at_first_in_progress():
+    _, running_since = pending_poll_interval("IN_QUEUE", None, None, 60.0, 15.0)
+    assert running_since is None
+    interval, running_since = pending_poll_interval("IN_PROGRESS", 1.0, None, 20.0, 15.0)
+    assert running_since == pytest.approx(time.time(), abs=1)
+    assert within_jitter(interval, 10.0)
+
+
+@pytest.mark.parametrize(
+    "status_data, expected",
+    [
+        ({"status": "COMPLETED", "output": {"video": "x"}}, {"status": "COMPLETED", "output": {"video": "x"}}),
+        ({"status": "FAILED", "error": "boom"}, {"status": "FAILED", "error": "boom"}),
+        ({"status": "CANCELLED"}, {"status": "UNKNOWN", "data": {"status": "CANCELLED"}}),
+        ({"status": "IN_QUEUE"}, None),
+        ({"status": "IN_PROGRESS"}, None),
+    ],
+)
+def test_job_status_result(status_data, expected):
+    result = job_status_result("job", status_data, time.time())
+    assert result == (None if expected is None else {**expected, "job_id": "job"})
@@ -0,0 +1,150 @@
+import threading
+import time
+
+import pytest
+
+from comfy_client import ComfyUIClient, ComfyUIPool, ComfyUIUnavailable, PromptHandle
+
+
+class FakeComfyUI:
+    """Stands in for one ComfyUI server behind a ComfyUIClient (no sockets)."""
+
+    def __init__(self, client, name):
+        self.client = client
+        self.name = name
+        self.submitted = []
+        self.requests = []
+        self.running = set()
+        client.websocket = lambda *args, **kwargs: None
+        client.start_listener = lambda: None
+        client.queue_prompt = self.queue_prompt
+        client.request_json = self.request_json
+        client._status_seen.set()
+
+    def queue_prompt(self, prompt):
+        prompt_id = f"{self.name}-{len(self.submitted)}"
+        self.submitted.append(prompt_id)
+        self.running.add(prompt_id)
+        return {"prompt_id": prompt_id}
+
+    def request_json(self, method, path, payload=None):
+        self.requests.append((method, path, payload))
+        if (method, path) == ("GET", "/queue"):
+            return {"queue_running": [[0, prompt_id] for prompt_id in self.running], "queue_pending": []}
+        return None
+
+
+def make_pool(count=2):
+    pool = ComfyUIPool([(f"backend{i}", 8188) for i in range(count)])
+    fakes = [FakeComfyUI(backend.client, f"b{i}") for i, backend in enumerate(pool.backends)]
+    return pool, fakes
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_pick_prefers_least_loaded_backend():
+    pool, _ = make_pool(3)
+    pool.backends[0].inflight = 2
+    pool.backends[1].client.queue_remaining = 1
+    assert pool._pick() is pool.backends[2]
+    assert pool.backends[2].inflight == 1
+
+
+def test_pick_skips_excluded_down_and_disconnected_backends():
+    pool, _ = make_pool(3)
+    pool.backends[0].down_until = time.monotonic() + 60
+    pool.backends[1].client._status_seen.clear()
+    assert pool._pick() is pool.backends[2]
+    assert pool._pick(exclude=[pool.backends[2]]) is None
+
+
+def test_pick_rotates_between_equally_loaded_backends():
+    pool, _ = make_pool(2)
+    picked = []
+    for _ in range(4):
+        backend = pool._pick()
+        picked.append(pool.backends.index(backend))
+        backend.inflight -= 1
+    assert set(picked) == {0, 1}
+
+
+def test_failover_resubmits_under_the_same_handle():
+    pool, fakes = make_pool(2)
+    handle = pool.submit({"1": {}})
+    first = handle.prompt_id
+    owner = 0 if first.startswith("b0") else 1
+    inner = pool.backends[owner].client._handles[first]
+
+    inner._fail(ComfyUIUnavailable("backend restarted"))
+    wait_until(lambda: handle.prompt_id != first)
+
+    other = 1 - owner
+    assert fakes[other].submitted == [handle.prompt_id]
+    assert pool.backends[owner].inflight == 0
+    assert pool.backends[other].inflight == 1
+    assert not handle.done
+
+    pool.backends[other].client._route("executing", {"prompt_id": handle.prompt_id, "node": None})
+    assert handle.wait(timeout=1) is handle
+    assert pool.backends[other].inflight == 0
+
+
+def test_failover_gives_up_when_every_backend_failed():
+    pool, _ = make_pool(1)
+    handle = pool.submit({"1": {}})
+    pool.backends[0].client._handles[handle.prompt_id]._fail(ComfyUIUnavailable("gone"))
+    with pytest.raises(ComfyUIUnavailable):
+        handle.wait(timeout=1)
+
+
+def test_wait_timeout_cancels_prompt_and_releases_backend():
+    pool, fakes = make_pool(1)
+    handle = pool.submit({"1": {}})
+    client = pool.backends[0].client
+
+    with pytest.raises(TimeoutError):
+        handle.wait(timeout=0.01)
+
+    assert pool.backends[0].inflight == 0
+    assert client._handles == {}
+    assert ("POST", "/interrupt", {"prompt_id": handle.prompt_id}) in fakes[0].requests
+
+
+def test_cancel_dequeues_prompt_that_has_not_started():
+    client = ComfyUIClient("127.0.0.1")
+    fake = FakeComfyUI(client, "c")
+    handle = client.submit({"1": {}})
+    fake.running.clear()
+
+    handle.cancel(TimeoutError("too slow"))
+
+    assert ("POST", "/queue", {"delete": [handle.prompt_id]}) in fake.requests
+    assert handle.done and isinstance(handle.error, TimeoutError)
+
+
+def test_events_that_outrun_submit_are_replayed():
+    client = ComfyUIClient("127.0.0.1")
+    FakeComfyUI(client, "c")
+    client._route("executing", {"prompt_id": "c-0", "node": None})
+    handle = client.submit({"1": {}})
+    assert handle.done and client._handles == {}
+
+
+def test_wait_async_timeout_cancels_prompt():
+    import asyncio
+
+    handle = PromptHandle("p")
+    cancelled = threading.Event()
+    handle._canceller = lambda error: cancelled.set()
+
+    async def wait():
+        with pytest.raises(TimeoutError):
+            await handle.wait_async(timeout=0.01)
+
+    asyncio.run(wait())
+    assert cancelled.is_set() and handle.done
@@ -0,0 +1,59 @@
+import os
+import time
+
+import pytest
+
+import comfy_outputs
+
+
+@pytest.fixture
+def comfy_dirs(tmp_path, monkeypatch):
+    output_dir, temp_dir = tmp_path / "output", tmp_path / "temp"
+    output_dir.mkdir()
+    temp_dir.mkdir()
+    monkeypatch.setattr(comfy_outputs, "COMFY_OUTPUT_DIR", str(output_dir))
+    monkeypatch.setattr(comfy_outputs, "COMFY_TEMP_DIR", str(temp_dir))
+    return output_dir, temp_dir
+
+
+def artifact(root, relative, size=10, age=0):
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_output_params_are_job_scoped(comfy_dirs, tmp_path):
+    output_dir, _ = comfy_dirs
+    assert comfy_outputs.output_params("task_1") == {"output_prefix": "infinitetalk/task_1/infinitetalk", "save_output": False}
+    assert comfy_outputs.output_params("task_1", str(tmp_path / "results"))["save_output"] is True
+
+
+def test_cleanup_removes_only_the_job(comfy_dirs):
+    output_dir, temp_dir = comfy_dirs
+    mine = artifact(output_dir, "infinitetalk/task_1/a.mp4")
+    preview = artifact(temp_dir, "infinitetalk/task_1/a.png")
+    other = artifact(output_dir, "infinitetalk/task_2/b.mp4")
+    comfy_outputs.cleanup_job_outputs("task_1")
+    assert not mine.exists() and not preview.exists()
+    assert other.exists()
+
+
+def test_sweep_by_age_and_size(comfy_dirs, monkeypatch):
+    output_dir, temp_dir = comfy_dirs
+    monkeypatch.setattr(comfy_outputs, "COMFY_GC_TTL_SECONDS", 1000)
+    monkeypatch.setattr(comfy_outputs, "COMFY_GC_MAX_BYTES", 25)
+    monkeypatch.setattr(comfy_outputs, "COMFY_GC_MIN_AGE_SECONDS", 100)
+    expired = artifact(temp_dir, "old.png", age=2000)
+    oldest = artifact(output_dir, "infinitetalk/task_1/a.mp4", age=500)
+    older = artifact(output_dir, "infinitetalk/task_2/b.mp4", age=400)
+    fresh = artifact(output_dir, "infinitetalk/task_3/c.mp4", age=10)
+    user_file = artifact(output_dir, "keep.mp4", age=5000)
+    summary = comfy_outputs.sweep()
+    assert not expired.exists() and not oldest.exists()
+    assert older.exists() and fresh.exists() and user_file.exists()
+    assert not (output_dir / "infinitetalk" / "task_1").exists()
+    assert summary["removed_files"] == 2
+    assert summary["remaining_bytes"] == 20
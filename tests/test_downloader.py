@@ -0,0 +1,91 @@
+import http.server
+import os
+import threading
+
+import pytest
+
+import downloader
+from downloader import DownloadError, DownloadTooLarge, download, download_all
+
+DATA = os.urandom(256 * 1024)
+
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    """Serves DATA with Range support; /flaky drops the first response halfway."""
+
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("Range")))
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        start = 0
+        if self.headers.get("Range"):
+            start = int(self.headers["Range"].split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(DATA) - 1}/{len(DATA)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(DATA) - start))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        body = DATA[start:]
+        if self.path == "/flaky" and len(self.requests) == 1:
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(downloader.time, "sleep", lambda seconds: None)
+    Handler.requests = []
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_download(server, tmp_path):
+    path = download(f"{server}/file", str(tmp_path / "out.bin"))
+    assert open(path, "rb").read() == DATA
+    assert not os.path.exists(path + ".part")
+
+
+def test_resumes_with_range(server, tmp_path):
+    path = download(f"{server}/flaky", str(tmp_path / "out.bin"))
+    assert open(path, "rb").read() == DATA
+    assert Handler.requests[0] == ("/flaky", None)
+    assert Handler.requests[1][1] == f"bytes={len(DATA) // 2}-"
+
+
+def test_on_headers_can_skip_the_body(server, tmp_path):
+    seen = []
+    path = str(tmp_path / "out.bin")
+    assert download(f"{server}/file", path, on_headers=lambda headers: seen.append(headers["ETag"]) or True) == path
+    assert seen == ['"v1"']
+    assert not os.path.exists(path)
+
+
+def test_size_limit(server, tmp_path):
+    with pytest.raises(DownloadTooLarge):
+        download(f"{server}/file", str(tmp_path / "out.bin"), max_bytes=1024)
+    assert not os.path.exists(str(tmp_path / "out.bin.part"))
+
+
+def test_client_errors_are_not_retried(server, tmp_path):
+    with pytest.raises(DownloadError):
+        download(f"{server}/missing", str(tmp_path / "out.bin"))
+    assert len(Handler.requests) == 1
+
+
+def test_download_all_keeps_order(server, tmp_path):
+    items = [(f"{server}/file?{i}", str(tmp_path / f"{i}.bin")) for i in range(3)]
+    assert download_all(items) == [path for _, path in items]
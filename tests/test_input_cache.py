@@ -0,0 +1,82 @@
+import os
+
+import input_cache
+from input_cache import InputCache, base64_cache_key, fetch_url, url_cache_key
+
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def test_url_key_ignores_presigning_params():
+    headers = {"ETag": '"abc"'}
+    first = url_cache_key("https://bucket.s3.amazonaws.com/a.wav?X-Amz-Signature=1&X-Amz-Date=2", headers)
+    second = url_cache_key("https://bucket.s3.amazonaws.com/a.wav?X-Amz-Signature=3&X-Amz-Date=4", headers)
+    other = url_cache_key("https://bucket.s3.amazonaws.com/b.wav?X-Amz-Signature=1", headers)
+    assert first == second
+    assert first != other
+
+
+def test_url_key_validators():
+    url = "https://example.com/a.wav"
+    assert url_cache_key(url, {}) is None
+    assert url_cache_key(url, {"ETag": 'W/"weak"'}) is None
+    assert url_cache_key(url, {"ETag": '"1"'}) != url_cache_key(url, {"ETag": '"2"'})
+    by_date = url_cache_key(url, {"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT", "Content-Length": "10"})
+    assert by_date is not None
+    assert by_date != url_cache_key(url, {"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT", "Content-Length": "11"})
+
+
+def test_base64_key_depends_on_payload():
+    assert base64_cache_key("AAAA") == base64_cache_key("AAAA")
+    assert base64_cache_key("AAAA") != base64_cache_key("AAAB")
+
+
+def test_get_links_cached_entry(tmp_path):
+    cache = InputCache(root=str(tmp_path / "cache"), max_bytes=1000)
+    cache.put("k1", write(tmp_path / "src", b"hello"))
+    dest = str(tmp_path / "dest")
+    assert cache.get("k1", dest) == dest
+    assert open(dest, "rb").read() == b"hello"
+    assert cache.get("missing", str(tmp_path / "other")) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = InputCache(root=str(tmp_path / "cache"), max_bytes=10)
+    cache.put("a", write(tmp_path / "a", b"aaaa"))
+    cache.put("b", write(tmp_path / "b", b"bbbb"))
+    cache.get("a", str(tmp_path / "a2"))
+    cache.put("c", write(tmp_path / "c", b"cccc"))
+    assert cache.get("b", str(tmp_path / "b2")) is None
+    assert cache.get("a", str(tmp_path / "a3")) is not None
+    assert cache.stats()["bytes"] == 8
+
+
+def test_reload_keeps_entries(tmp_path):
+    root = str(tmp_path / "cache")
+    InputCache(root=root, max_bytes=100).put("k1", write(tmp_path / "src", b"data"))
+    reloaded = InputCache(root=root, max_bytes=100)
+    assert reloaded.stats()["entries"] == 1
+    assert reloaded.get("k1", str(tmp_path / "dest")) is not None
+
+
+def test_fetch_url_uses_get_headers(tmp_path, monkeypatch):
+    cache = InputCache(root=str(tmp_path / "cache"), max_bytes=1000)
+    monkeypatch.setattr(input_cache, "_cache", cache)
+    downloads = []
+
+    def fetch(url, dest, on_headers=None):
+        # Mimics downloader.download: headers first, body only if not served from cache
+        if on_headers is not None and on_headers({"ETag": '"v1"'}):
+            return dest
+        downloads.append(url)
+        return write(dest, b"body")
+
+    first = fetch_url("https://example.com/a.wav?Signature=1", str(tmp_path / "one"), fetch)
+    second = fetch_url("https://example.com/a.wav?Signature=2", str(tmp_path / "two"), fetch)
+    assert downloads == ["https://example.com/a.wav?Signature=1"]
+    assert open(first, "rb").read() == open(second, "rb").read() == b"body"
+    assert os.path.exists(second)
@@ -0,0 +1,55 @@
+import asyncio
+
+from job_progress import JobProgress
+
+
+class FakeHandle:
+    def __init__(self, prompt_id):
+        self.prompt_id = prompt_id
+        self.listeners = []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def emit(self, msg_type, **data):
+        for listener in self.listeners:
+            listener(msg_type, {"prompt_id": self.prompt_id, **data})
+
+
+def test_percent_averages_prompts():
+    progress = JobProgress("job")
+    first, second = FakeHandle("p1"), FakeHandle("p2")
+    progress.track(first)
+    progress.track(second)
+    first.emit("progress", node="128", value=5, max=10)
+    snapshot = progress.snapshot()
+    assert (snapshot["step"], snapshot["steps"], snapshot["percent"]) == (5, 10, 25.0)
+    assert snapshot["eta_seconds"] is not None
+    first.emit("executing", node=None)
+    second.emit("executing", node=None)
+    assert progress.snapshot()["percent"] == 100.0
+
+
+def test_failover_restarts_prompt_fraction():
+    progress = JobProgress("job")
+    handle = FakeHandle("p1")
+    progress.track(handle)
+    handle.emit("progress", value=8, max=10)
+    handle.prompt_id = "p1-retry"
+    handle.emit("progress", value=2, max=10)
+    assert progress.snapshot()["percent"] == 20.0
+
+
+def test_subscribers_receive_snapshots():
+    async def scenario():
+        progress = JobProgress("job")
+        entry = progress.subscribe()
+        assert (await entry[1].get())["stage"] == "queued"
+        progress.set_stage("rendering")
+        assert (await asyncio.wait_for(entry[1].get(), 1))["stage"] == "rendering"
+        progress.unsubscribe(entry)
+        progress.set_stage("completed")
+        await asyncio.sleep(0)
+        assert entry[1].empty()
+
+    asyncio.run(scenario())
@@ -0,0 +1,98 @@
+import asyncio
+import math
+
+import pytest
+
+from job_scheduler import DEFAULT_JOB_SECONDS, JobScheduler, QueueFull, SchedulerClosed
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class BlockingRunner:
+    """Runner whose jobs finish only when release() is called."""
+
+    def __init__(self):
+        self.started = []
+        self.gate = None
+
+    async def __call__(self, job_id, job_input):
+        if self.gate is None:
+            self.gate = asyncio.Event()
+        self.started.append(job_id)
+        await self.gate.wait()
+        if job_input.get("fail"):
+            raise ValueError(f"{job_id} failed")
+        return {"id": job_id}
+
+    def release(self):
+        self.gate.set()
+
+
+def test_submit_requires_started_scheduler():
+    async def scenario():
+        scheduler = JobScheduler(BlockingRunner())
+        with pytest.raises(SchedulerClosed):
+            scheduler.submit("a", {})
+
+    run(scenario())
+
+
+def test_runs_jobs_and_reports_results():
+    async def scenario():
+        runner = BlockingRunner()
+        scheduler = JobScheduler(runner, max_inflight=2, max_pending=2)
+        scheduler.start()
+        ok = scheduler.submit("a", {})
+        failed = scheduler.submit("b", {"fail": True})
+        await asyncio.sleep(0)
+        runner.release()
+        assert await ok == {"id": "a"}
+        with pytest.raises(ValueError):
+            await failed
+        await scheduler.stop()
+
+    run(scenario())
+
+
+def test_queue_full_with_retry_after():
+    async def scenario():
+        runner = BlockingRunner()
+        scheduler = JobScheduler(runner, max_inflight=1, max_pending=1)
+        scheduler.start()
+        scheduler.submit("running", {})
+        await asyncio.sleep(0)
+        assert runner.started == ["running"]
+        scheduler.submit("queued", {})
+        assert scheduler.position("queued") == 1
+        assert scheduler.position("running") is None
+        with pytest.raises(QueueFull) as excinfo:
+            scheduler.submit("rejected", {})
+        assert excinfo.value.retry_after == math.ceil(DEFAULT_JOB_SECONDS)
+        runner.release()
+        await scheduler.stop()
+
+    run(scenario())
+
+
+def test_retry_after_scales_with_workers():
+    scheduler = JobScheduler(BlockingRunner(), max_inflight=4)
+    assert scheduler.retry_after() == max(1, math.ceil(DEFAULT_JOB_SECONDS / 4))
+
+
+def test_stop_fails_pending_jobs():
+    async def scenario():
+        runner = BlockingRunner()
+        scheduler = JobScheduler(runner, max_inflight=1, max_pending=2)
+        scheduler.start()
+        scheduler.submit("running", {})
+        await asyncio.sleep(0)
+        pending = scheduler.submit("pending", {})
+        await scheduler.stop()
+        with pytest.raises(SchedulerClosed):
+            await pending
+        with pytest.raises(SchedulerClosed):
+            scheduler.submit("late", {})
+
+    run(scenario())
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+
+from job_store import MemoryJobStore, SQLiteJobStore
+
+LIMITS = dict(ttl=1000, max_entries=10, max_bytes=1000, payload_ttl=100, result_ttl=500)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(**overrides):
+        limits = {**LIMITS, **overrides}
+        if request.param == "sqlite":
+            return SQLiteJobStore(path=str(tmp_path / "jobs.sqlite3"), **limits)
+        return MemoryJobStore(**limits)
+
+    return make
+
+
+def finish(store, job_id, **fields):
+    store.create(job_id, status="IN_PROGRESS")
+    store.update(job_id, status="COMPLETED", **fields)
+
+
+def test_create_update_delete(make_store):
+    store = make_store()
+    store.create("a", status="IN_QUEUE", output_format="file")
+    store.update("a", status="COMPLETED", output={"video_path": "/x.mp4"})
+    job = store.get("a")
+    assert (job["status"], job["output"], job["output_format"]) == ("COMPLETED", {"video_path": "/x.mp4"}, "file")
+    store.delete("a")
+    assert store.get("a") is None
+    assert store.update("a", status="FAILED") is False
+
+
+def test_payload_expires_before_job(make_store):
+    store = make_store()
+    finish(store, "a", output={"video": "A" * 100})
+    store.sweep(time.time() + 150)
+    output = store.get("a")["output"]
+    assert "video" not in output
+    assert output["base64_expired"] is True
+    assert store.stats()["payload_bytes"] == 0
+
+
+def test_payload_bytes_cap_drops_oldest(make_store):
+    store = make_store(max_bytes=150)
+    finish(store, "old", output={"video": "A" * 100})
+    finish(store, "new", output={"video": "B" * 100})
+    store.sweep()
+    assert store.get("old")["output"].get("base64_expired")
+    assert store.get("new")["output"]["video"] == "B" * 100
+
+
+def test_result_file_released_after_result_ttl(make_store):
+    store = make_store()
+    finish(store, "a", output={"video_path": "/results/a.mp4"}, result_file="/results/a.mp4")
+    assert store.sweep(time.time() + 10) == []
+    assert store.sweep(time.time() + 600) == ["/results/a.mp4"]
+    job = store.get("a")
+    assert job["result_file"] is None
+    assert job["output"] == {"expired": True}
+
+
+def test_finished_jobs_expire_running_jobs_stay(make_store):
+    store = make_store()
+    finish(store, "done")
+    store.create("running", status="IN_PROGRESS")
+    store.sweep(time.time() + 2000)
+    assert store.get("done") is None
+    assert store.get("running") is not None
+
+
+def test_entry_cap_evicts_oldest_finished(make_store):
+    store = make_store(max_entries=2)
+    for job_id in ("a", "b", "c"):
+        finish(store, job_id)
+    store.sweep()
+    assert store.get("a") is None
+    assert len(store) == 2
+
+
+def test_sqlite_store_survives_reopen(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    finish(SQLiteJobStore(path=path, **LIMITS), "a", output={"video": "AAAA"})
+    job = SQLiteJobStore(path=path, **LIMITS).get("a")
+    assert (job["status"], job["output"]) == ("COMPLETED", {"video": "AAAA"})
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from output_placement import copy_file, place_output
+
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def test_move_on_same_filesystem_renames(tmp_path):
+    src = write(tmp_path / "src.mp4", b"video")
+    dest = str(tmp_path / "out" / "dest.mp4")
+    assert place_output(src, dest, move=True) == "rename"
+    assert not os.path.exists(src)
+    assert open(dest, "rb").read() == b"video"
+
+
+def test_copy_keeps_source(tmp_path):
+    src = write(tmp_path / "src.mp4", b"video")
+    dest = str(tmp_path / "dest.mp4")
+    assert place_output(src, dest) in ("hardlink", "copy_file_range", "sendfile", "copy")
+    assert open(src, "rb").read() == open(dest, "rb").read() == b"video"
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_falls_back_to_copy_without_hardlinks(tmp_path, monkeypatch):
+    def no_link(src, dst):
+        raise OSError(18, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", no_link)
+    src = write(tmp_path / "src.mp4", b"video")
+    dest = str(tmp_path / "dest.mp4")
+    assert place_output(src, dest) != "hardlink"
+    assert open(dest, "rb").read() == b"video"
+
+
+def test_copy_file_large(tmp_path):
+    data = os.urandom(3 * 1024 * 1024 + 17)
+    src = write(tmp_path / "src.bin", data)
+    dest = str(tmp_path / "dest.bin")
+    copy_file(src, dest)
+    assert open(dest, "rb").read() == data
+
+
+def test_real_errors_propagate(tmp_path, monkeypatch):
+    def broken_link(src, dst):
+        raise OSError(5, "Input/output error")
+
+    monkeypatch.setattr(os, "link", broken_link)
+    with pytest.raises(OSError):
+        place_output(write(tmp_path / "src.mp4", b"video"), str(tmp_path / "dest.mp4"))
+    assert not os.path.exists(tmp_path / "dest.mp4")
@@ -0,0 +1,56 @@
+import os
+import time
+
+from result_cache import ResultCache, result_cache_key
+
+
+def write(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+    return str(path)
+
+
+def graph(audio, prefix="job-1"):
+    return {
+        "125": {"class_type": "LoadAudio", "inputs": {"audio": audio}},
+        "131": {"class_type": "VHS_VideoCombine", "inputs": {"filename_prefix": prefix, "frame_rate": 25}},
+    }
+
+
+def test_key_hashes_file_content_not_path(tmp_path):
+    first = write(tmp_path / "task1.wav", b"same audio")
+    second = write(tmp_path / "task2.wav", b"same audio")
+    other = write(tmp_path / "task3.wav", b"other audio")
+    assert result_cache_key(graph(first)) == result_cache_key(graph(second))
+    assert result_cache_key(graph(first)) != result_cache_key(graph(other))
+
+
+def test_key_ignores_volatile_inputs(tmp_path):
+    audio = write(tmp_path / "a.wav", b"audio")
+    assert result_cache_key(graph(audio, "job-1")) == result_cache_key(graph(audio, "job-2"))
+
+
+def test_hit_does_not_touch_served_file(tmp_path):
+    cache = ResultCache(root=str(tmp_path / "cache"), max_bytes=1000, ttl=3600)
+    video = write(tmp_path / "out.mp4", b"video")
+    os.utime(video, (1, 1))
+    cache.put("k", video)
+    assert cache.get("k", str(tmp_path / "served.mp4")) is not None
+    assert os.path.getmtime(video) == 1
+    assert time.time() - cache.last_used("k") < 60
+
+
+def test_idle_entries_expire(tmp_path):
+    cache = ResultCache(root=str(tmp_path / "cache"), max_bytes=1000, ttl=3600)
+    cache.put("k", write(tmp_path / "out.mp4", b"video"))
+    old = time.time() - 7200
+    os.utime(cache._used_path("k"), (old, old))
+    assert cache.get("k", str(tmp_path / "served.mp4")) is None
+    assert not os.path.exists(cache._path("k"))
+    assert not os.path.exists(cache._used_path("k"))
+    assert cache.stats()["entries"] == 0
+
+
+def test_segmented_render_has_its_own_key(tmp_path):
+    audio = write(tmp_path / "a.wav", b"audio")
+    assert result_cache_key(graph(audio)) != result_cache_key(graph(audio), segmented=True)
@@ -0,0 +1,35 @@
+import pytest
+
+from segmented import FPS, aligned_frames, plan_segments, should_segment
+
+WINDOW, MOTION = 81, 9
+
+
+@pytest.mark.parametrize("frames, expected", [(1, 81), (81, 81), (82, 153), (153, 153), (154, 225)])
+def test_aligned_frames(frames, expected):
+    assert aligned_frames(frames, WINDOW, MOTION) == expected
+
+
+def test_short_audio_is_one_segment():
+    assert plan_segments(20.0, [], WINDOW, MOTION, target=30, min_seconds=8) == [(0.0, 20.0)]
+
+
+def test_cuts_on_window_grid_without_silence():
+    spans = plan_segments(100.0, [], WINDOW, MOTION, target=30, min_seconds=8)
+    assert spans == [(0.0, 32.04), (32.04, 64.08), (64.08, 100.0)]
+    for start, end in spans[:-1]:
+        assert aligned_frames(round((end - start) * FPS), WINDOW, MOTION) == round((end - start) * FPS)
+
+
+def test_prefers_nearby_silence():
+    spans = plan_segments(100.0, [(30.8, 31.2), (10.0, 11.0)], WINDOW, MOTION, target=30, min_seconds=8)
+    assert spans[0] == (0.0, 31.0)
+
+
+def test_last_segment_not_shorter_than_minimum():
+    spans = plan_segments(45.0, [], WINDOW, MOTION, target=30, min_seconds=8)
+    assert spans[-1][1] - spans[-1][0] >= 8
+
+
+def test_explicit_false_never_segments():
+    assert should_segment({"segmented": False}, "/nonexistent.wav") is False
@@ -0,0 +1,46 @@
+import json
+import os
+
+import pytest
+
+from workflow_templates import TEMPLATE_SPECS, WorkflowTemplate, WorkflowTemplateError, load_templates
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def templates():
+    return load_templates(ROOT)
+
+
+def test_shipped_workflows_load(templates):
+    assert set(templates) == set(TEMPLATE_SPECS)
+    for template in templates.values():
+        window, motion = template.frame_window()
+        assert window > motion > 0
+
+
+def test_bind_sets_values_without_touching_the_template(templates):
+    template = templates[("image", "single")]
+    default_width = template.graph["245"]["inputs"]["value"]
+    prompt = template.bind(media="/in/a.png", audio="/in/a.wav", width=640, height=None)
+    assert prompt["245"]["inputs"]["value"] == 640
+    assert prompt["284"]["inputs"]["image"] == "/in/a.png"
+    assert prompt["246"]["inputs"]["value"] == template.graph["246"]["inputs"]["value"]
+    assert template.graph["245"]["inputs"]["value"] == default_width
+    assert template.values(prompt)["audio"] == "/in/a.wav"
+
+
+def test_bind_rejects_unknown_parameters(templates):
+    with pytest.raises(WorkflowTemplateError):
+        templates[("image", "single")].bind(audio_2="/in/b.wav")
+
+
+def test_validation_names_the_broken_binding(tmp_path):
+    with open(os.path.join(ROOT, "I2V_single.json")) as f:
+        graph = json.load(f)
+    graph["245"]["inputs"]["value"] = ["999", 0]
+    path = tmp_path / "broken.json"
+    path.write_text(json.dumps(graph))
+    with pytest.raises(WorkflowTemplateError, match="'width'"):
+        WorkflowTemplate("broken", str(path), {"width": ("245", "value")})
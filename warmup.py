@@ -0,0 +1,90 @@
+import logging
+import os
+import threading
+import time
+
+import coldstart
+from comfy_client import get_client
+from workflow_templates import get_template
+
+logger = logging.getLogger(__name__)
+
+# Run a tiny synthetic job at boot so model loading and torch.compile happen before the first request
+WARMUP = os.getenv("WARMUP", "0") == "1"
+# Comma-separated template names (<input_type>_<person_count>); video templates need WARMUP_VIDEO
+WARMUP_TEMPLATES = [t.strip() for t in os.getenv("WARMUP_TEMPLATES", "image_single").split(",") if t.strip()]
+WARMUP_WIDTH = int(os.getenv("WARMUP_WIDTH", "256"))
+WARMUP_HEIGHT = int(os.getenv("WARMUP_HEIGHT", "256"))
+# One frame window of the MultiTalk node (frame_window_size)
+WARMUP_MAX_FRAME = int(os.getenv("WARMUP_MAX_FRAME", "81"))
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "1800"))
+WARMUP_IMAGE = os.getenv("WARMUP_IMAGE", "/examples/image.jpg")
+WARMUP_VIDEO = os.getenv("WARMUP_VIDEO", "")
+WARMUP_AUDIO = os.getenv("WARMUP_AUDIO", "/examples/audio.mp3")
+
+_state = {"status": "pending" if WARMUP else "disabled", "seconds": None, "error": None}
+_done = threading.Event()
+if not WARMUP:
+    _done.set()
+
+
+def warmup_prompt(name):
+    input_type, _, person_count = name.partition("_")
+    media = WARMUP_IMAGE if input_type == "image" else WARMUP_VIDEO
+    if not media:
+        raise ValueError(f"Warm-up template {name} needs WARMUP_VIDEO")
+    params = {
+        "media": media,
+        "audio": WARMUP_AUDIO,
+        "prompt": "warm-up",
+        "width": WARMUP_WIDTH,
+        "height": WARMUP_HEIGHT,
+        "max_frame": WARMUP_MAX_FRAME,
+    }
+    if person_count == "multi":
+        params["audio_2"] = WARMUP_AUDIO
+    return get_template(input_type, person_count).bind(**params)
+
+
+def _remove_outputs(handle):
+    for output in handle.outputs.values():
+        for item in (output or {}).get("gifs", []) + (output or {}).get("videos", []):
+            path = item.get("fullpath")
+            if path and os.path.exists(path):
+                os.remove(path)
+
+
+def run_warmup():
+    """Run the configured warm-up prompts once. Failures are logged, never raised."""
+    if not WARMUP or _state["status"] != "pending":
+        return dict(_state)
+    _state["status"] = "running"
+    coldstart.mark("warmup_start")
+    started = time.monotonic()
+    client = get_client()
+    try:
+        client.wait_until_ready()
+        for name in WARMUP_TEMPLATES:
+            handle = client.submit(warmup_prompt(name))
+            logger.info(f"Warm-up prompt {name} queued: {handle.prompt_id}")
+            handle.wait(WARMUP_TIMEOUT)
+            _remove_outputs(handle)
+        _state["status"] = "done"
+    except Exception as e:
+        logger.warning(f"Warm-up failed, serving cold: {e}")
+        _state["status"] = "failed"
+        _state["error"] = str(e)
+    _state["seconds"] = round(time.monotonic() - started, 3)
+    coldstart.mark("warmup_done")
+    logger.info(f"Warm-up {_state['status']} in {_state['seconds']}s")
+    _done.set()
+    return dict(_state)
+
+
+def is_warm():
+    """True once warm-up has finished (or is disabled); readiness should not be advertised before."""
+    return _done.is_set()
+
+
+def state():
+    return dict(_state)
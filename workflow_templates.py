@@ -0,0 +1,119 @@
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+WORKFLOW_DIR = os.getenv("WORKFLOW_DIR", "/")
+
+# Parameters shared by every InfiniteTalk workflow: name -> (node id, input name)
+COMMON_PARAMS = {
+    "audio": ("125", "audio"),
+    "prompt": ("241", "positive_prompt"),
+    "width": ("245", "value"),
+    "height": ("246", "value"),
+    "max_frame": ("270", "value"),
+    "seed": ("128", "seed"),
+    # VHS_VideoCombine: where the encoder writes (see comfy_outputs.output_params)
+    "output_prefix": ("131", "filename_prefix"),
+    "save_output": ("131", "save_output"),
+}
+
+# WanVideoImageToVideoMultiTalk: frames per generation window and frames carried into the next
+WINDOW_NODE = "192"
+
+# Inputs that differ per job without changing the generated video
+VOLATILE_INPUTS = {("131", "filename_prefix"), ("131", "save_output")}
+
+# (input_type, person_count) -> (workflow file, extra parameters)
+TEMPLATE_SPECS = {
+    ("image", "single"): ("I2V_single.json", {"media": ("284", "image")}),
+    ("image", "multi"): ("I2V_multi.json", {"media": ("284", "image"), "audio_2": ("307", "audio")}),
+    ("video", "single"): ("V2V_single.json", {"media": ("228", "video")}),
+    ("video", "multi"): ("V2V_multi.json", {"media": ("228", "video"), "audio_2": ("313", "audio")}),
+}
+
+
+class WorkflowTemplateError(Exception):
+    pass
+
+
+class WorkflowTemplate:
+    """A ComfyUI API-format workflow parsed once, with named parameters bound per job."""
+
+    def __init__(self, name, path, params):
+        self.name = name
+        self.path = path
+        self.params = dict(params)
+        with open(path, "r") as f:
+            self.graph = json.load(f)
+        self.validate()
+
+    def validate(self):
+        window = self.graph.get(WINDOW_NODE, {}).get("inputs", {})
+        if not all(isinstance(window.get(k), int) for k in ("frame_window_size", "motion_frame")):
+            raise WorkflowTemplateError(f"{self.path}: node {WINDOW_NODE} lacks frame_window_size/motion_frame")
+        for param, (node_id, input_name) in self.params.items():
+            node = self.graph.get(node_id)
+            if node is None:
+                raise WorkflowTemplateError(f"{self.path}: parameter '{param}' targets missing node {node_id}")
+            inputs = node.get("inputs", {})
+            if input_name not in inputs:
+                raise WorkflowTemplateError(
+                    f"{self.path}: node {node_id} ({node.get('class_type')}) has no input '{input_name}' for '{param}'"
+                )
+            if isinstance(inputs[input_name], list):
+                raise WorkflowTemplateError(
+                    f"{self.path}: node {node_id} input '{input_name}' is a link and cannot be bound to '{param}'"
+                )
+
+    def bind(self, **values):
+        """Return a fresh prompt with values bound. None values keep the workflow default."""
+        unknown = set(values) - set(self.params)
+        if unknown:
+            raise WorkflowTemplateError(f"{self.name}: unknown parameters {sorted(unknown)}")
+        # Node and inputs dicts are copied; input values are scalars or link lists that are never mutated
+        prompt = {node_id: {**node, "inputs": dict(node["inputs"])} for node_id, node in self.graph.items()}
+        for param, value in values.items():
+            if value is not None:
+                node_id, input_name = self.params[param]
+                prompt[node_id]["inputs"][input_name] = value
+        return prompt
+
+    def frame_window(self):
+        """(frame_window_size, motion_frame) of the sampler's sliding generation window."""
+        inputs = self.graph[WINDOW_NODE]["inputs"]
+        return inputs["frame_window_size"], inputs["motion_frame"]
+
+    def values(self, prompt):
+        """Read the bound parameter values back out of a prompt (for logging)."""
+        return {param: prompt[node_id]["inputs"].get(input_name) for param, (node_id, input_name) in self.params.items()}
+
+
+_templates = None
+_templates_lock = threading.Lock()
+
+
+def load_templates(workflow_dir=WORKFLOW_DIR):
+    templates = {}
+    for key, (filename, extra) in TEMPLATE_SPECS.items():
+        templates[key] = WorkflowTemplate(
+            f"{key[0]}_{key[1]}", os.path.join(workflow_dir, filename), {**COMMON_PARAMS, **extra}
+        )
+    logger.info(f"Loaded {len(templates)} workflow templates from {workflow_dir}")
+    return templates
+
+
+def get_templates():
+    """Parse and validate every workflow once per process; raises at boot if one is broken."""
+    global _templates
+    with _templates_lock:
+        if _templates is None:
+            _templates = load_templates()
+        return _templates
+
+
+def get_template(input_type, person_count):
+    key = ("image" if input_type == "image" else "video", "single" if person_count == "single" else "multi")
+    return get_templates()[key]